@@ -5,6 +5,7 @@ from src.advocacy_state import AdvocacyState
 from src.schemas import AdvocacyAnalysisOutput
 from src.agents import llm
 from src.logger import setup_logger
+from src.prompt_packer import pack_prompt, analysis_section, question_section
 from src.cache_helper import CacheHelper
 
 logger = setup_logger("AdvocacyAgent")
@@ -171,11 +172,20 @@ Output ONLY the Markdown response.
 def scheme_extraction_node(state: AdvocacyState):
     logger.info("Identifying target scheme...")
     query = state["input_text"]
+
+    # A scheme named in the question doesn't need the LLM to pick it out
+    from src.scheme_resolver import find_scheme_in_text, resolve_scheme, scheme_name
+    scheme_id = find_scheme_in_text(query)
+    if scheme_id:
+        return {"selected_scheme": scheme_name(scheme_id)}
+
     try:
-        prompt = SCHEME_EXTRACTION_PROMPT.format(query=query)
+        prompt = pack_prompt(SCHEME_EXTRACTION_PROMPT, query=question_section(query))
         response = llm.invoke([HumanMessage(content=prompt)])
         scheme = response.content.strip()
-        return {"selected_scheme": scheme}
+        # Canonical name, so "PMJAY" and "Ayushman Bharat" share the analysis cache
+        scheme_id = resolve_scheme(scheme)
+        return {"selected_scheme": scheme_name(scheme_id) if scheme_id else scheme}
     except Exception as e:
         logger.error(f"Scheme extraction failed: {e}")
         return {"selected_scheme": "General Application Guidance"}
@@ -187,19 +197,19 @@ def advocacy_analysis_node(state: AdvocacyState):
     
     # Check cache
     cache_key = CacheHelper.hash_query(query, scheme)
-    cached_result = CacheHelper.get_llm_cache(cache_key)
+    cached_result = CacheHelper.get_llm_cache(cache_key, prompt=ADVOCACY_ANALYSIS_PROMPT)
     if cached_result:
         logger.info("Using cached advocacy result")
         return {"analysis_output": cached_result}
     
     try:
         structured_llm = llm.with_structured_output(AdvocacyAnalysisOutput)
-        prompt = ADVOCACY_ANALYSIS_PROMPT.format(query=query, scheme=scheme)
-        
-        analysis = structured_llm.invoke([HumanMessage(content=prompt)])
+        prompt = pack_prompt(ADVOCACY_ANALYSIS_PROMPT, query=question_section(query), scheme=scheme)
         
-        # Cache result
-        CacheHelper.set_llm_cache(cache_key, analysis)
+        # Identical concurrent requests share one LLM call, which is then cached
+        analysis = CacheHelper.compute_llm(
+            cache_key, lambda: structured_llm.invoke([HumanMessage(content=prompt)]), prompt=ADVOCACY_ANALYSIS_PROMPT
+        )
         
         return {"analysis_output": analysis}
     except Exception as e:
@@ -216,7 +226,7 @@ def synthesis_node(state: AdvocacyState):
     
     try:
         analysis_dict = analysis.model_dump()
-        prompt = SYNTHESIS_PROMPT.format(analysis=str(analysis_dict), language=language)
+        prompt = pack_prompt(SYNTHESIS_PROMPT, analysis=analysis_section(str(analysis_dict)), language=language)
         
         response = llm.invoke([HumanMessage(content=prompt)])
         return {
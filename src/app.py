@@ -9,6 +9,10 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.graph import app as graph_app
 from src.question_config import get_option_config, get_all_options
+from src.warmup import start_warmup, is_ready, get_status
+from src.semantic_cache import rag_semantic_cache
+from src.llm_cache import llm_cache
+from src.cache_helper import CacheHelper
 from langchain_core.messages import HumanMessage
 
 app = Flask(__name__)
@@ -17,11 +21,32 @@ app.secret_key = os.urandom(24)
 # Configurations
 THREAD_ID_KEY = "thread_id"
 
+# Load the embedder and vector store in the background so the first
+# request in each worker doesn't pay for it
+start_warmup()
+
 @app.route('/')
 def index():
     """Render the home page."""
     return render_template('index.html')
 
+@app.route('/readyz')
+def readyz():
+    """Readiness probe: 503 until the retrieval stack is warmed up."""
+    status = get_status()
+    if is_ready():
+        return jsonify(status)
+    return jsonify(status), 503
+
+@app.route('/metrics')
+def metrics():
+    """Cache hit/miss counters for this worker process."""
+    return jsonify({
+        "rag_semantic_cache": rag_semantic_cache.stats(),
+        "llm_cache": llm_cache.stats(),
+        "caches": CacheHelper.stats(),
+    })
+
 @app.route('/service/<option_key>')
 def service_form(option_key):
     """Render dynamic form based on service type."""
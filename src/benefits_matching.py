@@ -1,11 +1,12 @@
 from typing import TypedDict, List, Optional, Any
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
 from langchain_core.messages import HumanMessage, SystemMessage
 from src.benefits_state import BenefitsState
 from src.schemas import BenefitsAnalysisOutput, CitizenProfile
 from src.agents import llm
 from src.rag import get_retriever
 from src.logger import setup_logger
+from src.prompt_packer import pack_prompt, analysis_section, context_section, profile_section, question_section
 from src.cache_helper import CacheHelper
 
 logger = setup_logger("BenefitsAgent")
@@ -14,7 +15,7 @@ logger = setup_logger("BenefitsAgent")
 
 PROFILE_EXTRACTION_PROMPT = """
 Extract citizen profile information from the user's query.
-Look for: age, income, category/caste, location, education level, employment status, family size, special conditions.
+Look for: age, gender, income, category/caste, location, education level, employment status, family size, special conditions.
 
 User query: {query}
 
@@ -29,6 +30,9 @@ Based on the citizen profile and retrieved policy documents, identify ALL benefi
 Citizen Profile:
 {profile}
 
+Pre-screened Schemes (the profile passes their basic age/income/state/category/gender/occupation criteria):
+{shortlist}
+
 Policy Context:
 {context}
 
@@ -48,6 +52,8 @@ Include ALL applicable schemes from:
 - Local/Municipal schemes
 - NGO/CSR programs (if known)
 
+Explain the pre-screened schemes first, checking their remaining conditions against the profile.
+
 For EACH benefit, provide:
 1. **What You Get**: Clear description of the benefit amount/service
 2. **Why You Qualify**: Specific criteria match (e.g., "You qualify because your income is below ₹X and you are aged Y")
@@ -120,7 +126,7 @@ def profile_extraction_node(state: BenefitsState):
     query = state["input_text"]
     try:
         structured_llm = llm.with_structured_output(CitizenProfile)
-        prompt = PROFILE_EXTRACTION_PROMPT.format(query=query)
+        prompt = pack_prompt(PROFILE_EXTRACTION_PROMPT, query=question_section(query))
         
         profile = structured_llm.invoke([HumanMessage(content=prompt)])
         return {"citizen_profile": profile}
@@ -128,18 +134,51 @@ def profile_extraction_node(state: BenefitsState):
         logger.error(f"Profile extraction failed: {e}")
         return {"citizen_profile": None}
 
+def _retrieve_context(query: str, filters) -> str:
+    try:
+        from src.rag_agent import rag_agent_retrieve
+        return rag_agent_retrieve(query, filters=filters)
+    except Exception as e:
+        logger.warning(f"RAG Agent failed: {e}")
+        return "No specific policy documents found."
+
+def retrieval_node(state: BenefitsState):
+    """
+    RAG retrieval, run alongside profile extraction. It only needs the query
+    and the state to restrict to, which comes from the UI's profile or the query text.
+    """
+    logger.info("Retrieving benefits context...")
+    from src.retrieval_filters import filters_from_profile, normalize_state
+    query = state["input_text"]
+    filters = filters_from_profile(state.get("citizen_profile"))
+    if not filters.state:
+        filters.state = normalize_state(query)
+    return {"retrieved_context": _retrieve_context(query, filters), "retrieval_state": filters.state}
+
 def benefits_matching_node(state: BenefitsState):
     logger.info("Matching benefits...")
     query = state["input_text"]
     profile = state.get("citizen_profile")
     
-    # RAG retrieval using agent
+    # Restricted to the citizen's state + central schemes; retrieve again only if
+    # the extracted profile places the citizen in a state the query text didn't name
+    from src.retrieval_filters import filters_from_profile
+    filters = filters_from_profile(profile)
+    context = state.get("retrieved_context")
+    if context is None or (filters.state and filters.state != state.get("retrieval_state")):
+        context = _retrieve_context(query, filters)
+
+    # Keep only the sentences relevant to this question
+    from src.context_compression import compress_context
+    context = compress_context(query, context)
+
+    # Cataloged schemes whose basic criteria this profile meets
+    from src.scheme_prescreen import prescreen_schemes
     try:
-        from src.rag_agent import rag_agent_retrieve
-        context = rag_agent_retrieve(query)
+        shortlist = prescreen_schemes(profile)
     except Exception as e:
-        logger.warning(f"RAG Agent failed: {e}")
-        context = "No specific policy documents found."
+        logger.warning(f"Scheme pre-screen failed: {e}")
+        shortlist = ""
     
     if profile:
         profile_str = str(profile.model_dump())
@@ -149,20 +188,27 @@ def benefits_matching_node(state: BenefitsState):
         location = "Unknown"
     
     # Check cache
-    cache_key = CacheHelper.hash_query(query, profile_str + context[:200])
-    cached_result = CacheHelper.get_llm_cache(cache_key)
+    cache_key = CacheHelper.hash_query(query, profile_str + shortlist + context[:200])
+    cached_result = CacheHelper.get_llm_cache(cache_key, prompt=BENEFITS_MATCHING_PROMPT)
     if cached_result:
         logger.info("Using cached benefits result")
         return {"analysis_output": cached_result}
     
     try:
         structured_llm = llm.with_structured_output(BenefitsAnalysisOutput)
-        prompt = BENEFITS_MATCHING_PROMPT.format(profile=profile_str, context=context, query=query, location=location)
-        
-        analysis = structured_llm.invoke([HumanMessage(content=prompt)])
+        prompt = pack_prompt(
+            BENEFITS_MATCHING_PROMPT,
+            profile=profile_section(profile_str),
+            shortlist=context_section(shortlist or "None"),
+            context=context_section(context),
+            query=question_section(query),
+            location=location
+        )
         
-        # Cache result
-        CacheHelper.set_llm_cache(cache_key, analysis)
+        # Identical concurrent requests share one LLM call, which is then cached
+        analysis = CacheHelper.compute_llm(
+            cache_key, lambda: structured_llm.invoke([HumanMessage(content=prompt)]), prompt=BENEFITS_MATCHING_PROMPT
+        )
         
         return {"analysis_output": analysis}
     except Exception as e:
@@ -179,7 +225,7 @@ def synthesis_node(state: BenefitsState):
     
     try:
         analysis_dict = analysis.model_dump()
-        prompt = SYNTHESIS_PROMPT.format(analysis=str(analysis_dict), language=language)
+        prompt = pack_prompt(SYNTHESIS_PROMPT, analysis=analysis_section(str(analysis_dict)), language=language)
         
         response = llm.invoke([HumanMessage(content=prompt)])
         return {
@@ -196,11 +242,14 @@ def build_benefits_graph():
     workflow = StateGraph(BenefitsState)
     
     workflow.add_node("profile_extraction", profile_extraction_node)
+    workflow.add_node("retrieval", retrieval_node)
     workflow.add_node("benefits_matching", benefits_matching_node)
     workflow.add_node("synthesis", synthesis_node)
     
-    workflow.set_entry_point("profile_extraction")
-    workflow.add_edge("profile_extraction", "benefits_matching")
+    # Profile extraction (LLM) and retrieval run in parallel and join before matching
+    workflow.add_edge(START, "profile_extraction")
+    workflow.add_edge(START, "retrieval")
+    workflow.add_edge(["profile_extraction", "retrieval"], "benefits_matching")
     workflow.add_edge("benefits_matching", "synthesis")
     workflow.add_edge("synthesis", END)
     
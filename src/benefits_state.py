@@ -10,6 +10,10 @@ class BenefitsState(TypedDict):
     # Citizen profile (from eligibility agent or extracted)
     citizen_profile: Optional[CitizenProfile]
     
+    # Retrieval, run in parallel with profile extraction
+    retrieved_context: Optional[str]
+    retrieval_state: Optional[str]
+    
     # Benefits analysis
     analysis_output: Optional[BenefitsAnalysisOutput]
     
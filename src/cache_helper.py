@@ -1,16 +1,22 @@
 """
 Caching utilities for expensive operations.
 """
-from functools import lru_cache
 import hashlib
-import json
-from typing import Any, Dict
+import os
+from typing import Any, Callable, Dict
+
+from src.single_flight import llm_flight, rag_flight
+from src.striped_cache import cache_stats, get_cache
+
+# Budget of the exact-match RAG result cache (formatted context strings)
+RAG_CACHE_MAX_BYTES = int(os.getenv("RAG_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+# Re-ingesting the corpus makes old results stale, so they don't live forever
+RAG_CACHE_TTL_SECONDS = int(os.getenv("RAG_CACHE_TTL_SECONDS", "3600"))
 
 class CacheHelper:
     """Helper class for caching expensive operations."""
     
-    _llm_cache: Dict[str, Any] = {}
-    _rag_cache: Dict[str, Any] = {}
+    _rag_cache = get_cache("rag", RAG_CACHE_MAX_BYTES, default_ttl=RAG_CACHE_TTL_SECONDS)
     
     @staticmethod
     def hash_query(query: str, context: str = "") -> str:
@@ -19,19 +25,32 @@ class CacheHelper:
         return hashlib.md5(combined.encode()).hexdigest()
     
     @staticmethod
-    def get_llm_cache(key: str) -> Any:
-        """Get cached LLM result."""
-        return CacheHelper._llm_cache.get(key)
+    def get_llm_cache(key: str, prompt: str = "") -> Any:
+        """Get cached LLM result (shared across workers, see src/llm_cache.py)."""
+        from src.llm_cache import llm_cache
+        return llm_cache.get(key, prompt=prompt)
+    
+    @staticmethod
+    def set_llm_cache(key: str, value: Any, prompt: str = ""):
+        """Cache LLM result, tagged with the model and a hash of the prompt template."""
+        from src.llm_cache import llm_cache
+        llm_cache.set(key, value, prompt=prompt)
     
     @staticmethod
-    def set_llm_cache(key: str, value: Any):
-        """Cache LLM result."""
-        # Limit cache size to prevent memory issues
-        if len(CacheHelper._llm_cache) > 100:
-            # Remove oldest entry (first key)
-            first_key = next(iter(CacheHelper._llm_cache))
-            del CacheHelper._llm_cache[first_key]
-        CacheHelper._llm_cache[key] = value
+    def compute_llm(key: str, compute: Callable[[], Any], prompt: str = "") -> Any:
+        """
+        Run `compute` for a cache miss and cache its result. Concurrent callers
+        with the same key and prompt wait for one call instead of each calling the LLM.
+        """
+        def call():
+            cached = CacheHelper.get_llm_cache(key, prompt=prompt)
+            if cached is not None:  # finished just before this flight started
+                return cached
+            value = compute()
+            if value is not None:
+                CacheHelper.set_llm_cache(key, value, prompt=prompt)
+            return value
+        return llm_flight.do(f"{hash(prompt)}|{key}", call)
     
     @staticmethod
     def get_rag_cache(key: str) -> Any:
@@ -39,15 +58,35 @@ class CacheHelper:
         return CacheHelper._rag_cache.get(key)
     
     @staticmethod
-    def set_rag_cache(key: str, value: Any):
-        """Cache RAG result."""
-        if len(CacheHelper._rag_cache) > 50:
-            first_key = next(iter(CacheHelper._rag_cache))
-            del CacheHelper._rag_cache[first_key]
-        CacheHelper._rag_cache[key] = value
+    def set_rag_cache(key: str, value: Any, ttl_seconds: int = None):
+        """Cache RAG result; least recently used results go first once over RAG_CACHE_MAX_BYTES."""
+        CacheHelper._rag_cache.set(key, value, ttl=ttl_seconds)
+    
+    @staticmethod
+    def compute_rag(key: str, compute: Callable[[], Any]) -> Any:
+        """RAG counterpart of compute_llm: one retrieval per key in flight, result cached."""
+        def call():
+            cached = CacheHelper.get_rag_cache(key)
+            if cached is not None:
+                return cached
+            value = compute()
+            if value is not None:
+                CacheHelper.set_rag_cache(key, value)
+            return value
+        return rag_flight.do(key, call)
+    
+    @staticmethod
+    def stats() -> Dict[str, Dict[str, Any]]:
+        """Hits, misses, evictions and bytes per cache namespace in this process."""
+        import src.llm_cache  # noqa: F401 - registers the "llm" namespace
+        stats = cache_stats()
+        for flight in (llm_flight, rag_flight):
+            stats.setdefault(flight.name, {})["single_flight"] = flight.stats()
+        return stats
     
     @staticmethod
     def clear_all():
         """Clear all caches."""
-        CacheHelper._llm_cache.clear()
+        from src.llm_cache import llm_cache
+        llm_cache.clear()
         CacheHelper._rag_cache.clear()
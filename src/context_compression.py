@@ -0,0 +1,150 @@
+"""
+Query-aware compression of retrieved context before it goes into a prompt.
+
+Retrieved chunks are long and mostly irrelevant to the specific question;
+pasting them whole (with "**Document N**" wrappers) inflates every Groq call.
+Here the context is split into sentences, every sentence is scored against
+the query embedding in one matrix product, and the best sentences are kept
+up to a token budget, in their original order and grouped by document.
+Fragments too short to score on their own, such as list items like "Age 60+",
+are attached to the sentence before them, so a list stays with its heading.
+
+Sentence embeddings are cached in a bounded LRU because the same chunks are
+retrieved again and again across queries.
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from src.logger import setup_logger
+from src.prompt_packer import count_tokens
+
+logger = setup_logger("ContextCompression")
+
+CONTEXT_COMPRESSION_ENABLED = os.getenv("CONTEXT_COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "600"))
+SENTENCE_CACHE_SIZE = 4096
+
+_DOC_SEPARATOR = "\n\n---\n\n"
+_DOC_HEADER_RE = re.compile(r"^\*\*Document \d+\*\*:\s*")
+# Sentence ends (including the Devanagari danda) and line breaks, which separate list items
+_SENTENCE_RE = re.compile(r"(?<=[.!?।])\s+|\n+")
+# Shorter fragments are attached to a neighbouring sentence rather than scored alone
+_MIN_SENTENCE_CHARS = 15
+
+
+def split_documents(context: str) -> List[str]:
+    """Undo rag_agent's "**Document N**" formatting."""
+    return [_DOC_HEADER_RE.sub("", part).strip() for part in context.split(_DOC_SEPARATOR) if part.strip()]
+
+
+def split_sentences(text: str) -> List[str]:
+    sentences: List[str] = []
+    pending = ""  # short fragments seen before any full sentence
+    for raw in _SENTENCE_RE.split(text):
+        sentence = " ".join(raw.split()).lstrip("-*• ").strip()
+        if not sentence:
+            continue
+        if len(sentence) >= _MIN_SENTENCE_CHARS:
+            sentences.append(_join(pending, sentence) if pending else sentence)
+            pending = ""
+        elif sentences:
+            sentences[-1] = _join(sentences[-1], sentence)
+        else:
+            pending = _join(pending, sentence) if pending else sentence
+    if pending:
+        sentences.append(pending)
+    return sentences
+
+
+def _join(sentence: str, fragment: str) -> str:
+    # "Who can apply: Age 60+; BPL card holders"
+    return f"{sentence} {fragment}" if sentence[-1] in ".:;!?।" else f"{sentence}; {fragment}"
+
+
+class _SentenceEmbeddingCache:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed(self, embeddings, sentences: Sequence[str]) -> np.ndarray:
+        with self._lock:
+            missing = [s for s in dict.fromkeys(sentences) if s not in self._vectors]
+        if missing:
+            vectors = np.asarray(embeddings.embed_documents(missing), dtype=np.float32)
+            with self._lock:
+                for sentence, vector in zip(missing, vectors):
+                    self._vectors[sentence] = vector
+                    self._vectors.move_to_end(sentence)
+                while len(self._vectors) > self.capacity:
+                    self._vectors.popitem(last=False)
+        with self._lock:
+            # Fall back to encoding again if an entry was evicted in between
+            rows = [self._vectors.get(s) for s in sentences]
+        if any(row is None for row in rows):
+            return np.asarray(embeddings.embed_documents(list(sentences)), dtype=np.float32)
+        return np.vstack(rows)
+
+
+_sentence_cache = _SentenceEmbeddingCache(SENTENCE_CACHE_SIZE)
+
+
+def select_sentences(query_vector: Sequence[float], sentence_vectors: np.ndarray,
+                     lengths: Sequence[int], budget: int) -> List[int]:
+    """Indices of the highest-scoring sentences that fit in `budget` tokens, in original order."""
+    q = np.asarray(query_vector, dtype=np.float32)
+    q /= max(float(np.linalg.norm(q)), 1e-12)
+    norms = np.clip(np.linalg.norm(sentence_vectors, axis=1), 1e-12, None)
+    scores = (sentence_vectors @ q) / norms
+
+    chosen, used = [], 0
+    for i in np.argsort(-scores):
+        if used + lengths[i] > budget:
+            continue
+        chosen.append(int(i))
+        used += lengths[i]
+    return sorted(chosen)
+
+
+def compress_context(query: str, context: str, budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    """
+    Keep the sentences of `context` most relevant to `query` within `budget`
+    tokens. Returns `context` unchanged if it already fits, compression is
+    disabled, or the embedding model is unavailable.
+    """
+    if not CONTEXT_COMPRESSION_ENABLED or not context or count_tokens(context) <= budget:
+        return context
+
+    located: List[Tuple[int, str]] = [
+        (doc_number, sentence)
+        for doc_number, doc in enumerate(split_documents(context), start=1)
+        for sentence in split_sentences(doc)
+    ]
+    if not located:
+        return context
+
+    try:
+        from src.rag import get_embeddings
+
+        embeddings = get_embeddings()
+        query_vector = embeddings.embed_query(query)
+        sentence_vectors = _sentence_cache.embed(embeddings, [s for _, s in located])
+    except Exception as e:
+        logger.warning(f"Context compression skipped: {e}")
+        return context
+
+    keep = select_sentences(query_vector, sentence_vectors, [count_tokens(s) for _, s in located], budget)
+
+    grouped: "OrderedDict[int, List[str]]" = OrderedDict()
+    for i in keep:
+        doc_number, sentence = located[i]
+        grouped.setdefault(doc_number, []).append(sentence)
+    compressed = "\n".join(f"[{doc_number}] " + " ".join(sentences) for doc_number, sentences in grouped.items())
+
+    logger.info(f"Compressed context {count_tokens(context)} -> {count_tokens(compressed)} tokens")
+    return compressed
@@ -15,6 +15,7 @@ from langchain_core.messages import HumanMessage, AIMessage
 from src.conversation_state import ConversationState, get_initial_conversation_state, CONVERSATION_PHASES
 from src.config import get_zynd_agent
 from src.logger import setup_logger
+from src.prompt_packer import pack_prompt, context_section, history_section, question_section
 from src.rag_agent import rag_agent_retrieve
 from src.question_config import get_all_option_questions
 from src.languages import TRANSLATIONS
@@ -73,7 +74,7 @@ Standalone Question:
 """
         try:
              history_str = "\n".join(chat_history[-6:]) # Use last 3 turns
-             prompt = REWRITE_PROMPT.format(history=history_str, input=input_text)
+             prompt = pack_prompt(REWRITE_PROMPT, history=history_section(history_str), input=question_section(input_text))
              msg = llm.invoke([HumanMessage(content=prompt)])
              query = msg.content.strip()
              logger.info(f"Contextualized Query: {input_text} -> {query}")
@@ -83,10 +84,10 @@ Standalone Question:
 
     logger.info(f"Final RAG query: {query}")
     
-    # 2. RAG Retrieval using rewritten query
+    # 2. RAG Retrieval using rewritten query, fanned out into sub-queries if MULTI_QUERY_MODE is set
     from src.rag_agent import rag_agent_retrieve
     try:
-        context = rag_agent_retrieve(query)
+        context = rag_agent_retrieve(query, multi_query=True)
     except Exception as e:
         logger.error(f"RAG error: {e}")
         context = ""
@@ -122,11 +123,12 @@ The user has selected language: '{language}'.
         # Format history string
         history_str = "\n".join(chat_history[-10:]) if chat_history else "No history."
         
-        prompt = CHAT_PROMPT.format(
+        prompt = pack_prompt(
+            CHAT_PROMPT,
             language=language,
-            context=context,
-            history=history_str,
-            input=input_text
+            context=context_section(context),
+            history=history_section(history_str),
+            input=question_section(input_text)
         )
         
         logger.info("Generating chat response...")
@@ -0,0 +1,310 @@
+"""
+Deterministic evaluation of scheme eligibility rules.
+
+Many eligibility rules are plain thresholds ("Age >= 60", "Annual income
+below ₹2.5 lakh") or category checks ("SC/ST applicants only"). When the
+question names a cataloged scheme (see src/scheme_catalog.py) and the
+citizen profile has the values those rules test, the answer doesn't need
+the LLM.
+
+Each rule resolves to True, False or None (unknown). Rules are read from the
+structured `field` / `operator` / `value` on EligibilityRule when present,
+otherwise parsed from the `condition` text. Profile values given as ranges
+("26-40", "Below 2.5 lakh") are treated as intervals: a rule resolves only if
+the whole interval passes or the whole interval fails it. Profile income is
+annual, so monthly income limits in condition text are converted to a year;
+limits per week or day are left to the LLM.
+
+A scheme is decided here only when every mandatory rule resolves. One failed
+rule without exceptions means not eligible, and all passing means eligible.
+Anything else goes to the LLM.
+"""
+import math
+import operator as op
+import re
+from typing import List, Optional, Sequence, Set, Tuple, Union
+
+from src.schemas import (
+    AppealGuidance, CitizenProfile, EligibilityAnalysisOutput, EligibilityResult,
+    EligibilityRule, MatchedBenefit, PolicyAnalysisOutput
+)
+from src.retrieval_filters import normalize_state
+from src.logger import setup_logger
+
+logger = setup_logger("EligibilityRules")
+
+Interval = Tuple[float, float]
+NUMERIC_FIELDS = {"age", "income", "family_size"}
+_COMPARATORS = {">=": op.ge, ">": op.gt, "<=": op.le, "<": op.lt, "==": op.eq, "!=": op.ne}
+_MULTIPLIERS = {"lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "l": 1e5, "crore": 1e7, "crores": 1e7, "cr": 1e7,
+                "k": 1e3, "thousand": 1e3}
+_NUMBER_RE = r"(?:rs\.?|inr|₹)?\s*(\d[\d,]*(?:\.\d+)?)\s*(lakhs?|lac|crores?|cr|k|thousand|l)?\b"
+
+# Operator phrases in condition text. Words are matched on word boundaries, longest
+# first, so "or over" beats "over" and "government" doesn't contain "over"
+_WORD_OPERATORS = {
+    "between": "between",
+    "at least": ">=", "minimum": ">=", "or above": ">=", "or more": ">=", "and above": ">=",
+    "or over": ">=", "and over": ">=",
+    "at most": "<=", "maximum": "<=", "up to": "<=", "upto": "<=", "or below": "<=", "or less": "<=",
+    "and below": "<=", "or under": "<=",
+    "above": ">", "more than": ">", "over": ">", "greater than": ">", "exceeding": ">", "exceeds": ">",
+    "exceed": ">",
+    "below": "<", "less than": "<", "under": "<", "lower than": "<",
+}
+_SYMBOL_OPERATORS = {"≥": ">=", ">=": ">=", "≤": "<=", "<=": "<=", ">": ">", "<": "<"}
+# "not under 18" / "must not be less than" / "not exceeding" flip the operator
+_NEGATED = {">": "<=", ">=": "<", "<": ">=", "<=": ">"}
+_NEGATION = r"(?P<neg>\b(?:not|no)\s+(?:be\s+|been\s+)?)?"
+_OPERATOR_RE = re.compile(
+    _NEGATION + "(?P<op>"
+    + "|".join(rf"\b{re.escape(phrase)}\b" for phrase in sorted(_WORD_OPERATORS, key=len, reverse=True))
+    + "|" + "|".join(re.escape(symbol) for symbol in sorted(_SYMBOL_OPERATORS, key=len, reverse=True))
+    + ")"
+)
+_FIELD_PATTERNS = [
+    ("income", r"income|earning|salary"),
+    ("age", r"\bage\b|aged|years old"),
+    ("family_size", r"family size|family members|household size"),
+]
+# Income stated for a shorter period than the year the profile uses
+_MONTHLY_RE = re.compile(r"\bmonthly\b|\bper\s+month\b|\ba\s+month\b|/\s*(?:month|mo)\b|\bp\.\s?m\.")
+_SHORTER_PERIOD_RE = re.compile(r"\b(?:weekly|daily|per\s+(?:week|day)|a\s+(?:week|day))\b|/\s*(?:week|day)\b")
+CATEGORY_VALUES = ["SC", "ST", "OBC", "EWS", "General"]
+_CATEGORY_SYNONYMS = {
+    "scheduled caste": "SC", "scheduled tribe": "ST", "other backward": "OBC",
+    "economically weaker": "EWS", "open": "General", "unreserved": "General",
+}
+
+
+# --- Parsing ---
+
+def parse_amounts(text: str) -> List[float]:
+    """All amounts in `text`: "1-2 lakh" -> [100000, 200000], "age 60" -> [60]."""
+    matches = [(float(m.group(1).replace(",", "")), m.group(2) or "") for m in re.finditer(_NUMBER_RE, text.lower())]
+    # A unit after the last number also applies to bare numbers before it
+    trailing_unit = matches[-1][1] if matches else ""
+    return [number * _MULTIPLIERS.get(unit or trailing_unit, 1) for number, unit in matches]
+
+
+def parse_amount(text: str) -> Optional[float]:
+    amounts = parse_amounts(text)
+    return amounts[0] if amounts else None
+
+
+def to_interval(value: Union[int, float, str, None]) -> Optional[Interval]:
+    """Profile value as a closed interval: 45 -> (45, 45), "26-40" -> (26, 40), "Below 2.5 lakh" -> (0, 250000)."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return (float(value), float(value))
+
+    text = value.lower()
+    numbers = parse_amounts(text)
+    if not numbers:
+        return None
+    if re.search(r"\b(?:below|under|less than|up to|upto)\b|<", text):
+        return (0.0, numbers[0])
+    if re.search(r"\b(?:above|over|more than)\b|\+|>", text):
+        return (numbers[0], math.inf)
+    if len(numbers) >= 2:
+        return (min(numbers[:2]), max(numbers[:2]))
+    return (numbers[0], numbers[0])
+
+
+def condition_operators(text: str) -> Set[str]:
+    """Distinct comparison operators in lower-cased condition text, negations applied."""
+    operators = set()
+    for match in _OPERATOR_RE.finditer(text):
+        phrase = match.group("op")
+        operator = _WORD_OPERATORS.get(phrase) or _SYMBOL_OPERATORS[phrase]
+        if match.group("neg"):
+            operator = _NEGATED.get(operator)
+            if operator is None:
+                return set()  # "not between" isn't a single interval
+        operators.add(operator)
+    return operators
+
+
+def parse_condition(condition: str) -> Optional[EligibilityRule]:
+    """Turn condition text like "Age >= 60" or "Income below ₹2.5 lakh" into a structured rule."""
+    text = condition.lower()
+
+    fields = [field for field, pattern in _FIELD_PATTERNS if re.search(pattern, text)]
+    if len(fields) > 1:
+        return None  # compound conditions are left to the LLM
+    if fields:
+        operators = condition_operators(text)
+        if len(operators) != 1:
+            return None  # no comparison, or conflicting ones ("under 18 or over 60")
+        operator, amounts = operators.pop(), parse_amounts(text)
+        if fields[0] == "income":
+            if _SHORTER_PERIOD_RE.search(text):
+                return None
+            if _MONTHLY_RE.search(text):
+                amounts = [amount * 12 for amount in amounts]
+        if operator == "between":
+            if len(amounts) < 2:
+                return None
+            return EligibilityRule(condition=condition, field=fields[0], operator="in",
+                                   value=[str(amounts[0]), str(amounts[1])])
+        if amounts:
+            return EligibilityRule(condition=condition, field=fields[0], operator=operator, value=amounts[0])
+        return None
+
+    categories = [c for c in CATEGORY_VALUES if re.search(rf"\b{c.lower()}\b", text)]
+    if categories and re.search(r"categor|caste|belong|only|applicant|tribe", text):
+        return EligibilityRule(condition=condition, field="category", operator="in", value=categories)
+
+    state = normalize_state(condition)
+    if state and re.search(r"resident|domicile|reside|living in|native", text):
+        return EligibilityRule(condition=condition, field="location", operator="==", value=state)
+    return None
+
+
+def normalize_category(text: str) -> Optional[str]:
+    """"Scheduled Caste" / "sc" -> "SC"; None if it isn't a known category."""
+    lowered = text.strip().lower()
+    for category in CATEGORY_VALUES:
+        if lowered == category.lower():
+            return category
+    for phrase, category in _CATEGORY_SYNONYMS.items():
+        if phrase in lowered:
+            return category
+    return None
+
+
+# --- Evaluation ---
+
+def _compare_interval(interval: Interval, operator: str, threshold: float) -> Optional[bool]:
+    compare = _COMPARATORS[operator]
+    low, high = interval
+    if low == high:
+        return compare(low, threshold)
+    if operator in ("==", "!="):
+        return None
+    passes_low, passes_high = compare(low, threshold), compare(high, threshold)
+    return passes_low if passes_low == passes_high else None
+
+
+def _as_list(value) -> List[str]:
+    return [str(v) for v in value] if isinstance(value, (list, tuple)) else [str(value)]
+
+
+def evaluate_rule(rule: EligibilityRule, profile: CitizenProfile) -> Optional[bool]:
+    """True / False if the profile decides the rule, None if it can't be decided without judgement."""
+    structured = rule if rule.field and rule.operator and rule.value is not None else parse_condition(rule.condition)
+    if structured is None:
+        return None
+    field, operator, value = structured.field, structured.operator, structured.value
+    profile_value = getattr(profile, field, None)
+    if profile_value in (None, "", []):
+        return None
+
+    if field in NUMERIC_FIELDS:
+        interval = to_interval(profile_value)
+        if interval is None:
+            return None
+        if operator in ("in", "not_in"):
+            bounds = [parse_amount(v) for v in _as_list(value)]
+            if len(bounds) != 2 or None in bounds:
+                return None
+            bounds.sort()
+            inside = _compare_interval(interval, ">=", bounds[0])
+            below_top = _compare_interval(interval, "<=", bounds[1])
+            result = None if inside is None or below_top is None else inside and below_top
+            return result if operator == "in" or result is None else not result
+        threshold = value if isinstance(value, (int, float)) else parse_amount(str(value))
+        return None if threshold is None else _compare_interval(interval, operator, float(threshold))
+
+    if field == "location":
+        state = normalize_state(str(profile_value))
+        allowed = {normalize_state(v) for v in _as_list(value)}
+        if state is None or None in allowed:
+            return None
+        matched = state in allowed
+    elif field == "category":
+        category = normalize_category(str(profile_value))
+        if category is None:
+            return None
+        matched = category in {normalize_category(v) for v in _as_list(value)}
+    else:
+        # Free-text fields: a match is conclusive, a mismatch may just be different wording
+        have = {v.strip().lower() for v in _as_list(profile_value)}
+        matched = any(v.strip().lower() in have for v in _as_list(value))
+        if not matched:
+            return None
+
+    if operator in ("==", "in"):
+        return matched
+    if operator in ("!=", "not_in"):
+        return not matched
+    return None
+
+
+def evaluate_rules(rules: Sequence[EligibilityRule], profile: CitizenProfile) -> Optional[EligibilityResult]:
+    """Eligible if every mandatory rule passes, not eligible if one fails outright, else None."""
+    mandatory = [r for r in rules if r.is_mandatory]
+    if not mandatory:
+        return None
+
+    passed, failed = [], []
+    for rule in mandatory:
+        outcome = evaluate_rule(rule, profile)
+        if outcome is True:
+            passed.append(rule.condition)
+        elif outcome is False and not rule.exceptions:
+            # A failed rule with exceptions needs judgement, so it stays unresolved
+            failed.append(rule.condition)
+
+    if failed:
+        return EligibilityResult(
+            status="not_eligible",
+            reasoning=[f"Does not meet: {c}" for c in failed],
+            failed_conditions=failed,
+        )
+    if len(passed) == len(mandatory):
+        return EligibilityResult(status="eligible", reasoning=[f"Meets: {c}" for c in passed])
+    return None
+
+
+def decide_eligibility(profile: Optional[CitizenProfile], scheme_name: str,
+                       analysis: PolicyAnalysisOutput) -> Optional[EligibilityAnalysisOutput]:
+    """EligibilityAnalysisOutput for a scheme when its rules decide it outright, else None."""
+    if profile is None:
+        return None
+    result = evaluate_rules(analysis.eligibility_rules, profile)
+    if result is None:
+        return None
+
+    eligible = result.status == "eligible"
+    return EligibilityAnalysisOutput(
+        citizen_profile_summary=profile,
+        eligibility_result=result,
+        matched_benefits=[
+            MatchedBenefit(scheme_name=scheme_name, benefit_type=b.benefit_type,
+                           benefit_value=b.value or b.description, confidence_score=0.95)
+            for b in analysis.benefits
+        ] if eligible else [],
+        next_steps=[o.action for o in analysis.obligations] if eligible else [],
+        appeal_guidance=AppealGuidance(
+            is_applicable=not eligible,
+            reason=None if eligible else "If your details above are wrong, correct them and apply again.",
+        ),
+        risk_level="low",
+        overall_confidence_score=0.95,
+    )
+
+
+def evaluate_scheme_eligibility(query: str, profile: Optional[CitizenProfile]) -> Optional[EligibilityAnalysisOutput]:
+    """Rule-based answer for the cataloged scheme named in `query`, or None to defer to the LLM."""
+    from src.scheme_catalog import lookup_scheme
+
+    hit = lookup_scheme(query)
+    if hit is None:
+        return None
+    scheme_id, analysis = hit
+    decided = decide_eligibility(profile, analysis.metadata.policy_name or scheme_id, analysis)
+    if decided:
+        logger.info(f"Eligibility for {scheme_id} decided by rules: {decided.eligibility_result.status}")
+    return decided
@@ -5,6 +5,7 @@ from src.eligibility_state import EligibilityState
 from src.schemas import EligibilityAnalysisOutput, CitizenProfile
 from src.agents import llm
 from src.logger import setup_logger
+from src.prompt_packer import pack_prompt, analysis_section, profile_section, question_section
 from src.cache_helper import CacheHelper
 
 logger = setup_logger("EligibilityAgent")
@@ -13,7 +14,7 @@ logger = setup_logger("EligibilityAgent")
 
 PROFILE_EXTRACTION_PROMPT = """
 Extract citizen profile information from the user's query.
-Look for: age, income, category/caste, location (state/district), education level, employment status, family size, special conditions (disability, widow, senior, etc.).
+Look for: age, gender, income, category/caste, location (state/district), education level, employment status, family size, special conditions (disability, widow, senior, etc.).
 
 User query: {query}
 
@@ -119,7 +120,7 @@ def profile_extraction_node(state: EligibilityState):
     query = state["input_text"]
     try:
         structured_llm = llm.with_structured_output(CitizenProfile)
-        prompt = PROFILE_EXTRACTION_PROMPT.format(query=query)
+        prompt = pack_prompt(PROFILE_EXTRACTION_PROMPT, query=question_section(query))
         
         profile = structured_llm.invoke([HumanMessage(content=prompt)])
         return {"citizen_profile": profile}
@@ -138,22 +139,36 @@ def eligibility_evaluation_node(state: EligibilityState):
     else:
         profile_str = str(profile.model_dump())
         location = profile.location or "Unknown"
+
+    # Clear-cut threshold/category rules of a cataloged scheme don't need the LLM
+    try:
+        from src.eligibility_rules import evaluate_scheme_eligibility
+        decided = evaluate_scheme_eligibility(query, profile)
+        if decided:
+            return {"analysis_output": decided}
+    except Exception as e:
+        logger.warning(f"Rule-based eligibility check failed: {e}")
     
     # Check cache
     cache_key = CacheHelper.hash_query(query, profile_str)
-    cached_result = CacheHelper.get_llm_cache(cache_key)
+    cached_result = CacheHelper.get_llm_cache(cache_key, prompt=ELIGIBILITY_EVALUATION_PROMPT)
     if cached_result:
         logger.info("Using cached eligibility result")
         return {"analysis_output": cached_result}
     
     try:
         structured_llm = llm.with_structured_output(EligibilityAnalysisOutput)
-        prompt = ELIGIBILITY_EVALUATION_PROMPT.format(profile=profile_str, query=query, location=location)
-        
-        analysis = structured_llm.invoke([HumanMessage(content=prompt)])
+        prompt = pack_prompt(
+            ELIGIBILITY_EVALUATION_PROMPT,
+            profile=profile_section(profile_str),
+            query=question_section(query),
+            location=location
+        )
         
-        # Cache the result
-        CacheHelper.set_llm_cache(cache_key, analysis)
+        # Identical concurrent requests share one LLM call, which is then cached
+        analysis = CacheHelper.compute_llm(
+            cache_key, lambda: structured_llm.invoke([HumanMessage(content=prompt)]), prompt=ELIGIBILITY_EVALUATION_PROMPT
+        )
         
         return {"analysis_output": analysis}
     except Exception as e:
@@ -170,7 +185,7 @@ def synthesis_node(state: EligibilityState):
     
     try:
         analysis_dict = analysis.model_dump()
-        prompt = SYNTHESIS_PROMPT.format(analysis=str(analysis_dict), language=language)
+        prompt = pack_prompt(SYNTHESIS_PROMPT, analysis=analysis_section(str(analysis_dict)), language=language)
         
         response = llm.invoke([HumanMessage(content=prompt)])
         return {
@@ -0,0 +1,94 @@
+"""
+Micro-batching wrapper for query embeddings.
+
+Flask runs with threaded=True, so concurrent requests would otherwise each
+call the encoder separately and fight over the GIL and torch threads. Here
+queries arriving within a short window are queued, encoded together in one
+`embed_documents` call on a single worker thread, and the vectors are handed
+back to the waiting callers.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List
+
+from langchain_core.embeddings import Embeddings
+from src.logger import setup_logger
+
+logger = setup_logger("EmbeddingBatcher")
+
+
+class BatchingEmbeddings(Embeddings):
+    """Embeddings wrapper that coalesces concurrent `embed_query` calls."""
+
+    def __init__(self, inner: Embeddings, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.inner = inner
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._stats = {"queries": 0, "batches": 0, "max_batch": 0}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        # Callers embedding many texts already batch; no need to queue them
+        return self.inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future.result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queries served, batches run and the largest batch seen."""
+        stats = dict(self._stats)
+        stats["avg_batch"] = round(stats["queries"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect_batch(self):
+        # Block for the first item, then keep collecting until the window
+        # closes or the batch is full
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+
+            # Identical queries in the same window are encoded once
+            unique_texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vectors = self.inner.embed_documents(unique_texts)
+            except Exception as e:
+                logger.error(f"Batched embedding of {len(unique_texts)} queries failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            by_text = dict(zip(unique_texts, vectors))
+            for text, future in batch:
+                future.set_result(by_text[text])
+
+            self._stats["queries"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
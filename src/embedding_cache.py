@@ -0,0 +1,217 @@
+"""
+Persistent query -> embedding cache.
+
+Vectors live in a memory-mapped float16 `.npy` file next to a uint64 hash
+table (open addressing, linear probing), so the cache survives restarts and
+every gunicorn worker maps the same pages read-only. Inserts take a file
+lock and write through a separate read-write mapping; the vector is written
+before its key so readers never see a key without its vector.
+
+A key is only ever stored within MAX_PROBE slots of its home slot, so
+lookups stay short however full the table gets. When every slot in that
+window is taken, the window's last slot is overwritten. Its key is cleared
+first and readers re-check the key after copying the vector, so a reader
+never returns a vector that is being replaced. Slots are never emptied, so
+other keys' probe chains stay intact. The number of occupied slots is kept
+in a header slot after the table, so inserts don't have to count them.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src.logger import setup_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: fall back to in-process locking only
+    fcntl = None
+
+logger = setup_logger("EmbeddingCache")
+
+META_FILE = "meta.json"
+KEYS_FILE = "keys.npy"
+VECTORS_FILE = "vectors.npy"
+LOCK_FILE = ".lock"
+# Longest probe sequence; a full window evicts its last slot
+MAX_PROBE = 16
+# Bumped when the file layout changes, so old files are recreated
+LAYOUT_VERSION = 2
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+class QueryEmbeddingCache:
+    """Memory-mapped hash table of query embeddings shared across processes."""
+
+    def __init__(self, path: str, model_name: str, capacity: int = 16384):
+        self.path = path
+        self.model_name = model_name
+        self.capacity = capacity
+
+        self._keys = None
+        self._vectors = None
+        self._write_keys = None
+        self._write_vectors = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "inserts": 0, "evictions": 0}
+
+        os.makedirs(path, exist_ok=True)
+        self._open_readers()
+
+    # --- Hashing ---
+
+    def _hash(self, text: str) -> int:
+        digest = hashlib.blake2b(f"{self.model_name}\0{_normalize(text)}".encode(), digest_size=8).digest()
+        # 0 marks an empty slot
+        return int.from_bytes(digest, "little") or 1
+
+    def _probe(self, keys: np.ndarray, key: int) -> int:
+        """Return the slot holding `key`, or the empty slot where it would go (-1 if its window is full)."""
+        slot = key % self.capacity
+        for _ in range(min(MAX_PROBE, self.capacity)):
+            current = int(keys[slot])
+            if current == key or current == 0:
+                return slot
+            slot = (slot + 1) % self.capacity
+        return -1
+
+    def _window_end(self, key: int) -> int:
+        return (key + min(MAX_PROBE, self.capacity) - 1) % self.capacity
+
+    # --- File handling ---
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _meta_matches(self) -> bool:
+        try:
+            with open(self._file(META_FILE)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return (meta.get("model_name") == self.model_name and meta.get("capacity") == self.capacity
+                and meta.get("layout") == LAYOUT_VERSION)
+
+    def _open_readers(self) -> bool:
+        if self._keys is not None:
+            return True
+        if not self._meta_matches():
+            return False
+        try:
+            self._keys = np.load(self._file(KEYS_FILE), mmap_mode="r")
+            self._vectors = np.load(self._file(VECTORS_FILE), mmap_mode="r")
+            return True
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not map query embedding cache: {e}")
+            self._keys = self._vectors = None
+            return False
+
+    def _create_files(self, dim: int):
+        """Allocate fresh files; meta.json is written last so readers never map half-built files."""
+        for name in (META_FILE, KEYS_FILE, VECTORS_FILE):
+            if os.path.exists(self._file(name)):
+                os.remove(self._file(name))
+
+        # The extra slot at the end holds the occupied count
+        keys = np.lib.format.open_memmap(self._file(KEYS_FILE), mode="w+", dtype=np.uint64,
+                                         shape=(self.capacity + 1,))
+        vectors = np.lib.format.open_memmap(
+            self._file(VECTORS_FILE), mode="w+", dtype=np.float16, shape=(self.capacity, dim)
+        )
+        keys.flush()
+        vectors.flush()
+        del keys, vectors
+
+        tmp_meta = self._file(META_FILE + ".tmp")
+        with open(tmp_meta, "w") as f:
+            json.dump({"model_name": self.model_name, "capacity": self.capacity, "dim": dim,
+                       "layout": LAYOUT_VERSION}, f)
+        os.replace(tmp_meta, self._file(META_FILE))
+        logger.info(f"Created query embedding cache at {self.path} ({self.capacity} x {dim} float16)")
+
+    def _open_writers(self, dim: int):
+        if self._write_keys is not None:
+            return
+        if not self._meta_matches():
+            self._create_files(dim)
+            self._keys = self._vectors = None
+        self._write_keys = np.load(self._file(KEYS_FILE), mmap_mode="r+")
+        self._write_vectors = np.load(self._file(VECTORS_FILE), mmap_mode="r+")
+        self._open_readers()
+
+    # --- Public API ---
+
+    def get(self, text: str) -> Optional[List[float]]:
+        if not self._open_readers():
+            self._stats["misses"] += 1
+            return None
+
+        key = self._hash(text)
+        slot = self._probe(self._keys, key)
+        if slot >= 0 and int(self._keys[slot]) == key:
+            vector = self._vectors[slot].astype(np.float32).tolist()
+            # A writer may have evicted the slot while we copied it
+            if int(self._keys[slot]) == key:
+                self._stats["hits"] += 1
+                return vector
+
+        self._stats["misses"] += 1
+        return None
+
+    def put(self, text: str, vector: List[float]):
+        key = self._hash(text)
+        with self._lock:
+            lock_file = open(self._file(LOCK_FILE), "a")
+            try:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._open_writers(len(vector))
+
+                slot = self._probe(self._write_keys, key)
+                if slot >= 0 and int(self._write_keys[slot]) == key:
+                    return
+                if slot < 0:
+                    # Window full: clear the key before replacing its vector
+                    slot = self._window_end(key)
+                    self._write_keys[slot] = 0
+                    self._stats["evictions"] += 1
+                else:
+                    self._write_keys[self.capacity] += 1
+
+                self._write_vectors[slot] = np.asarray(vector, dtype=np.float16)
+                self._write_keys[slot] = key
+                self._stats["inserts"] += 1
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not write to query embedding cache: {e}")
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+
+    def stats(self) -> Dict[str, Any]:
+        entries = int(self._keys[self.capacity]) if self._open_readers() else 0
+        return dict(self._stats, capacity=self.capacity, entries=entries)
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """Embeddings wrapper that consults a QueryEmbeddingCache before encoding."""
+
+    def __init__(self, inner: Embeddings, cache: QueryEmbeddingCache):
+        self.inner = inner
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(text)
+        if vector is None:
+            vector = self.inner.embed_query(text)
+            self.cache.put(text, vector)
+        return vector
@@ -0,0 +1,180 @@
+"""
+Exact brute-force vector search with NumPy.
+
+The policy corpus is small enough that one matrix-vector product beats an
+HNSW graph walk plus SQLite metadata lookups. All collection embeddings are
+exported once into a contiguous `.npy` matrix (rows L2-normalised, so a dot
+product is cosine similarity) with the documents pickled beside it; a query
+is then a single `matrix @ q` and an `argpartition` top-k.
+
+float32 files are memory-mapped read-only and shared across workers.
+float16 halves the file size but is upcast into each worker's memory, since
+NumPy has no fast float16 matmul.
+"""
+import json
+import os
+import pickle
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.rag import INDEX_CACHE_DIR, corpus_fingerprint, get_embeddings, iter_corpus
+from src.retrieval_filters import (
+    LEVEL_KEY, SCHEME_KEY, STATE_KEY, RetrievalFilters, filter_clauses
+)
+from src.logger import setup_logger
+
+logger = setup_logger("ExactSearch")
+
+EXACT_INDEX_DIR = os.path.join(INDEX_CACHE_DIR, "exact")
+EXACT_INDEX_DTYPE = os.getenv("EXACT_INDEX_DTYPE", "float32")
+
+MATRIX_FILE = "embeddings.npy"
+DOCS_FILE = "documents.pkl"
+META_FILE = "meta.json"
+
+_NO_ROWS = np.zeros(0, dtype=np.int64)
+
+
+class ExactIndex:
+    """Row-normalised embedding matrix plus the documents it was built from."""
+
+    def __init__(self, matrix: np.ndarray, documents: List[Document]):
+        self.matrix = matrix
+        self.documents = documents
+        # metadata key -> value -> row numbers, so filtered search scores only its partition
+        self.partitions: Dict[str, Dict[Any, np.ndarray]] = {
+            key: self._build_partition(key) for key in (STATE_KEY, LEVEL_KEY, SCHEME_KEY)
+        }
+
+    def _build_partition(self, key: str) -> Dict[Any, np.ndarray]:
+        groups = defaultdict(list)
+        for row, doc in enumerate(self.documents):
+            value = doc.metadata.get(key)
+            if value is not None:
+                groups[value].append(row)
+        return {value: np.asarray(rows, dtype=np.int64) for value, rows in groups.items()}
+
+    def rows_matching(self, filters: RetrievalFilters) -> np.ndarray:
+        """Rows satisfying every filter clause, from the precomputed partitions."""
+        rows = None
+        for clause in filter_clauses(filters):
+            partition_rows = [self.partitions.get(key, {}).get(value, _NO_ROWS) for key, value in clause]
+            clause_rows = np.unique(np.concatenate(partition_rows))
+            rows = clause_rows if rows is None else np.intersect1d(rows, clause_rows, assume_unique=True)
+        return np.arange(len(self.documents)) if rows is None else rows
+
+    def search(self, query_vector: np.ndarray, k: int, rows: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """Top-k (row, cosine) pairs by dot product, optionally within a subset of rows."""
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        n = matrix.shape[0]
+        if n == 0:
+            return []
+        q = np.asarray(query_vector, dtype=np.float32)
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+
+        scores = matrix @ q
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        row_ids = top if rows is None else rows[top]
+        return [(int(r), float(scores[i])) for r, i in zip(row_ids, top)]
+
+    def save(self, path: str, fingerprint: str, dtype: str = EXACT_INDEX_DTYPE):
+        os.makedirs(path, exist_ok=True)
+        # Write-then-rename: other workers may have the old matrix mapped
+        matrix_path = os.path.join(path, MATRIX_FILE)
+        with open(matrix_path + ".tmp", "wb") as f:
+            np.save(f, np.ascontiguousarray(self.matrix, dtype=dtype))
+        os.replace(matrix_path + ".tmp", matrix_path)
+
+        docs_path = os.path.join(path, DOCS_FILE)
+        with open(docs_path + ".tmp", "wb") as f:
+            pickle.dump(self.documents, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(docs_path + ".tmp", docs_path)
+
+        # Written last: a meta file matching the fingerprint means the other two are complete
+        meta_path = os.path.join(path, META_FILE)
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({"fingerprint": fingerprint, "dtype": dtype, "rows": len(self.documents)}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: Optional[str] = None) -> Optional["ExactIndex"]:
+        """Load a saved index; returns None if missing or built from another corpus."""
+        try:
+            with open(os.path.join(path, META_FILE)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if fingerprint is not None and meta.get("fingerprint") != fingerprint:
+            return None
+
+        matrix = np.load(os.path.join(path, MATRIX_FILE), mmap_mode="r")
+        if matrix.dtype != np.float32:
+            matrix = matrix.astype(np.float32)
+        with open(os.path.join(path, DOCS_FILE), "rb") as f:
+            documents = pickle.load(f)
+        return cls(matrix, documents)
+
+
+def export_exact_index(path: str = EXACT_INDEX_DIR, dtype: str = EXACT_INDEX_DTYPE) -> ExactIndex:
+    """Copy every embedding and document out of Chroma into an ExactIndex."""
+    started = time.perf_counter()
+    fingerprint = corpus_fingerprint()
+
+    vectors, documents = [], []
+    for page in iter_corpus(include=("embeddings", "documents", "metadatas")):
+        vectors.append(np.asarray(page["embeddings"], dtype=np.float32))
+        documents.extend(
+            Document(id=doc_id, page_content=text or "", metadata=metadata or {})
+            for doc_id, text, metadata in zip(page["ids"], page["documents"], page["metadatas"])
+        )
+
+    matrix = np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+    if matrix.size:
+        matrix /= np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+
+    index = ExactIndex(matrix, documents)
+    index.save(path, fingerprint, dtype=dtype)
+    logger.info(f"Exported {len(documents)} embeddings ({dtype}) to {path} in {time.perf_counter() - started:.1f}s")
+    return ExactIndex.load(path)
+
+
+def load_or_export_exact_index(path: str = EXACT_INDEX_DIR) -> ExactIndex:
+    index = ExactIndex.load(path, fingerprint=corpus_fingerprint())
+    if index is not None:
+        logger.info(f"Loaded exact index ({len(index.documents)} docs) from {path}")
+        return index
+    return export_exact_index(path)
+
+
+class ExactRetriever:
+    """Retriever interface over an ExactIndex."""
+
+    supports_filters = True
+
+    def __init__(self, index: ExactIndex, k: int = 3):
+        self.index = index
+        self.k = k
+
+    def invoke(self, query: str, filters: Optional[RetrievalFilters] = None) -> List[Document]:
+        rows = self.index.rows_matching(filters) if filters else None
+        query_vector = get_embeddings().embed_query(query)
+        return [self.index.documents[row] for row, _ in self.index.search(query_vector, self.k, rows=rows)]
+
+
+def build_exact_retriever(k: int = 3) -> ExactRetriever:
+    return ExactRetriever(load_or_export_exact_index(), k=k)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export Chroma embeddings for exact search.")
+    parser.add_argument("--dtype", choices=["float32", "float16"], default=EXACT_INDEX_DTYPE)
+    args = parser.parse_args()
+    export_exact_index(dtype=args.dtype)
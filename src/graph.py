@@ -37,8 +37,23 @@ def orchestrator_node(state: AgentState):
             
         language = state.get("language", "en")
         
+        # Clear-cut requests are routed locally from embedded examples (see src/intent_router.py)
+        from src.intent_router import log_decision, route_query
+        query = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+        # The router sees only the last message, so ongoing conversations stay with the LLM
+        fresh_request = len(messages) <= 1 or not state.get("current_intent")
+        try:
+            routed = route_query(query) if fresh_request else None
+        except Exception as e:
+            logger.warning(f"Intent router failed, asking the orchestrator LLM: {e}")
+            routed = None
+        if routed:
+            return {"current_intent": routed.label}
+        
         # Pass language to agent for prompt formatting
         decision = orchestrator_agent.invoke({"messages": messages, "language": language})
+        if isinstance(query, str) and query:
+            log_decision(query, decision.next_agent, "llm")
         return {"current_intent": decision.next_agent}
     except Exception as e:
         logger.error(f"Orchestrator Error: {e}")
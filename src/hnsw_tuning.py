@@ -0,0 +1,253 @@
+"""
+HNSW search settings for the Chroma collection, with a calibration sweep.
+
+Chroma's HNSW index is opened with library defaults (ef_search=100, M=16),
+and only `k` was configurable. `ef_search` is the size of the candidate list
+walked per query. It trades latency for recall and can be changed on a live
+collection. `M` (max_neighbors) and `ef_construction` shape the graph itself,
+so they only take effect when a collection is created. src/ingest.py applies
+them to a fresh chroma_db.
+
+`python -m src.hnsw_tuning calibrate` embeds the golden questions from
+docs/SAMPLE_QUESTIONS.md, plus a sample of stored chunk vectors for more
+resolution. Ground truth is an exact brute-force top-k in the collection's
+distance space. The sweep times every ef_search in the grid, and every M, on
+throwaway in-memory copies of the collection. The live collection is never
+modified mid-sweep, so an interrupted calibration can't leave production at
+a low ef_search. For each M it keeps the smallest ef_search whose recall@k
+meets the target, then picks the M with the lowest measured p95. The choice
+is written to chroma_hnsw.json next to chroma_db, and get_vector_store()
+applies it.
+"""
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Ensure project root is in path to allow 'src' imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.rag import CHROMA_PATH
+from src.logger import setup_logger
+
+logger = setup_logger("HnswTuning")
+
+HNSW_SETTINGS_PATH = os.getenv("HNSW_SETTINGS_PATH", os.path.join(os.path.dirname(CHROMA_PATH), "chroma_hnsw.json"))
+# Overrides the calibrated value, e.g. to trade recall for latency under load
+HNSW_EF_SEARCH = os.getenv("HNSW_EF_SEARCH")
+HNSW_TARGET_RECALL = float(os.getenv("HNSW_TARGET_RECALL", "0.95"))
+
+EF_SEARCH_GRID = [10, 16, 24, 32, 48, 64, 100, 150, 200]
+DEFAULT_EF_CONSTRUCTION = 100
+
+
+# --- Settings file ---
+
+def load_settings(path: str = HNSW_SETTINGS_PATH) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_settings(settings: Dict[str, Any], path: str = HNSW_SETTINGS_PATH):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(settings, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def search_settings(path: str = HNSW_SETTINGS_PATH) -> Dict[str, Any]:
+    """Calibrated settings with the HNSW_EF_SEARCH override applied."""
+    settings = load_settings(path)
+    if HNSW_EF_SEARCH:
+        settings["ef_search"] = int(HNSW_EF_SEARCH)
+    return settings
+
+
+def creation_metadata(path: str = HNSW_SETTINGS_PATH) -> Optional[Dict[str, Any]]:
+    """Collection metadata that builds a new collection's graph with the calibrated M."""
+    settings = load_settings(path)
+    if not settings.get("max_neighbors"):
+        return None
+    return {
+        "hnsw:M": int(settings["max_neighbors"]),
+        "hnsw:construction_ef": int(settings.get("ef_construction", DEFAULT_EF_CONSTRUCTION)),
+    }
+
+
+def hnsw_config(collection) -> Dict[str, Any]:
+    return (collection.configuration_json or {}).get("hnsw") or {}
+
+
+def set_ef_search(collection, ef_search: int):
+    if hnsw_config(collection).get("ef_search") != ef_search:
+        collection.modify(configuration={"hnsw": {"ef_search": int(ef_search)}})
+
+
+def apply_search_settings(collection, path: str = HNSW_SETTINGS_PATH) -> Optional[int]:
+    """Set the configured ef_search on `collection`; returns it (None if not configured)."""
+    ef_search = search_settings(path).get("ef_search")
+    if ef_search:
+        set_ef_search(collection, int(ef_search))
+        logger.info(f"HNSW ef_search={ef_search}")
+    return ef_search
+
+
+# --- Calibration ---
+
+def exact_top_k(matrix: np.ndarray, queries: np.ndarray, k: int, space: str) -> List[List[int]]:
+    """Brute-force nearest rows per query in the collection's distance space."""
+    if space == "cosine":
+        matrix = matrix / np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+        queries = queries / np.clip(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12, None)
+    if space == "l2":
+        # |m - q|^2 = |m|^2 - 2 m.q + |q|^2; |q|^2 doesn't change the ranking
+        scores = 2 * queries @ matrix.T - (matrix ** 2).sum(axis=1)
+    else:
+        scores = queries @ matrix.T
+    k = min(k, matrix.shape[0])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [list(row[np.argsort(-scores[i, row])]) for i, row in enumerate(top)]
+
+
+def measure(collection, queries: np.ndarray, truth: Sequence[set], k: int, runs: int = 3) -> Dict[str, float]:
+    """Mean recall@k against `truth` and latency percentiles of collection.query."""
+    latencies, recalls = [], []
+    for vector, expected in zip(queries, truth):
+        for _ in range(runs):
+            started = time.perf_counter()
+            result = collection.query(query_embeddings=[vector.tolist()], n_results=k, include=[])
+            latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(len(expected & set(result["ids"][0])) / max(len(expected), 1))
+    return {
+        "recall": round(float(np.mean(recalls)), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+    }
+
+
+def _load_vectors():
+    from src.rag import iter_corpus
+
+    ids, vectors = [], []
+    for page in iter_corpus(include=("embeddings",)):
+        ids.extend(page["ids"])
+        vectors.append(np.asarray(page["embeddings"], dtype=np.float32))
+    return ids, np.vstack(vectors)
+
+
+def _copy_collection(ids, matrix, space: str, max_neighbors: int, ef_construction: int):
+    """In-memory copy of the corpus indexed with the given M, for sweeping ef_search safely."""
+    import chromadb
+
+    client = chromadb.EphemeralClient()
+    copy = client.create_collection(
+        f"hnsw-m{max_neighbors}-{uuid.uuid4().hex[:8]}",
+        metadata={"hnsw:space": space, "hnsw:M": max_neighbors, "hnsw:construction_ef": ef_construction},
+    )
+    batch = client.get_max_batch_size()
+    for start in range(0, len(ids), batch):
+        copy.add(ids=ids[start:start + batch], embeddings=matrix[start:start + batch].tolist())
+    return client, copy
+
+
+def calibrate(target_recall: float = HNSW_TARGET_RECALL, k: int = 3,
+              ef_grid: Sequence[int] = EF_SEARCH_GRID, m_grid: Sequence[int] = (),
+              sample_queries: int = 50, runs: int = 3, save: bool = True) -> Dict[str, Any]:
+    """Sweep ef_search (and optionally M) and persist the cheapest setting meeting `target_recall`."""
+    from src.rag import corpus_fingerprint, get_embeddings, get_vector_store
+    from src.retrieval_eval import load_golden_set
+
+    collection = get_vector_store()._collection
+    current = hnsw_config(collection)
+    space = current.get("space", "l2")
+    live_m = current.get("max_neighbors", 16)
+    ef_construction = current.get("ef_construction", DEFAULT_EF_CONSTRUCTION)
+
+    ids, matrix = _load_vectors()
+    questions = [q.question for q in load_golden_set()]
+    queries = [np.asarray(get_embeddings().embed_documents(questions), dtype=np.float32)]
+    if sample_queries:
+        rows = random.Random(0).sample(range(len(ids)), min(sample_queries, len(ids)))
+        queries.append(matrix[rows])
+    queries = np.vstack(queries)
+    truth = [{ids[row] for row in top} for top in exact_top_k(matrix, queries, k, space)]
+    logger.info(f"Calibrating on {len(queries)} queries ({len(questions)} golden) over {len(ids)} chunks, k={k}")
+
+    results = []
+    for m in sorted(set(m_grid) | {live_m}):
+        client, target = _copy_collection(ids, matrix, space, m, ef_construction)
+        try:
+            for ef in sorted(ef_grid):
+                set_ef_search(target, ef)
+                stats = measure(target, queries, truth, k, runs)
+                results.append({"max_neighbors": m, "ef_search": ef, **stats})
+                logger.info(f"M={m:<3} ef_search={ef:<4} recall={stats['recall']:.3f} p95={stats['p95_ms']:.2f}ms")
+        finally:
+            client.delete_collection(target.name)
+
+    # Within one M a smaller ef_search is strictly less work; across M values compare measured latency
+    cheapest_per_m = {}
+    for r in results:
+        if r["recall"] >= target_recall and r["max_neighbors"] not in cheapest_per_m:
+            cheapest_per_m[r["max_neighbors"]] = r
+    if cheapest_per_m:
+        best = min(cheapest_per_m.values(), key=lambda r: r["p95_ms"])
+    else:
+        best = max(results, key=lambda r: (r["recall"], -r["p95_ms"]))
+        logger.warning(f"No setting reached recall {target_recall}; using the most accurate one.")
+
+    settings = {
+        "ef_search": best["ef_search"],
+        "max_neighbors": best["max_neighbors"],
+        "ef_construction": ef_construction,
+        "k": k,
+        "target_recall": target_recall,
+        "recall": best["recall"],
+        "p95_ms": best["p95_ms"],
+        "corpus": corpus_fingerprint(),
+        "calibrated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sweep": results,
+    }
+    if best["max_neighbors"] != live_m:
+        logger.warning(f"Best M={best['max_neighbors']} differs from the live collection's M={live_m}; "
+                       "it applies when chroma_db is rebuilt with src/ingest.py.")
+    if save:
+        save_settings(settings)
+        set_ef_search(collection, best["ef_search"])
+        logger.info(f"Saved HNSW settings to {HNSW_SETTINGS_PATH}")
+    return settings
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HNSW search settings for the Chroma collection.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    calibrate_parser = subparsers.add_parser("calibrate", help="Sweep ef_search (and M) against the golden set")
+    calibrate_parser.add_argument("--target-recall", type=float, default=HNSW_TARGET_RECALL)
+    calibrate_parser.add_argument("--k", type=int, default=3)
+    calibrate_parser.add_argument("--ef", type=int, nargs="+", default=EF_SEARCH_GRID)
+    calibrate_parser.add_argument("--m", type=int, nargs="*", default=[],
+                                  help="Also try these M values besides the live collection's")
+    calibrate_parser.add_argument("--sample-queries", type=int, default=50,
+                                  help="Stored chunk vectors added as extra queries")
+    calibrate_parser.add_argument("--runs", type=int, default=3)
+    calibrate_parser.add_argument("--dry-run", action="store_true", help="Report without saving")
+    subparsers.add_parser("show", help="Print the saved settings and the live collection's configuration")
+    args = parser.parse_args()
+
+    if args.command == "calibrate":
+        settings = calibrate(args.target_recall, args.k, args.ef, args.m, args.sample_queries, args.runs,
+                             save=not args.dry_run)
+        print(json.dumps({key: value for key, value in settings.items() if key != "sweep"}, indent=2))
+    else:
+        from src.rag import get_vector_store
+        print(json.dumps({"saved": load_settings(), "live": hnsw_config(get_vector_store()._collection)}, indent=2))
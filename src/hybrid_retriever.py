@@ -0,0 +1,203 @@
+"""
+Hybrid retrieval: BM25 over the Chroma corpus fused with vector search.
+
+Scheme names such as "PM-SVANidhi" or "PM-KISAN" are exact-match tokens that
+dense mpnet retrieval often ranks poorly. A lexical BM25 index catches them,
+and reciprocal rank fusion (RRF) merges both rankings without having to
+calibrate their scores against each other.
+
+The inverted index is built once from the documents stored in Chroma and
+pickled to INDEX_CACHE_DIR; it is rebuilt only when the corpus fingerprint
+changes.
+"""
+import math
+import os
+import pickle
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.rag import (
+    INDEX_CACHE_DIR, corpus_fingerprint, doc_key, get_documents_by_ids,
+    iter_corpus, search_collection
+)
+from src.retrieval_filters import RetrievalFilters, matches, to_chroma_where
+from src.logger import setup_logger
+
+logger = setup_logger("HybridRetriever")
+
+BM25_INDEX_PATH = os.path.join(INDEX_CACHE_DIR, "bm25_index.pkl")
+# How many candidates each ranker contributes before fusion
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+# Standard RRF damping constant (Cormack et al.)
+RRF_K = 60
+
+# ASCII words plus Devanagari and Kannada script
+_TOKEN_RE = re.compile(r"[a-z0-9\u0900-\u097f\u0c80-\u0cff]+(?:-[a-z0-9]+)*")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "i", "in", "is", "it",
+    "me", "my", "of", "on", "or", "the", "this", "to", "what", "which", "who", "with", "can", "do",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens. Hyphenated names are indexed whole, joined and as
+    parts, so "PM-KISAN", "pm kisan" and "pmkisan" all match each other.
+    """
+    tokens = []
+    for match in _TOKEN_RE.findall(text.lower()):
+        if "-" in match:
+            parts = match.split("-")
+            tokens.append(match)
+            tokens.append("".join(parts))
+            tokens.extend(p for p in parts if p not in _STOPWORDS)
+        elif match not in _STOPWORDS:
+            tokens.append(match)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Document]], k: int = RRF_K) -> List[Document]:
+    """Merge ranked document lists; documents appearing in several lists rise to the top."""
+    scores: Dict[str, float] = defaultdict(float)
+    docs: Dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            key = doc_key(doc)
+            scores[key] += 1.0 / (k + rank + 1)
+            docs.setdefault(key, doc)
+    ordered = sorted(scores, key=scores.get, reverse=True)
+    return [docs[key] for key in ordered]
+
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 scoring."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: List[str] = []
+        self.doc_lengths = np.zeros(0, dtype=np.float32)
+        self.avg_doc_length = 0.0
+        # term -> (document positions, term frequencies, idf)
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray, float]] = {}
+        self.fingerprint: Optional[str] = None
+
+    def build(self, documents: Sequence[Tuple[str, str]]):
+        """Index (doc_id, text) pairs."""
+        raw_postings: Dict[str, Tuple[List[int], List[int]]] = defaultdict(lambda: ([], []))
+        lengths = []
+        for position, (doc_id, text) in enumerate(documents):
+            counts = Counter(tokenize(text or ""))
+            self.doc_ids.append(doc_id)
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                positions, tfs = raw_postings[term]
+                positions.append(position)
+                tfs.append(tf)
+
+        n_docs = len(self.doc_ids)
+        self.doc_lengths = np.asarray(lengths, dtype=np.float32)
+        self.avg_doc_length = float(self.doc_lengths.mean()) if n_docs else 0.0
+        for term, (positions, tfs) in raw_postings.items():
+            df = len(positions)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            self.postings[term] = (np.asarray(positions, dtype=np.int32), np.asarray(tfs, dtype=np.float32), idf)
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Top-k (doc_id, score) pairs for `query`."""
+        if not self.doc_ids:
+            return []
+
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / max(self.avg_doc_length, 1e-9))
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            positions, tfs, idf = posting
+            scores[positions] += idf * tfs * (self.k1 + 1) / (tfs + norm[positions])
+
+        matched = np.flatnonzero(scores)
+        if matched.size == 0:
+            return []
+        k = min(k, matched.size)
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [(self.doc_ids[i], float(scores[i])) for i in top]
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        index = cls()
+        with open(path, "rb") as f:
+            index.__dict__.update(pickle.load(f))
+        return index
+
+
+def load_or_build_bm25_index(path: str = BM25_INDEX_PATH) -> BM25Index:
+    """Load the pickled index if it matches the current corpus, otherwise rebuild it."""
+    fingerprint = corpus_fingerprint()
+
+    if os.path.exists(path):
+        try:
+            index = BM25Index.load(path)
+            if index.fingerprint == fingerprint:
+                logger.info(f"Loaded BM25 index ({len(index.doc_ids)} docs) from {path}")
+                return index
+            logger.info("Corpus changed since BM25 index was built; rebuilding.")
+        except Exception as e:
+            logger.warning(f"Could not load BM25 index: {e}. Rebuilding.")
+
+    started = time.perf_counter()
+    documents = []
+    for page in iter_corpus(include=("documents",)):
+        documents.extend(zip(page["ids"], page["documents"]))
+
+    index = BM25Index()
+    index.build(documents)
+    index.fingerprint = fingerprint
+    index.save(path)
+    logger.info(f"Built BM25 index over {len(documents)} docs in {time.perf_counter() - started:.1f}s")
+    return index
+
+
+class HybridRetriever:
+    """Fuses BM25 and vector rankings with RRF and returns the top k documents."""
+
+    supports_filters = True
+
+    def __init__(self, bm25: BM25Index, k: int = 3, candidates: int = HYBRID_CANDIDATES):
+        self.bm25 = bm25
+        self.k = k
+        self.candidates = candidates
+
+    def invoke(self, query: str, filters: Optional[RetrievalFilters] = None) -> List[Document]:
+        where = to_chroma_where(filters) if filters else None
+        dense = search_collection(query, k=self.candidates, where=where)
+        lexical_ids = [doc_id for doc_id, _ in self.bm25.search(query, k=self.candidates)]
+
+        # Reuse the dense hits' text; only fetch lexical hits we don't have yet
+        known = {doc_key(d): d for d in dense}
+        missing = [doc_id for doc_id in lexical_ids if doc_id not in known]
+        known.update({doc_key(d): d for d in get_documents_by_ids(missing)})
+        lexical = [known[doc_id] for doc_id in lexical_ids if doc_id in known]
+        if filters:
+            # BM25 has no metadata; filter its hits after fetching them
+            lexical = [d for d in lexical if matches(d.metadata, filters)]
+
+        return reciprocal_rank_fusion([dense, lexical])[:self.k]
+
+
+def build_hybrid_retriever(k: int = 3) -> HybridRetriever:
+    return HybridRetriever(load_or_build_bm25_index(), k=k)
@@ -0,0 +1,351 @@
+"""
+Incremental document ingestion into ChromaDB.
+
+Streams PDF / Markdown / HTML / text files through a generator-based chunker,
+embeds new chunks in batches across a process pool and upserts them. Chunk
+ids are content hashes, and every chunk records the hash of the file it came
+from, so re-running after a small edit only:
+  - skips files whose hash is unchanged,
+  - embeds chunks whose content is new,
+  - deletes chunks that no longer exist in the edited file,
+  - with --prune, deletes chunks of files that were removed from the tree.
+
+Usage (from project root):
+    python -m src.ingest path/to/docs [--workers 4] [--dry-run]
+
+Metadata written per chunk: source, file_hash, content_hash, scheme_id
+(file name slug), state and level (a state name anywhere in the file's path
+marks it as a state scheme, otherwise it is central). These are the keys
+used by src/retrieval_filters.py.
+"""
+import hashlib
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Ensure project root is in path to allow 'src' imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.rag import CHROMA_PATH
+from src.retrieval_filters import CENTRAL_LEVEL, LEVEL_KEY, SCHEME_KEY, STATE_KEY, normalize_state
+from src.logger import setup_logger
+
+logger = setup_logger("Ingest")
+
+SUPPORTED_EXTENSIONS = {".pdf", ".md", ".markdown", ".html", ".htm", ".txt"}
+CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.getenv("INGEST_CHUNK_OVERLAP", "150"))
+EMBED_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+
+
+# --- Loading ---
+
+class _HTMLTextExtractor(HTMLParser):
+    """Collects visible text, keeping block elements as paragraph breaks."""
+
+    _SKIP = {"script", "style", "noscript", "head"}
+    _BLOCK = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self._skip_depth += 1
+        elif tag in self._BLOCK:
+            self.parts.append("\n\n")
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    parser = _HTMLTextExtractor()
+    parser.feed(html)
+    return "".join(parser.parts)
+
+
+def iter_text_blocks(path: str) -> Iterator[str]:
+    """Yield a file's text in blocks (pages for PDFs) without loading all pages at once."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".pdf":
+        from pypdf import PdfReader
+
+        for page in PdfReader(path).pages:
+            yield page.extract_text() or ""
+    elif ext in (".html", ".htm"):
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            yield html_to_text(f.read())
+    else:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            yield f.read()
+
+
+def iter_source_files(root: str) -> Iterator[str]:
+    if os.path.isfile(root):
+        yield root
+        return
+    for dirpath, _, filenames in os.walk(root):
+        for name in sorted(filenames):
+            if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS:
+                yield os.path.join(dirpath, name)
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# --- Chunking ---
+
+def _split_long(paragraph: str, chunk_size: int) -> Iterator[str]:
+    while len(paragraph) > chunk_size:
+        cut = paragraph.rfind(" ", 0, chunk_size)
+        cut = cut if cut > 0 else chunk_size
+        yield paragraph[:cut].strip()
+        paragraph = paragraph[cut:].strip()
+    if paragraph:
+        yield paragraph
+
+
+def iter_chunks(blocks: Iterable[str], chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> Iterator[str]:
+    """Pack paragraphs into ~chunk_size character chunks, carrying `overlap` chars between them."""
+    buffer = ""
+    for block in blocks:
+        for raw_paragraph in re.split(r"\n\s*\n", block):
+            for paragraph in _split_long(" ".join(raw_paragraph.split()), chunk_size):
+                if buffer and len(buffer) + 1 + len(paragraph) > chunk_size:
+                    yield buffer
+                    tail = buffer[-overlap:] if overlap else ""
+                    # Start the overlap on a word boundary
+                    tail = tail[tail.find(" ") + 1:] if " " in tail else tail
+                    buffer = f"{tail} {paragraph}" if tail and len(tail) + 1 + len(paragraph) <= chunk_size else paragraph
+                else:
+                    buffer = f"{buffer} {paragraph}" if buffer else paragraph
+    if buffer:
+        yield buffer
+
+
+def chunk_id(source: str, text: str) -> str:
+    return hashlib.sha256(f"{source}\0{text}".encode()).hexdigest()[:40]
+
+
+def scheme_id_for(source: str) -> str:
+    stem = os.path.splitext(os.path.basename(source))[0].lower()
+    return re.sub(r"[^a-z0-9]+", "-", stem).strip("-")
+
+
+def metadata_for(source: str, digest: str) -> Dict[str, str]:
+    metadata = {"source": source, "file_hash": digest, SCHEME_KEY: scheme_id_for(source)}
+    state = normalize_state(source.replace("_", " ").replace("-", " "))
+    if state:
+        metadata[STATE_KEY] = state
+        metadata[LEVEL_KEY] = "state"
+    else:
+        metadata[LEVEL_KEY] = CENTRAL_LEVEL
+    return metadata
+
+
+def plan_file(source: str, chunks: Iterable[str], existing_ids: Set[str]) -> Tuple[List[Tuple[str, str]], Set[str]]:
+    """Return (new (id, text) chunks to embed, stale ids to delete) for one file."""
+    new_chunks, seen = [], set()
+    for text in chunks:
+        cid = chunk_id(source, text)
+        if cid in seen:
+            continue  # identical chunk repeated within the file
+        seen.add(cid)
+        if cid not in existing_ids:
+            new_chunks.append((cid, text))
+    return new_chunks, existing_ids - seen
+
+
+# --- Embedding (runs in worker processes) ---
+
+_worker_embeddings = None
+
+
+def _init_worker():
+    global _worker_embeddings
+    from src.rag import _load_base_embeddings
+    _worker_embeddings = _load_base_embeddings()
+
+
+def _embed_batch(texts: List[str]) -> List[List[float]]:
+    if _worker_embeddings is None:
+        _init_worker()
+    return _worker_embeddings.embed_documents(texts)
+
+
+# --- Pipeline ---
+
+# file_hash of chunks whose file hasn't finished ingesting; never equals a real digest
+PENDING_HASH = "pending"
+
+
+def _existing_state(collection) -> Dict[str, Tuple[Optional[str], Set[str]]]:
+    """
+    source -> (file_hash, chunk ids) for everything already in the collection.
+    The hash is None unless every chunk of the file carries the same one, so a
+    file interrupted mid-ingest is processed again.
+    """
+    hashes: Dict[str, Set[Optional[str]]] = defaultdict(set)
+    ids: Dict[str, Set[str]] = defaultdict(set)
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=5000, offset=offset)
+        if not page["ids"]:
+            break
+        for doc_id, metadata in zip(page["ids"], page["metadatas"]):
+            metadata = metadata or {}
+            source = metadata.get("source")
+            if source is None:
+                continue
+            ids[source].add(doc_id)
+            hashes[source].add(metadata.get("file_hash"))
+        offset += len(page["ids"])
+    return {
+        source: (next(iter(hashes[source])) if len(hashes[source]) == 1 else None, ids[source])
+        for source in ids
+    }
+
+
+def ingest(root: str, chroma_path: str = CHROMA_PATH, workers: int = 0,
+           batch_size: int = EMBED_BATCH_SIZE, dry_run: bool = False, prune: bool = False) -> Dict[str, int]:
+    """Ingest every supported file under `root`; returns counters for the run."""
+    from langchain_community.vectorstores import Chroma
+
+    started = time.perf_counter()
+    os.makedirs(chroma_path, exist_ok=True)
+    # Calibrated M / ef_construction only take effect when the collection is created
+    from src.hnsw_tuning import creation_metadata
+    collection = Chroma(persist_directory=chroma_path, embedding_function=None,
+                        collection_metadata=creation_metadata())._collection
+    existing = _existing_state(collection)
+    stats = defaultdict(int)
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers > 0 else None
+    pending = []  # (future or vectors, ids, texts, metadatas)
+    # A changed file's chunks get its file_hash only after all its new chunks are upserted
+    unflushed: Dict[str, int] = {}
+    finalize: Dict[str, Tuple[Set[str], Dict[str, str]]] = {}
+
+    def record_file_hash(ids, metadata):
+        if ids:
+            collection.update(ids=list(ids), metadatas=[metadata] * len(ids))
+
+    def flush(batch):
+        ids, texts, metadatas = zip(*batch)
+        vectors = executor.submit(_embed_batch, list(texts)) if executor else _embed_batch(list(texts))
+        pending.append((vectors, ids, texts, metadatas))
+        # Bound in-flight batches so memory stays flat on large corpora
+        while len(pending) > max(workers, 1) * 2:
+            upsert(*pending.pop(0))
+
+    def upsert(vectors, ids, texts, metadatas):
+        vectors = vectors.result() if hasattr(vectors, "result") else vectors
+        collection.upsert(ids=list(ids), embeddings=vectors, documents=list(texts), metadatas=list(metadatas))
+        stats["chunks_added"] += len(ids)
+        for metadata in metadatas:
+            source = metadata["source"]
+            unflushed[source] -= 1
+            if not unflushed[source]:
+                del unflushed[source]
+                record_file_hash(*finalize.pop(source))
+
+    batch, seen_sources = [], set()
+    try:
+        for path in iter_source_files(root):
+            stats["files_scanned"] += 1
+            source = os.path.relpath(path, root) if os.path.isdir(root) else os.path.basename(path)
+            seen_sources.add(source)
+            digest = file_hash(path)
+            previous_digest, existing_ids = existing.get(source, (None, set()))
+            if previous_digest == digest:
+                stats["files_unchanged"] += 1
+                continue
+
+            try:
+                new_chunks, stale_ids = plan_file(source, iter_chunks(iter_text_blocks(path)), existing_ids)
+            except Exception as e:
+                logger.error(f"Failed to read {path}: {e}")
+                stats["files_failed"] += 1
+                continue
+
+            stats["files_changed"] += 1
+            metadata = metadata_for(source, digest)
+            if dry_run:
+                stats["chunks_added"] += len(new_chunks)
+                stats["chunks_removed"] += len(stale_ids)
+                continue
+
+            if stale_ids:
+                collection.delete(ids=list(stale_ids))
+                stats["chunks_removed"] += len(stale_ids)
+
+            # Unchanged chunks of an edited file only need the new file_hash. Until the new
+            # chunks are stored, the file stays marked pending so a crash re-ingests it.
+            file_ids = (existing_ids - stale_ids) | {cid for cid, _ in new_chunks}
+            if not new_chunks:
+                record_file_hash(file_ids, metadata)
+                continue
+            unflushed[source] = len(new_chunks)
+            finalize[source] = (file_ids, metadata)
+
+            for cid, text in new_chunks:
+                batch.append((cid, text, dict(metadata, file_hash=PENDING_HASH,
+                                              content_hash=hashlib.sha256(text.encode()).hexdigest())))
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+
+        if batch and not dry_run:
+            flush(batch)
+        if prune:
+            for source in set(existing) - seen_sources:
+                stale_ids = existing[source][1]
+                if not dry_run:
+                    collection.delete(ids=list(stale_ids))
+                stats["files_removed"] += 1
+                stats["chunks_removed"] += len(stale_ids)
+        while pending:
+            upsert(*pending.pop(0))
+    finally:
+        if executor:
+            executor.shutdown()
+
+    stats["seconds"] = round(time.perf_counter() - started, 1)
+    return dict(stats)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incrementally ingest policy documents into ChromaDB.")
+    parser.add_argument("source", help="File or directory of PDF/Markdown/HTML/text documents")
+    parser.add_argument("--chroma-path", default=CHROMA_PATH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Embedding processes (0 = embed in this process)")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--prune", action="store_true",
+                        help="Delete chunks of previously ingested files that are no longer under SOURCE")
+    args = parser.parse_args()
+
+    result = ingest(args.source, args.chroma_path, workers=args.workers,
+                    batch_size=args.batch_size, dry_run=args.dry_run, prune=args.prune)
+    print(" | ".join(f"{key}: {value}" for key, value in sorted(result.items())))
@@ -0,0 +1,437 @@
+"""
+Local intent router in front of the orchestrator LLM.
+
+Every free-form query paid a Groq structured-output call in orchestrator_node
+just to pick one of five RouteDecision labels. Each intent here has a few
+labelled example utterances. They are embedded once with the retrieval
+embedder and averaged into one normalised centroid per intent. A query is
+assigned to the centroid with the highest cosine similarity, which takes a
+few milliseconds. The router only answers when that similarity clears
+INTENT_ROUTER_THRESHOLD and beats the runner-up by INTENT_ROUTER_MARGIN.
+It also only answers fresh requests, because it sees just the last message
+while the orchestrator LLM reads the whole conversation. Otherwise
+orchestrator_agent decides as before.
+
+The router is off by default. `python -m src.intent_router evaluate` classifies
+every example with a centroid built without it (leave-one-out). For a grid of
+thresholds and margins it reports coverage (the share of queries routed
+locally) and precision. It then recommends the setting with the highest
+coverage that meets the target precision. Set those values before enabling
+the router.
+
+Every decision is appended to a JSONL log. `python -m src.intent_router
+promote` copies queries the LLM had to route into the examples file, so
+the router learns the phrasings it was unsure about. The centroids are
+pickled to INDEX_CACHE_DIR and rebuilt when the examples or the embedding
+model change.
+"""
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Ensure project root is in path to allow 'src' imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.rag import BASE_DIR, EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME, INDEX_CACHE_DIR
+from src.logger import setup_logger
+
+logger = setup_logger("IntentRouter")
+
+INTENT_ROUTER_ENABLED = os.getenv("INTENT_ROUTER_ENABLED", "false").lower() in ("1", "true", "yes")
+# Minimum cosine similarity to the best intent centroid, and lead over the runner-up
+INTENT_ROUTER_THRESHOLD = float(os.getenv("INTENT_ROUTER_THRESHOLD", "0.5"))
+INTENT_ROUTER_MARGIN = float(os.getenv("INTENT_ROUTER_MARGIN", "0.05"))
+INTENT_ROUTER_TARGET_PRECISION = 0.95
+THRESHOLD_GRID = [round(0.3 + 0.05 * i, 2) for i in range(11)]
+MARGIN_GRID = [0.0, 0.02, 0.05, 0.1, 0.15]
+INTENT_EXAMPLES_PATH = os.getenv("INTENT_EXAMPLES_PATH", os.path.join(BASE_DIR, "data", "intent_examples.jsonl"))
+# Empty disables the decision log
+INTENT_ROUTER_LOG = os.getenv("INTENT_ROUTER_LOG", os.path.join(BASE_DIR, "logs", "intent_router.jsonl"))
+INTENT_ROUTER_PATH = os.path.join(INDEX_CACHE_DIR, "intent_router.pkl")
+# After a failed build, LLM routing is used for this long before trying again
+INTENT_ROUTER_RETRY_SECONDS = 300
+# Long free-text messages are truncated in the log
+MAX_LOGGED_CHARS = 500
+
+SEED_EXAMPLES: Dict[str, List[str]] = {
+    "CONVERSATION_DISCOVERY": [
+        "help me",
+        "I don't know what I'm eligible for",
+        "I need some support but I'm not sure where to start",
+        "can you help me find government help",
+        "I lost my job and don't know what to do",
+        "what options do I have",
+        "I'm confused about government schemes",
+        "mujhe madad chahiye",
+        "hello, I need assistance",
+        "I want to explore what help is available",
+    ],
+    "POLICY_INTERPRETER": [
+        "explain PM Kisan",
+        "what does the Ayushman Bharat scheme cover",
+        "what are the rules of the pension scheme",
+        "explain this government policy in simple words",
+        "what is PMAY and how does it work",
+        "what does the new labour law say",
+        "tell me about the Sukanya Samriddhi Yojana",
+        "what are the terms and conditions of this scheme",
+        "what is the purpose of the MGNREGA act",
+        "summarise the education policy for me",
+    ],
+    "ELIGIBILITY_VERIFIER": [
+        "am I eligible for PM Kisan",
+        "I am 45 years old with income of 2 lakh, do I qualify",
+        "can I apply for Ayushman Bharat if I earn 3 lakh a year",
+        "do I meet the criteria for the scholarship",
+        "I am a widow aged 60 from Bihar, am I eligible for pension",
+        "check if I qualify for the housing scheme",
+        "my family income is below 1 lakh, can I get a ration card",
+        "is a farmer with 3 acres eligible for this scheme",
+        "am I eligible as an SC student",
+        "will I qualify for free gas connection",
+    ],
+    "BENEFIT_MATCHER": [
+        "what schemes apply to me",
+        "what benefits can I get",
+        "which government schemes are available for farmers",
+        "list all benefits for senior citizens",
+        "what can I get as a single mother",
+        "show me schemes for students in Karnataka",
+        "which subsidies am I entitled to",
+        "what financial help is there for small businesses",
+        "benefits for disabled people",
+        "what welfare schemes are there for my family",
+    ],
+    "CITIZEN_ADVOCATE": [
+        "how do I apply for PM Kisan",
+        "my application was rejected, what should I do",
+        "help me write an appeal",
+        "I want to file a grievance",
+        "what documents do I need to apply",
+        "my pension has not been paid for months",
+        "how do I complain about a delay in my benefit",
+        "where do I submit the application form",
+        "help me draft a letter to the district office",
+        "the officer is asking for a bribe to process my application",
+    ],
+}
+
+
+class RouteResult(NamedTuple):
+    label: str
+    confidence: float
+    margin: float
+
+
+# --- Examples ---
+
+def load_examples(path: str = INTENT_EXAMPLES_PATH) -> Dict[str, List[str]]:
+    """Seed examples plus those promoted from the decision log."""
+    examples = {label: list(texts) for label, texts in SEED_EXAMPLES.items()}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry.get("label") in examples:
+                    examples[entry["label"]].append(entry["text"])
+    return examples
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def examples_fingerprint(examples: Dict[str, List[str]]) -> str:
+    payload = json.dumps([EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND, examples], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+# --- Classifier ---
+
+def embed_examples(examples: Dict[str, List[str]], embeddings) -> Dict[str, np.ndarray]:
+    """Unit-length example vectors per label."""
+    vectors = {}
+    for label, texts in examples.items():
+        if texts:
+            matrix = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+            vectors[label] = matrix / np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+    return vectors
+
+
+def _centroid(vectors: np.ndarray) -> np.ndarray:
+    centroid = vectors.mean(axis=0)
+    return centroid / max(np.linalg.norm(centroid), 1e-12)
+
+
+class IntentRouter:
+    """Nearest-centroid classifier over embedded example utterances."""
+
+    def __init__(self, labels: List[str], centroids: np.ndarray, fingerprint: str = ""):
+        self.labels = labels
+        self.centroids = centroids
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, examples: Dict[str, List[str]], embeddings) -> "IntentRouter":
+        vectors = embed_examples(examples, embeddings)
+        labels = sorted(vectors)
+        return cls(labels, np.vstack([_centroid(vectors[label]) for label in labels]), examples_fingerprint(examples))
+
+    def scores(self, query_vector) -> Dict[str, float]:
+        vector = np.asarray(query_vector, dtype=np.float32)
+        vector = vector / max(np.linalg.norm(vector), 1e-12)
+        return dict(zip(self.labels, (self.centroids @ vector).tolist()))
+
+    def classify(self, query_vector) -> RouteResult:
+        ranked = sorted(self.scores(query_vector).items(), key=lambda item: item[1], reverse=True)
+        (label, best), runner_up = ranked[0], ranked[1][1] if len(ranked) > 1 else -1.0
+        return RouteResult(label, round(best, 4), round(best - runner_up, 4))
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IntentRouter":
+        router = cls([], np.zeros((0, 0), dtype=np.float32))
+        with open(path, "rb") as f:
+            router.__dict__.update(pickle.load(f))
+        return router
+
+
+def load_or_build_router(path: str = INTENT_ROUTER_PATH, examples_path: str = INTENT_EXAMPLES_PATH) -> IntentRouter:
+    """Load the pickled centroids if they match the current examples, otherwise re-embed them."""
+    from src.rag import get_embeddings
+
+    examples = load_examples(examples_path)
+    fingerprint = examples_fingerprint(examples)
+    if os.path.exists(path):
+        try:
+            router = IntentRouter.load(path)
+            if router.fingerprint == fingerprint:
+                return router
+            logger.info("Intent examples changed since the router was built; rebuilding.")
+        except Exception as e:
+            logger.warning(f"Could not load intent router: {e}. Rebuilding.")
+
+    started = time.perf_counter()
+    router = IntentRouter.build(examples, get_embeddings())
+    try:
+        router.save(path)
+    except OSError as e:
+        logger.warning(f"Could not save intent router to {path}: {e}")
+    logger.info(f"Built intent router from {sum(map(len, examples.values()))} examples "
+                f"in {time.perf_counter() - started:.2f}s")
+    return router
+
+
+_router: Optional[IntentRouter] = None
+_router_lock = threading.Lock()
+_failed_at: Optional[float] = None
+
+
+def get_intent_router() -> Optional[IntentRouter]:
+    """The process-wide router; None (LLM routing) while it can't be built, retried periodically."""
+    global _router, _failed_at
+    if _router is not None:
+        return _router
+    if _failed_at is not None and time.time() - _failed_at < INTENT_ROUTER_RETRY_SECONDS:
+        return None
+    with _router_lock:
+        if _router is None:
+            try:
+                _router = load_or_build_router()
+                _failed_at = None
+            except Exception as e:
+                _failed_at = time.time()
+                logger.warning(f"Intent router unavailable, every query goes to the orchestrator LLM: {e}")
+        return _router
+
+
+def reset_intent_router():
+    """Forget the loaded router (e.g. after new examples were promoted)."""
+    global _router, _failed_at
+    with _router_lock:
+        _router, _failed_at = None, None
+
+
+# --- Decision log ---
+
+_log_lock = threading.Lock()
+
+
+def log_decision(query: str, label: str, source: str, confidence: Optional[float] = None,
+                 margin: Optional[float] = None, path: str = INTENT_ROUTER_LOG):
+    """Append one routing decision; `source` is "router" or "llm"."""
+    if not path:
+        return
+    entry = {"ts": round(time.time(), 3), "query": query[:MAX_LOGGED_CHARS], "label": label,
+             "source": source, "confidence": confidence, "margin": margin}
+    try:
+        with _log_lock:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning(f"Could not log routing decision: {e}")
+
+
+def route_query(query: str, threshold: float = INTENT_ROUTER_THRESHOLD,
+                margin: float = INTENT_ROUTER_MARGIN) -> Optional[RouteResult]:
+    """The local routing decision, or None when the orchestrator LLM should decide."""
+    if not INTENT_ROUTER_ENABLED or not isinstance(query, str) or not query.strip():
+        return None
+    router = get_intent_router()
+    if router is None:
+        return None
+
+    from src.rag import get_embeddings
+    result = router.classify(get_embeddings().embed_query(query))
+    if result.confidence < threshold or result.margin < margin:
+        logger.info(f"Intent router unsure ({result.label}, {result.confidence:.2f}/{result.margin:.2f}); "
+                    "asking the orchestrator LLM")
+        return None
+    logger.info(f"Intent router: {result.label} ({result.confidence:.2f}, margin {result.margin:.2f})")
+    log_decision(query, result.label, "router", result.confidence, result.margin)
+    return result
+
+
+# --- Evaluation ---
+
+def leave_one_out(examples: Dict[str, List[str]], embeddings) -> List[Tuple[str, RouteResult]]:
+    """(true label, decision) for every example, classified by centroids built without it."""
+    vectors = embed_examples(examples, embeddings)
+    labels = sorted(vectors)
+    centroids = {label: _centroid(vectors[label]) for label in labels}
+    results = []
+    for label in labels:
+        if len(vectors[label]) < 2:
+            continue
+        for i, vector in enumerate(vectors[label]):
+            held_out = dict(centroids, **{label: _centroid(np.delete(vectors[label], i, axis=0))})
+            router = IntentRouter(labels, np.vstack([held_out[l] for l in labels]))
+            results.append((label, router.classify(vector)))
+    return results
+
+
+def threshold_report(results: Sequence[Tuple[str, RouteResult]], thresholds: Sequence[float] = THRESHOLD_GRID,
+                     margins: Sequence[float] = MARGIN_GRID) -> List[Dict[str, float]]:
+    """Coverage (share routed locally) and precision (share of those routed correctly) per setting."""
+    report = []
+    for threshold in thresholds:
+        for margin in margins:
+            routed = [(label, r) for label, r in results if r.confidence >= threshold and r.margin >= margin]
+            correct = sum(label == r.label for label, r in routed)
+            report.append({
+                "threshold": threshold,
+                "margin": margin,
+                "coverage": round(len(routed) / len(results), 4) if results else 0.0,
+                "precision": round(correct / len(routed), 4) if routed else 1.0,
+            })
+    return report
+
+
+def recommend(report: Sequence[Dict[str, float]],
+              target_precision: float = INTENT_ROUTER_TARGET_PRECISION) -> Optional[Dict[str, float]]:
+    """The setting routing the most queries locally at `target_precision`; ties go to the stricter one."""
+    passing = [row for row in report if row["precision"] >= target_precision and row["coverage"] > 0]
+    return max(passing, key=lambda row: (row["coverage"], row["threshold"], row["margin"]), default=None)
+
+
+# --- Growing the example set ---
+
+def promote_decisions(log_path: str = INTENT_ROUTER_LOG, examples_path: str = INTENT_EXAMPLES_PATH,
+                      min_count: int = 1, dry_run: bool = False) -> List[Dict[str, str]]:
+    """
+    Add queries the orchestrator LLM routed to the examples file. A query is
+    skipped if it is already an example, if the LLM gave it different labels,
+    or if it was seen fewer than `min_count` times.
+    """
+    labels, counts, texts = defaultdict(set), defaultdict(int), {}
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry.get("source") != "llm" or entry.get("label") not in SEED_EXAMPLES:
+                continue
+            key = _normalize(entry["query"])
+            labels[key].add(entry["label"])
+            counts[key] += 1
+            texts.setdefault(key, entry["query"].strip())
+
+    known = {_normalize(text) for examples in load_examples(examples_path).values() for text in examples}
+    promoted = [
+        {"label": next(iter(labels[key])), "text": texts[key]}
+        for key in sorted(labels)
+        if key not in known and len(labels[key]) == 1 and counts[key] >= min_count
+    ]
+    if promoted and not dry_run:
+        os.makedirs(os.path.dirname(examples_path) or ".", exist_ok=True)
+        with open(examples_path, "a", encoding="utf-8") as f:
+            for example in promoted:
+                f.write(json.dumps(example, ensure_ascii=False) + "\n")
+        reset_intent_router()
+    return promoted
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Embedding-based intent router for the orchestrator.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    classify_parser = subparsers.add_parser("classify", help="Show centroid similarities for a query")
+    classify_parser.add_argument("query")
+    evaluate_parser = subparsers.add_parser("evaluate", help="Leave-one-out coverage/precision per threshold")
+    evaluate_parser.add_argument("--examples", default=INTENT_EXAMPLES_PATH)
+    evaluate_parser.add_argument("--target-precision", type=float, default=INTENT_ROUTER_TARGET_PRECISION)
+    promote_parser = subparsers.add_parser("promote", help="Add LLM-routed queries from the log to the examples")
+    promote_parser.add_argument("--log", default=INTENT_ROUTER_LOG)
+    promote_parser.add_argument("--examples", default=INTENT_EXAMPLES_PATH)
+    promote_parser.add_argument("--min-count", type=int, default=1, help="Times a query must have been logged")
+    promote_parser.add_argument("--dry-run", action="store_true", help="Print without writing")
+    args = parser.parse_args()
+
+    if args.command == "classify":
+        from src.rag import get_embeddings
+        router = load_or_build_router()
+        vector = get_embeddings().embed_query(args.query)
+        for label, score in sorted(router.scores(vector).items(), key=lambda item: item[1], reverse=True):
+            print(f"{label:<24} {score:.3f}")
+        result = router.classify(vector)
+        routed = result.confidence >= INTENT_ROUTER_THRESHOLD and result.margin >= INTENT_ROUTER_MARGIN
+        print(f"\n-> {result.label if routed else 'orchestrator LLM'} "
+              f"(confidence {result.confidence:.3f}, margin {result.margin:.3f})")
+    elif args.command == "evaluate":
+        from src.rag import get_embeddings
+        results = leave_one_out(load_examples(args.examples), get_embeddings())
+        report = threshold_report(results)
+        accuracy = sum(label == r.label for label, r in results) / max(len(results), 1)
+        print(f"{len(results)} held-out examples, nearest-centroid accuracy {accuracy:.3f}\n")
+        print(f"{'Threshold':>9} {'Margin':>7} {'Coverage':>9} {'Precision':>10}")
+        for row in report:
+            print(f"{row['threshold']:>9.2f} {row['margin']:>7.2f} {row['coverage']:>9.3f} {row['precision']:>10.3f}")
+        best = recommend(report, args.target_precision)
+        if best:
+            print(f"\nINTENT_ROUTER_THRESHOLD={best['threshold']} INTENT_ROUTER_MARGIN={best['margin']} "
+                  f"routes {best['coverage']:.0%} locally at precision {best['precision']:.3f}")
+        else:
+            print(f"\nNo setting reaches precision {args.target_precision}; keep the router disabled.")
+    else:
+        promoted = promote_decisions(args.log, args.examples, args.min_count, args.dry_run)
+        for example in promoted:
+            print(f"{example['label']:<24} {example['text']}")
+        print(f"\n{len(promoted)} example(s) {'would be ' if args.dry_run else ''}added to {args.examples}")
@@ -11,6 +11,9 @@ class InterpretationState(TypedDict):
     intent: Optional[str]
     domain: Optional[str]
     
+    # Scheme catalog hit (skips RAG + extraction)
+    catalog_scheme_id: Optional[str]
+
     # RAG
     retrieved_docs: List[Any]
     
@@ -0,0 +1,239 @@
+"""
+Two-tier cache for structured LLM results.
+
+CacheHelper's LLM cache used to be a 100-entry class-level dict with FIFO
+eviction. Each gunicorn worker had its own copy, and every copy was lost on
+restart or deploy. Structured results (PolicyAnalysisOutput,
+EligibilityAnalysisOutput, BenefitsAnalysisOutput, AdvocacyAnalysisOutput)
+now go through:
+
+- L1: a per-process LRU of parsed models, bounded by approximate bytes (see
+  src/striped_cache.py), so repeat hits skip JSON parsing.
+- L2: a SQLite database in WAL mode on local disk, shared by all workers on
+  the host, which survives restarts. Rows hold the model JSON, its schema
+  name, an expiry time, and tags for the LLM model, the prompt version and
+  the corpus.
+
+A row only matches when its tags match the running model, the prompt
+template hash and the corpus fingerprint. Changing any of them therefore
+misses cleanly instead of serving answers to an old prompt or to documents
+that have since been re-ingested. The tags are part of the primary key, so
+old and new workers don't overwrite each other's rows during a rolling
+deploy. Values of other types stay in L1 only.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from src.rag import INDEX_CACHE_DIR
+from src.logger import setup_logger
+from src.striped_cache import StripedLRUCache, register_cache
+
+logger = setup_logger("LLMCache")
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(INDEX_CACHE_DIR, "llm_cache.sqlite3"))
+LLM_CACHE_L1_MAX_BYTES = int(os.getenv("LLM_CACHE_L1_MAX_BYTES", str(16 * 1024 * 1024)))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Set to "false" to keep the cache in process memory only
+LLM_CACHE_PERSIST = os.getenv("LLM_CACHE_PERSIST", "true").lower() in ("1", "true", "yes")
+# Expired rows are deleted every this many writes
+PURGE_EVERY = 500
+# How often the corpus fingerprint is re-read (it reads every chunk id and file_hash)
+CORPUS_TAG_REFRESH_SECONDS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT NOT NULL,
+    schema TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    corpus TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (key, model, prompt_version, corpus)
+);
+CREATE INDEX IF NOT EXISTS llm_cache_expires ON llm_cache (expires_at);
+"""
+
+
+def _structured_types() -> Dict[str, type]:
+    from src.schemas import (
+        AdvocacyAnalysisOutput, BenefitsAnalysisOutput, EligibilityAnalysisOutput, PolicyAnalysisOutput
+    )
+    return {cls.__name__: cls for cls in (
+        PolicyAnalysisOutput, EligibilityAnalysisOutput, BenefitsAnalysisOutput, AdvocacyAnalysisOutput
+    )}
+
+
+def prompt_version(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode()).hexdigest()[:12] if prompt else ""
+
+
+def _default_corpus_tag() -> str:
+    try:
+        from src.rag import corpus_fingerprint
+        return hashlib.sha256(corpus_fingerprint().encode()).hexdigest()[:12]
+    except Exception:
+        return "unknown"
+
+
+def _default_model_tag() -> str:
+    try:
+        from src.agents import llm
+        return getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+    except Exception:
+        return "unknown"
+
+
+class LLMResponseCache:
+    """Process-local LRU in front of a shared SQLite (WAL) store."""
+
+    def __init__(self, path: Optional[str] = LLM_CACHE_PATH, l1_max_bytes: int = LLM_CACHE_L1_MAX_BYTES,
+                 ttl_seconds: int = LLM_CACHE_TTL_SECONDS, model_tag: Optional[str] = None,
+                 corpus_tag: Optional[str] = None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._model_tag = model_tag
+        # A fixed tag (tests) or None to follow corpus_fingerprint()
+        self._fixed_corpus_tag = corpus_tag
+        self._corpus_tag: Optional[str] = None
+        self._corpus_checked_at = 0.0
+        self.l1 = StripedLRUCache("llm", l1_max_bytes)
+        self._lock = threading.Lock()
+        # One connection per thread and process: sqlite3 objects must not cross either
+        self._local = threading.local()
+        self._types: Optional[Dict[str, type]] = None
+        self._writes = 0
+        self._stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0}
+
+    @property
+    def model_tag(self) -> str:
+        if self._model_tag is None:
+            self._model_tag = _default_model_tag()
+        return self._model_tag
+
+    @property
+    def corpus_tag(self) -> str:
+        if self._fixed_corpus_tag is not None:
+            return self._fixed_corpus_tag
+        now = time.time()
+        if self._corpus_tag is None or now - self._corpus_checked_at >= CORPUS_TAG_REFRESH_SECONDS:
+            self._corpus_tag, self._corpus_checked_at = _default_corpus_tag(), now
+        return self._corpus_tag
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(llm_cache)")}
+            if columns and "corpus" not in columns:
+                # Table from before rows were tagged with the corpus; its rows can't be trusted
+                conn.execute("DROP TABLE llm_cache")
+            conn.executescript(_SCHEMA)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache L2 unavailable ({e}); using memory only.")
+            self.path = None
+            return None
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _full_key(self, key: str, prompt: str) -> str:
+        return f"{self.model_tag}|{prompt_version(prompt)}|{self.corpus_tag}|{key}"
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get(self, key: str, prompt: str = "") -> Any:
+        full_key = self._full_key(key, prompt)
+        now = time.time()
+        value = self.l1.get(full_key)
+        if value is not None:
+            self._count("l1_hits")
+            return value
+
+        conn = self._connection()
+        if conn is not None:
+            try:
+                row = conn.execute(
+                    "SELECT schema, value, expires_at FROM llm_cache "
+                    "WHERE key = ? AND model = ? AND prompt_version = ? AND corpus = ? AND expires_at > ?",
+                    (key, self.model_tag, prompt_version(prompt), self.corpus_tag, now),
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache read failed: {e}")
+                row = None
+            if row is not None:
+                if self._types is None:
+                    self._types = _structured_types()
+                schema, value_json, expires_at = row
+                model_cls = self._types.get(schema)
+                if model_cls is not None:
+                    value = model_cls.model_validate_json(value_json)
+                    self.l1.set(full_key, value, size=len(value_json) * 2, expires_at=expires_at)
+                    self._count("l2_hits")
+                    return value
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: Any, prompt: str = "", ttl_seconds: Optional[int] = None):
+        expires_at = time.time() + (ttl_seconds or self.ttl_seconds)
+        if self._types is None:
+            self._types = _structured_types()
+        if not isinstance(value, BaseModel) or type(value).__name__ not in self._types:
+            self.l1.set(self._full_key(key, prompt), value, expires_at=expires_at)
+            return
+        value_json = value.model_dump_json()
+        self.l1.set(self._full_key(key, prompt), value, size=len(value_json) * 2, expires_at=expires_at)
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, schema, model, prompt_version, corpus, value, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, type(value).__name__, self.model_tag, prompt_version(prompt), self.corpus_tag,
+                 value_json, time.time(), expires_at),
+            )
+            self._writes += 1
+            if self._writes % PURGE_EVERY == 0:
+                conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def clear(self, persistent: bool = False):
+        """Drop L1; with persistent=True also empty the shared L2."""
+        self.l1.clear()
+        conn = self._connection() if persistent else None
+        if conn is not None:
+            conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        l1 = self.l1.stats()
+        stats.update(l1_entries=l1["entries"], l1_bytes=l1["bytes"], l1_evictions=l1["evictions"],
+                     l1_max_bytes=l1["max_bytes"])
+        lookups = stats["l1_hits"] + stats["l2_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["l1_hits"] + stats["l2_hits"]) / lookups, 4) if lookups else 0.0
+        stats["persistent"] = bool(self.path)
+        return stats
+
+
+llm_cache = LLMResponseCache(LLM_CACHE_PATH if LLM_CACHE_PERSIST else None)
+register_cache(llm_cache.l1)
@@ -0,0 +1,136 @@
+"""
+Multi-query retrieval: expand a question into sub-queries, search them
+concurrently and fuse the rankings.
+
+The chat flow rewrites a follow-up into one standalone query, and a single
+embedding of it often misses chunks about other facets of the same scheme
+(who qualifies, what it pays, how to apply). Here the question is expanded
+into a few sub-queries, either from local templates (free) or one LLM call.
+All of them run at once on a shared thread pool, and the rankings are merged
+with reciprocal rank fusion, which also removes duplicates. Concurrent query
+embeddings are coalesced by the embedding batcher, so wall time stays close
+to a single retrieval.
+"""
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+from src.rag import RETRIEVER_K, get_retriever, retrieve
+from src.logger import setup_logger
+
+logger = setup_logger("MultiQuery")
+
+# "off", "template" (local rewrites) or "llm" (one LLM call, templates on failure)
+MULTI_QUERY_MODE = os.getenv("MULTI_QUERY_MODE", "off").lower()
+# Sub-queries per question, including the original
+MULTI_QUERY_COUNT = int(os.getenv("MULTI_QUERY_COUNT", "4"))
+MULTI_QUERY_WORKERS = int(os.getenv("MULTI_QUERY_WORKERS", "4"))
+
+EXPANSION_PROMPT = """
+Write {count} different search queries for finding Indian government scheme documents that answer the question below.
+Cover different aspects (eligibility, benefits, application process, documents) and use the scheme's full name if known.
+Return one query per line, with no numbering or extra text.
+
+Question: {question}
+"""
+
+# Facets of a scheme question; the subject is appended to each
+_TEMPLATES = [
+    "{subject} eligibility criteria",
+    "{subject} benefits and amount",
+    "how to apply for {subject} documents required",
+]
+_QUESTION_WORDS = re.compile(
+    r"\b(what|which|who|how|when|where|why|is|are|am|can|could|do|does|i|me|my|we|the|a|an|"
+    r"tell|about|please|get|for|apply|eligible|eligibility)\b",
+    re.IGNORECASE,
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Concurrent first requests must not each start (and leak) a pool
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MULTI_QUERY_WORKERS, thread_name_prefix="multi-query")
+    return _executor
+
+
+def _dedupe(queries: List[str], count: int) -> List[str]:
+    seen, unique = set(), []
+    for query in queries:
+        key = " ".join(query.lower().split())
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(query.strip())
+    return unique[:count]
+
+
+def template_queries(query: str, count: int = MULTI_QUERY_COUNT) -> List[str]:
+    """The question plus facet rewrites of its subject ("PM-KISAN eligibility criteria", ...)."""
+    subject = " ".join(_QUESTION_WORDS.sub(" ", query).replace("?", " ").split()) or query
+    try:
+        # Use the scheme's full name when the question names a known scheme
+        from src.scheme_resolver import find_scheme_in_text, scheme_name
+        scheme_id = find_scheme_in_text(query)
+        if scheme_id:
+            subject = scheme_name(scheme_id)
+    except Exception as e:
+        logger.debug(f"Scheme resolver unavailable for expansion: {e}")
+    return _dedupe([query] + [t.format(subject=subject) for t in _TEMPLATES], count)
+
+
+def llm_queries(query: str, count: int = MULTI_QUERY_COUNT) -> List[str]:
+    """The question plus up to count-1 LLM-written sub-queries."""
+    from langchain_core.messages import HumanMessage
+    from src.agents import llm
+    from src.prompt_packer import pack_prompt, question_section
+
+    prompt = pack_prompt(EXPANSION_PROMPT, count=count - 1, question=question_section(query))
+    response = llm.invoke([HumanMessage(content=prompt)])
+    lines = [re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line) for line in response.content.splitlines()]
+    return _dedupe([query] + lines, count)
+
+
+def expand_query(query: str, mode: str = MULTI_QUERY_MODE, count: int = MULTI_QUERY_COUNT) -> List[str]:
+    if mode == "llm":
+        try:
+            return llm_queries(query, count)
+        except Exception as e:
+            logger.warning(f"LLM query expansion failed ({e}); using templates.")
+    if mode in ("llm", "template"):
+        return template_queries(query, count)
+    return [query]
+
+
+def multi_query_retrieve(query: str, filters=None, retriever=None, k: int = RETRIEVER_K,
+                         mode: str = MULTI_QUERY_MODE) -> List[Document]:
+    """Top k documents for `query` fused across its sub-queries."""
+    from src.hybrid_retriever import reciprocal_rank_fusion
+
+    retriever = retriever or get_retriever()
+    queries = expand_query(query, mode)
+    if len(queries) == 1:
+        return retrieve(query, filters=filters, retriever=retriever)
+
+    futures = [_get_executor().submit(retrieve, q, filters, retriever) for q in queries]
+    rankings = []
+    for sub_query, future in zip(queries, futures):
+        try:
+            rankings.append(future.result())
+        except Exception as e:
+            logger.warning(f"Sub-query failed ({sub_query[:50]}): {e}")
+    if not rankings:
+        raise RuntimeError("All sub-queries failed")
+
+    fused = reciprocal_rank_fusion(rankings)
+    logger.info(f"Fused {sum(len(r) for r in rankings)} hits from {len(queries)} sub-queries into {len(fused)} documents")
+    return fused[:k]
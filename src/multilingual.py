@@ -0,0 +1,183 @@
+"""
+Multilingual retrieval for Hindi and Kannada questions.
+
+The corpus is embedded with English mpnet, so a question typed in Devanagari
+or Kannada script lands far from the English chunks that answer it, and an
+LLM translation before retrieval would add a round-trip. Instead the corpus
+is also embedded once with a multilingual sentence-transformer whose vector
+space is aligned across languages. The vectors go into an ExactIndex (see
+src/exact_search.py) under INDEX_CACHE_DIR. The default model, LaBSE, was
+trained on both Hindi and Kannada. The paraphrase-multilingual models cover
+Hindi but not Kannada, so with one of those Kannada questions take the
+normal path.
+
+At query time the script is detected from Unicode ranges. Indic-script
+queries are embedded with the multilingual model and searched in that index.
+Everything else takes the normal retrieval path. Multilingual query
+embeddings go through the same persistent hash-keyed cache as English ones.
+The model is only loaded when such a query arrives, or when the index is
+built with `python -m src.multilingual build`.
+"""
+import os
+import sys
+import time
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+# Ensure project root is in path to allow 'src' imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.rag import INDEX_CACHE_DIR, QUERY_EMBEDDING_CACHE_SIZE, corpus_fingerprint, iter_corpus
+from src.logger import setup_logger
+
+logger = setup_logger("Multilingual")
+
+MULTILINGUAL_ENABLED = os.getenv("MULTILINGUAL_ENABLED", "false").lower() in ("1", "true", "yes")
+MULTILINGUAL_MODEL_NAME = os.getenv("MULTILINGUAL_MODEL", "sentence-transformers/LaBSE")
+MULTILINGUAL_INDEX_DIR = os.path.join(INDEX_CACHE_DIR, "multilingual")
+MULTILINGUAL_BATCH_SIZE = 64
+
+SCRIPTS = {
+    "devanagari": (0x0900, 0x097F),
+    "kannada": (0x0C80, 0x0CFF),
+}
+
+# Scripts a model was trained on, for models that don't cover all of SCRIPTS
+MODEL_SCRIPTS = {
+    "paraphrase-multilingual-mpnet-base-v2": {"devanagari"},
+    "paraphrase-multilingual-MiniLM-L12-v2": {"devanagari"},
+}
+
+
+def supported_scripts(model_name: Optional[str] = None):
+    """Scripts `model_name` (default: the configured model) embeds into the shared space."""
+    model_name = model_name or MULTILINGUAL_MODEL_NAME
+    return MODEL_SCRIPTS.get(model_name.rsplit("/", 1)[-1], set(SCRIPTS))
+
+
+def index_fingerprint() -> str:
+    """Corpus fingerprint plus the model, so switching models invalidates the index."""
+    return f"{corpus_fingerprint()}|{MULTILINGUAL_MODEL_NAME}"
+
+
+def detect_script(text: str) -> Optional[str]:
+    """The Indic script most letters of `text` are written in, or None for Latin/other text."""
+    counts = dict.fromkeys(SCRIPTS, 0)
+    latin = 0
+    for char in text:
+        code = ord(char)
+        if char.isascii():
+            latin += char.isalpha()
+            continue
+        for script, (low, high) in SCRIPTS.items():
+            if low <= code <= high:
+                counts[script] += 1
+                break
+    script = max(counts, key=counts.get)
+    # Scheme names are often typed in English inside a Hindi question, so compare against Latin letters loosely
+    return script if counts[script] and counts[script] * 2 >= latin else None
+
+
+@lru_cache(maxsize=1)
+def get_multilingual_embeddings():
+    """Multilingual embedder behind the persistent query-embedding cache."""
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    embeddings = HuggingFaceEmbeddings(model_name=MULTILINGUAL_MODEL_NAME)
+    if QUERY_EMBEDDING_CACHE_SIZE > 0:
+        from src.embedding_cache import QueryEmbeddingCache, CachedQueryEmbeddings
+        try:
+            cache = QueryEmbeddingCache(
+                os.path.join(INDEX_CACHE_DIR, "multilingual_query_embeddings"),
+                model_name=MULTILINGUAL_MODEL_NAME,
+                capacity=QUERY_EMBEDDING_CACHE_SIZE
+            )
+            embeddings = CachedQueryEmbeddings(embeddings, cache)
+        except OSError as e:
+            logger.warning(f"Multilingual query embedding cache disabled: {e}")
+    return embeddings
+
+
+def build_multilingual_index(path: str = MULTILINGUAL_INDEX_DIR, embeddings=None):
+    """Embed every corpus chunk with the multilingual model into an ExactIndex at `path`."""
+    from src.exact_search import ExactIndex
+
+    started = time.perf_counter()
+    embeddings = embeddings or get_multilingual_embeddings()
+    fingerprint = index_fingerprint()
+
+    vectors, documents = [], []
+    for page in iter_corpus(include=("documents", "metadatas"), page_size=MULTILINGUAL_BATCH_SIZE):
+        texts = [text or "" for text in page["documents"]]
+        vectors.append(np.asarray(embeddings.embed_documents(texts), dtype=np.float32))
+        documents.extend(
+            Document(id=doc_id, page_content=text, metadata=metadata or {})
+            for doc_id, text, metadata in zip(page["ids"], texts, page["metadatas"])
+        )
+
+    matrix = np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+    if matrix.size:
+        matrix /= np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+
+    ExactIndex(matrix, documents).save(path, fingerprint, dtype="float32")
+    logger.info(f"Built multilingual index over {len(documents)} chunks in {time.perf_counter() - started:.1f}s")
+    return ExactIndex.load(path)
+
+
+@lru_cache(maxsize=1)
+def get_multilingual_index():
+    """The saved multilingual index if it matches the corpus, else None (build it offline)."""
+    from src.exact_search import ExactIndex
+
+    index = ExactIndex.load(MULTILINGUAL_INDEX_DIR, fingerprint=index_fingerprint())
+    if index is None:
+        logger.warning(f"No up-to-date multilingual index at {MULTILINGUAL_INDEX_DIR}; "
+                       "run `python -m src.multilingual build`. Using the English index.")
+    return index
+
+
+class MultilingualRetriever:
+    """Sends Indic-script queries the model covers to the multilingual index, the rest to `base`."""
+
+    supports_filters = True
+
+    def __init__(self, base, k: int = 3):
+        self.base = base
+        self.k = k
+
+    def invoke(self, query: str, filters=None) -> List[Document]:
+        from src.rag import retrieve
+
+        script = detect_script(query)
+        index = get_multilingual_index() if script in supported_scripts() else None
+        if index is None:
+            return retrieve(query, filters=filters, retriever=self.base)
+
+        rows = index.rows_matching(filters) if filters else None
+        query_vector = get_multilingual_embeddings().embed_query(query)
+        docs = [index.documents[row] for row, _ in index.search(query_vector, self.k, rows=rows)]
+        logger.info(f"{script.title()} query searched in the multilingual index ({len(docs)} hits)")
+        return docs
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Multilingual retrieval index for Hindi/Kannada questions.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("build", help="Embed the corpus with the multilingual model")
+    search_parser = subparsers.add_parser("search", help="Search the multilingual index")
+    search_parser.add_argument("query")
+    search_parser.add_argument("-k", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_multilingual_index()
+    else:
+        from src.rag import get_retriever
+        retriever = MultilingualRetriever(get_retriever(), k=args.k)
+        for doc in retriever.invoke(args.query):
+            print(f"- [{doc.metadata.get('source', '?')}] {doc.page_content[:200]}")
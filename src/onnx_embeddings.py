@@ -0,0 +1,174 @@
+"""
+Int8-quantized ONNX backend for query embeddings.
+
+Runs the same all-mpnet-base-v2 model through onnxruntime on CPU, which is
+considerably faster than full-precision PyTorch for single-query encoding.
+Select it with EMBEDDING_BACKEND=onnx after exporting the model once:
+
+    python -m src.onnx_embeddings export
+    python -m src.onnx_embeddings parity
+"""
+import os
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Ensure project root is in path to allow 'src' imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.rag import BASE_DIR, EMBEDDING_MODEL_NAME
+from src.logger import setup_logger
+
+logger = setup_logger("OnnxEmbeddings")
+
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(BASE_DIR, "models", "all-mpnet-base-v2-onnx-int8"))
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+# all-mpnet-base-v2 is trained with a 384 token window
+MAX_SEQ_LENGTH = 384
+# Minimum cosine similarity between ONNX and PyTorch vectors for the same text
+PARITY_MIN_COSINE = 0.98
+
+PARITY_TEXTS = [
+    "What schemes are available for farmers in Karnataka?",
+    "eligibility rules for PM-KISAN",
+    "I am 65 years old, disabled, and living alone. What benefits can I get?",
+    "How do I get an income certificate in Tamil Nadu?",
+    "My PM-KISAN application was rejected. What should I do?",
+    "What is the difference between Ayushman Bharat and state health insurance?",
+    "Please explain the MGNREGA policy/scheme.",
+    "I need help applying for the PM-SVANidhi scheme.",
+]
+
+
+class OnnxEmbeddings(Embeddings):
+    """Mean-pooled, L2-normalised mpnet embeddings computed with onnxruntime."""
+
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR, batch_size: int = 32):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, QUANTIZED_MODEL_FILE)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"Quantized ONNX model not found at {model_path}. Run 'python -m src.onnx_embeddings export' first."
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        num_threads = int(os.getenv("ONNX_NUM_THREADS", "0"))
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+
+        self._session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self._session.get_inputs()}
+
+        self._tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        pad_id = self._tokenizer.token_to_id("<pad>")
+        self._tokenizer.enable_padding(pad_id=pad_id if pad_id is not None else 0, pad_token="<pad>")
+
+        self.batch_size = batch_size
+        logger.info(f"Loaded ONNX embedding model from {model_path}")
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        encodings = self._tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        token_embeddings = self._session.run(None, feeds)[0]
+
+        # Same pooling + normalisation as the sentence-transformers pipeline
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.append(self._encode(texts[start:start + self.batch_size]))
+        if not vectors:
+            return []
+        return np.vstack(vectors).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
+
+
+def export_quantized_model(output_dir: str = ONNX_MODEL_DIR) -> str:
+    """
+    Export all-mpnet-base-v2 to ONNX and apply dynamic int8 quantization.
+    Needs `optimum[onnxruntime]`; only required on the machine doing the export.
+    """
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    logger.info(f"Exporting {EMBEDDING_MODEL_NAME} to ONNX in {output_dir}...")
+
+    model = ORTModelForFeatureExtraction.from_pretrained(EMBEDDING_MODEL_NAME, export=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(EMBEDDING_MODEL_NAME).save_pretrained(output_dir)
+
+    quantizer = ORTQuantizer.from_pretrained(output_dir)
+    qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=output_dir, quantization_config=qconfig)
+
+    model_path = os.path.join(output_dir, QUANTIZED_MODEL_FILE)
+    logger.info(f"Quantized model written to {model_path}")
+    return model_path
+
+
+def check_parity(texts: Optional[List[str]] = None,
+                 reference: Optional[Embeddings] = None,
+                 candidate: Optional[Embeddings] = None) -> Dict[str, float]:
+    """
+    Compare ONNX vectors against the PyTorch HuggingFaceEmbeddings vectors.
+    Returns min/mean cosine similarity and whether it clears PARITY_MIN_COSINE.
+    """
+    texts = texts or PARITY_TEXTS
+    if reference is None:
+        from langchain_huggingface import HuggingFaceEmbeddings
+        reference = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+    if candidate is None:
+        candidate = OnnxEmbeddings()
+
+    ref = np.array(reference.embed_documents(texts), dtype=np.float32)
+    cand = np.array(candidate.embed_documents(texts), dtype=np.float32)
+
+    ref /= np.linalg.norm(ref, axis=1, keepdims=True)
+    cand /= np.linalg.norm(cand, axis=1, keepdims=True)
+    cosines = (ref * cand).sum(axis=1)
+
+    return {
+        "min_cosine": float(cosines.min()),
+        "mean_cosine": float(cosines.mean()),
+        "passed": bool(cosines.min() >= PARITY_MIN_COSINE),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage the quantized ONNX embedding model.")
+    parser.add_argument("command", choices=["export", "parity"])
+    parser.add_argument("--output-dir", default=ONNX_MODEL_DIR)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_quantized_model(args.output_dir)
+
+    # Always verify after an export so a bad quantization is caught early
+    result = check_parity(candidate=OnnxEmbeddings(args.output_dir))
+    print(f"Parity vs PyTorch: min cosine {result['min_cosine']:.4f}, mean {result['mean_cosine']:.4f}")
+    if not result["passed"]:
+        print(f"FAILED: min cosine below {PARITY_MIN_COSINE}")
+        sys.exit(1)
+    print("OK")
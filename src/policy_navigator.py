@@ -6,6 +6,7 @@ from src.schemas import PolicyAnalysisOutput
 from src.agents import llm
 from src.rag import get_retriever
 from src.logger import setup_logger
+from src.prompt_packer import pack_prompt, analysis_section, context_section, question_section
 from src.cache_helper import CacheHelper
 
 logger = setup_logger("PolicyNavigator")
@@ -34,6 +35,10 @@ Focus on:
 4. Risks (ambiguities, missing info)
 5. Metadata (authority, jurisdiction)
 
+For eligibility rules that are simple comparisons on age, income, category, location,
+employment status, education level, family size or special conditions, also fill
+`field`, `operator` and `value` (ages in years, income in rupees per year).
+
 Input Policy Context:
 {context}
 
@@ -54,6 +59,9 @@ The user has selected language: '{language}'.
 STRUCTURED ANALYSIS:
 {analysis}
 
+USER QUESTION:
+{query}
+
 REQUIREMENTS:
 1. Use simple, plain language. Avoid jargon.
 2. Structure with clear headers (e.g., "Am I Eligible?", "What do I get?").
@@ -66,6 +74,31 @@ Output ONLY the Markdown response.
 
 # --- Nodes ---
 
+def catalog_lookup_node(state: InterpretationState):
+    """
+    Use the offline catalog analysis of a known scheme instead of extracting it
+    live. Synthesis still gets the user's question, so it is answered from the
+    catalog analysis rather than replaced by a generic scheme summary.
+    """
+    query = state["input_text"]
+    try:
+        from src.scheme_catalog import lookup_scheme
+
+        hit = lookup_scheme(query)
+    except Exception as e:
+        logger.warning(f"Scheme catalog lookup failed: {e}")
+        hit = None
+
+    if hit is None:
+        return {"catalog_scheme_id": None}
+    scheme_id, analysis = hit
+    logger.info(f"Answering from scheme catalog: {scheme_id}")
+    return {"catalog_scheme_id": scheme_id, "analysis_output": analysis}
+
+def route_after_catalog(state: InterpretationState) -> List[str]:
+    # Intent detection (LLM) and retrieval only need the query, so they run in parallel
+    return ["synthesis_node"] if state.get("catalog_scheme_id") else ["intent_node", "rag_node"]
+
 def intent_node(state: InterpretationState):
     logger.info("Detecting intent...")
     query = state["input_text"]
@@ -112,24 +145,27 @@ def extraction_node(state: InterpretationState):
     docs = state.get("retrieved_docs", [])
     
     context = "\n\n".join([d.page_content for d in docs])
-    if not context:
+    if context:
+        from src.context_compression import compress_context
+        context = compress_context(query, context)
+    else:
         context = "No specific policy documents found. Answer based on general knowledge if possible, or state that info is missing."
 
     # Check cache
     cache_key = CacheHelper.hash_query(query, context[:200])  # Use first 200 chars of context
-    cached_result = CacheHelper.get_llm_cache(cache_key)
+    cached_result = CacheHelper.get_llm_cache(cache_key, prompt=EXTRACTION_PROMPT)
     if cached_result:
         logger.info("Using cached extraction result")
         return {"analysis_output": cached_result}
 
     try:
         structured_llm = llm.with_structured_output(PolicyAnalysisOutput)
-        prompt = EXTRACTION_PROMPT.format(context=context, query=query)
-        
-        analysis = structured_llm.invoke([HumanMessage(content=prompt)])
+        prompt = pack_prompt(EXTRACTION_PROMPT, context=context_section(context), query=question_section(query))
         
-        # Cache the result
-        CacheHelper.set_llm_cache(cache_key, analysis)
+        # Identical concurrent requests share one LLM call, which is then cached
+        analysis = CacheHelper.compute_llm(
+            cache_key, lambda: structured_llm.invoke([HumanMessage(content=prompt)]), prompt=EXTRACTION_PROMPT
+        )
         
         return {"analysis_output": analysis}
     except Exception as e:
@@ -147,7 +183,8 @@ def synthesis_node(state: InterpretationState):
     try:
         # Convert Pydantic model to dict for prompt injection
         analysis_dict = analysis.model_dump()
-        prompt = SYNTHESIS_PROMPT.format(analysis=str(analysis_dict), language=language)
+        prompt = pack_prompt(SYNTHESIS_PROMPT, analysis=analysis_section(str(analysis_dict)),
+                             query=question_section(state["input_text"]), language=language)
         
         response = llm.invoke([HumanMessage(content=prompt)])
         return {
@@ -163,15 +200,17 @@ def synthesis_node(state: InterpretationState):
 def build_policy_navigator():
     workflow = StateGraph(InterpretationState)
     
+    workflow.add_node("catalog_lookup", catalog_lookup_node)
     workflow.add_node("intent_node", intent_node)
     workflow.add_node("rag_node", rag_node)
     workflow.add_node("extraction_node", extraction_node)
     workflow.add_node("synthesis_node", synthesis_node)
     
-    # Linear flow for V1
-    workflow.set_entry_point("intent_node")
-    workflow.add_edge("intent_node", "rag_node")
-    workflow.add_edge("rag_node", "extraction_node")
+    # Known schemes go straight to synthesis; everything else is extracted live
+    workflow.set_entry_point("catalog_lookup")
+    workflow.add_conditional_edges("catalog_lookup", route_after_catalog,
+                                   ["synthesis_node", "intent_node", "rag_node"])
+    workflow.add_edge(["intent_node", "rag_node"], "extraction_node")
     workflow.add_edge("extraction_node", "synthesis_node")
     workflow.add_edge("synthesis_node", END)
     
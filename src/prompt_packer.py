@@ -0,0 +1,136 @@
+"""
+Token-budget-aware prompt assembly shared by all subgraphs.
+
+Prompts used to be built with plain `TEMPLATE.format(...)`, so a long chat
+history, a large profile dump or a big retrieved context could produce
+requests that are slow or rejected by Groq. `pack_prompt` fills a template
+from sections that each carry a token budget and a priority:
+
+  1. every section is first cut to its own budget;
+  2. if the whole prompt is still over PROMPT_MAX_TOKENS, the lowest-priority
+     sections are shrunk further (history first, the user's question last).
+
+History is cut from the front so the latest turns survive; everything else
+keeps its beginning. Tokens are counted locally with tiktoken's cl100k_base
+encoding (loaded once) when installed, otherwise estimated as chars / 4.
+"""
+import os
+from functools import lru_cache
+from typing import NamedTuple, Optional, Union
+
+from src.logger import setup_logger
+
+logger = setup_logger("PromptPacker")
+
+# llama-3.3-70b-versatile (src/agents.py) accepts 128k tokens, so this isn't a context limit.
+# It bounds latency and cost: prompt tokens set time-to-first-token, are billed, and count
+# against Groq's tokens-per-minute rate limit, which every worker shares.
+PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "6000"))
+CONTEXT_TOKENS = int(os.getenv("PROMPT_CONTEXT_TOKENS", "2000"))
+HISTORY_TOKENS = int(os.getenv("PROMPT_HISTORY_TOKENS", "800"))
+PROFILE_TOKENS = int(os.getenv("PROMPT_PROFILE_TOKENS", "400"))
+QUESTION_TOKENS = int(os.getenv("PROMPT_QUESTION_TOKENS", "500"))
+ANALYSIS_TOKENS = int(os.getenv("PROMPT_ANALYSIS_TOKENS", "2500"))
+
+TRUNCATION_MARKER = "[...]"
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable ({e}); estimating tokens as chars/4.")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """Cut `text` to about `max_tokens`, keeping its start ("head") or end ("tail")."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+
+    encoding = _get_encoding()
+    if encoding is None:
+        chars = max_tokens * 4
+        cut = text[:chars] if keep == "head" else text[-chars:]
+    else:
+        tokens = encoding.encode(text, disallowed_special=())
+        cut = encoding.decode(tokens[:max_tokens] if keep == "head" else tokens[-max_tokens:])
+
+    if keep == "head":
+        return cut.rstrip() + f" {TRUNCATION_MARKER}"
+    # Drop the partial first line so history starts on a whole turn
+    newline = cut.find("\n")
+    if 0 <= newline < len(cut) - 1:
+        cut = cut[newline + 1:]
+    return f"{TRUNCATION_MARKER}\n" + cut.lstrip()
+
+
+class Section(NamedTuple):
+    """A variable part of a prompt. Higher priority sections are shrunk last."""
+    text: str
+    budget: Optional[int] = None
+    priority: int = 0
+    keep: str = "head"
+
+
+def history_section(text: str) -> Section:
+    return Section(text, HISTORY_TOKENS, priority=0, keep="tail")
+
+
+def analysis_section(text: str) -> Section:
+    return Section(text, ANALYSIS_TOKENS, priority=1)
+
+
+def profile_section(text: str) -> Section:
+    return Section(text, PROFILE_TOKENS, priority=1)
+
+
+def context_section(text: str) -> Section:
+    return Section(text, CONTEXT_TOKENS, priority=2)
+
+
+def question_section(text: str) -> Section:
+    return Section(text, QUESTION_TOKENS, priority=3)
+
+
+def pack_prompt(template: str, max_tokens: int = PROMPT_MAX_TOKENS, **values: Union[str, Section]) -> str:
+    """
+    Format `template` like `str.format`. Plain string values are inserted as
+    is; Section values are truncated to their budgets and, if the prompt is
+    still over `max_tokens`, shrunk in ascending priority order.
+    """
+    fixed = {name: value for name, value in values.items() if not isinstance(value, Section)}
+    sections = {name: value for name, value in values.items() if isinstance(value, Section)}
+
+    texts = {}
+    for name, section in sections.items():
+        text = section.text or ""
+        texts[name] = truncate_tokens(text, section.budget, section.keep) if section.budget is not None else text
+
+    base_tokens = count_tokens(template.format(**fixed, **{name: "" for name in sections}))
+    counts = {name: count_tokens(text) for name, text in texts.items()}
+    excess = base_tokens + sum(counts.values()) - max_tokens
+
+    if excess > 0:
+        for name in sorted(sections, key=lambda n: sections[n].priority):
+            if excess <= 0:
+                break
+            allowed = max(counts[name] - excess, 0)
+            texts[name] = truncate_tokens(texts[name], allowed, sections[name].keep)
+            excess -= counts[name] - count_tokens(texts[name])
+        logger.warning(f"Prompt over {max_tokens} tokens; shrank lower-priority sections to fit.")
+
+    return template.format(**fixed, **texts)
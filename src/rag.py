@@ -1,35 +1,232 @@
 import os
+import hashlib
 from langchain_community.vectorstores import Chroma
 from langchain_core.documents import Document
 
 from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from src.logger import setup_logger
+
+logger = setup_logger("RAG")
+
+# Helper to get absolute path to chroma_db from src/
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHROMA_PATH = os.path.join(BASE_DIR, "chroma_db")
+# Derived, rebuildable artifacts (caches, side indexes) live here, not in chroma_db
+INDEX_CACHE_DIR = os.getenv("INDEX_CACHE_DIR", os.path.join(BASE_DIR, "index_cache"))
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
+# "torch" (HuggingFaceEmbeddings) or "onnx" (int8 onnxruntime, see src/onnx_embeddings.py)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+# Concurrent queries arriving within this window are encoded in one batch (0 disables)
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "32"))
+# Slots in the persistent query-embedding cache (0 disables)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "16384"))
 
 @lru_cache(maxsize=1)
-def get_retriever():
-    # Helper to get absolute path to chroma_db from src/
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    chroma_path = os.path.join(base_dir, "chroma_db")
-    
-    if not os.path.exists(chroma_path):
-        raise FileNotFoundError(f"ChromaDB directory not found at {chroma_path}")
+def get_embeddings():
+    """Embedding function shared by the vector store and all retrieval modes."""
+    base = _load_base_embeddings()
+    embeddings = base
+
+    if EMBEDDING_BATCH_WINDOW_MS > 0:
+        from src.embedding_batcher import BatchingEmbeddings
+        embeddings = BatchingEmbeddings(
+            embeddings,
+            max_batch_size=EMBEDDING_MAX_BATCH,
+            max_wait_ms=EMBEDDING_BATCH_WINDOW_MS
+        )
+
+    # Cache sits in front of the batcher so repeated queries never queue
+    if QUERY_EMBEDDING_CACHE_SIZE > 0:
+        from src.embedding_cache import QueryEmbeddingCache, CachedQueryEmbeddings
+        try:
+            cache = QueryEmbeddingCache(
+                os.path.join(INDEX_CACHE_DIR, "query_embeddings"),
+                # Backend is part of the tag: ONNX and PyTorch vectors differ slightly
+                model_name=f"{EMBEDDING_MODEL_NAME}:{type(base).__name__}",
+                capacity=QUERY_EMBEDDING_CACHE_SIZE
+            )
+            embeddings = CachedQueryEmbeddings(embeddings, cache)
+        except OSError as e:
+            logger.warning(f"Query embedding cache disabled: {e}")
+
+    return embeddings
+
+def _load_base_embeddings():
+    """Load the embedding model used to encode queries."""
+    if EMBEDDING_BACKEND == "onnx":
+        try:
+            from src.onnx_embeddings import OnnxEmbeddings
+            return OnnxEmbeddings()
+        except Exception as e:
+            logger.warning(f"ONNX embedding backend unavailable ({e}). Falling back to PyTorch.")
 
     from langchain_huggingface import HuggingFaceEmbeddings
-    
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-mpnet-base-v2")
-    
+
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+
+@lru_cache(maxsize=1)
+def get_vector_store():
+    """Open the persisted ChromaDB collection."""
+    if not os.path.exists(CHROMA_PATH):
+        raise FileNotFoundError(f"ChromaDB directory not found at {CHROMA_PATH}")
+
+    # Load existing ChromaDB
+    vector_store = Chroma(
+        persist_directory=CHROMA_PATH,
+        embedding_function=get_embeddings()
+    )
+
+    # Calibrated HNSW ef_search (see src/hnsw_tuning.py)
     try:
-        # Load existing ChromaDB
-        vector_store = Chroma(
-            persist_directory=chroma_path,
-            embedding_function=embeddings
-        )
-        # Reduced from k=5 to k=3 for faster performance
-        return vector_store.as_retriever(search_kwargs={"k": 3})
+        from src.hnsw_tuning import apply_search_settings
+        apply_search_settings(vector_store._collection)
+    except Exception as e:
+        logger.warning(f"Could not apply HNSW settings: {e}")
+    return vector_store
+
+# "vector" (Chroma HNSW), "hybrid" (BM25 + vector, see src/hybrid_retriever.py)
+# or "exact" (NumPy brute force, see src/exact_search.py)
+RETRIEVER_MODE = os.getenv("RETRIEVER_MODE", "vector").lower()
+# Reduced from k=5 to k=3 for faster performance
+RETRIEVER_K = int(os.getenv("RETRIEVER_K", "3"))
+
+@lru_cache(maxsize=None)
+def get_retriever(mode: Optional[str] = None):
+    """
+    Return the retriever for `mode` (defaults to RETRIEVER_MODE).
+    Every mode exposes `invoke(query) -> List[Document]`.
+    With RERANK_ENABLED the retriever fetches a wider candidate pool and a
+    cross-encoder keeps the best RERANK_TOP_N (see src/reranker.py).
+    With MULTILINGUAL_ENABLED, Devanagari/Kannada queries are searched in a
+    multilingual index instead (see src/multilingual.py).
+    """
+    from src.multilingual import MULTILINGUAL_ENABLED, MultilingualRetriever
+    from src.reranker import RERANK_CANDIDATES, RERANK_ENABLED, RERANK_TOP_N, RerankingRetriever
+
+    mode = (mode or RETRIEVER_MODE).lower()
+    try:
+        if RERANK_ENABLED:
+            retriever, k = RerankingRetriever(_build_retriever(mode, k=max(RERANK_CANDIDATES, RETRIEVER_K))), RERANK_TOP_N
+        else:
+            retriever, k = _build_retriever(mode, k=RETRIEVER_K), RETRIEVER_K
+        if MULTILINGUAL_ENABLED:
+            # Outermost: the English cross-encoder can't score Hindi/Kannada queries anyway
+            retriever = MultilingualRetriever(retriever, k=k)
+        return retriever
+    except FileNotFoundError:
+        raise
     except Exception as e:
         print(f"Error loading ChromaDB: {e}")
         # Fallback for testing if database is corrupt or incompatible
         return _mock_retriever
 
+def _build_retriever(mode: str, k: int):
+    vector_store = get_vector_store()
+
+    if mode == "hybrid":
+        from src.hybrid_retriever import build_hybrid_retriever
+        return build_hybrid_retriever(k=k)
+    if mode == "exact":
+        from src.exact_search import build_exact_retriever
+        return build_exact_retriever(k=k)
+
+    if mode != "vector":
+        logger.warning(f"Unknown retriever mode '{mode}', using vector search.")
+    return vector_store.as_retriever(search_kwargs={"k": k})
+
+def retrieve(query: str, filters=None, retriever=None) -> List[Document]:
+    """
+    Run `query` through `retriever` (default: get_retriever()), restricted by
+    RetrievalFilters when given. Falls back to unfiltered results if nothing
+    in the corpus carries matching metadata.
+    """
+    from langchain_core.vectorstores import VectorStoreRetriever
+    from src.retrieval_filters import matches, to_chroma_where
+
+    retriever = retriever or get_retriever()
+    if filters is None or filters.is_empty():
+        return retriever.invoke(query)
+
+    if getattr(retriever, "supports_filters", False) is True:
+        docs = retriever.invoke(query, filters=filters)
+    elif isinstance(retriever, VectorStoreRetriever):
+        k = retriever.search_kwargs.get("k", RETRIEVER_K)
+        docs = search_collection(query, k=k, where=to_chroma_where(filters))
+    else:
+        docs = [d for d in retriever.invoke(query) if matches(d.metadata, filters)]
+
+    if not docs:
+        logger.info(f"No documents match filters ({filters.cache_suffix()}); retrying unfiltered.")
+        docs = retriever.invoke(query)
+    return docs
+
+# --- Corpus helpers shared by the alternative retrieval modes ---
+
+def doc_key(doc: Document) -> str:
+    """Stable identity for a document: its Chroma id, or a hash of its text."""
+    return getattr(doc, "id", None) or hashlib.md5(doc.page_content.encode()).hexdigest()
+
+def corpus_fingerprint(collection=None) -> str:
+    """
+    Changes whenever the Chroma collection's content changes; used to invalidate
+    side indexes. Built from the collection id, the chunk count and a hash of
+    every chunk id with its file_hash, not from file timestamps: opening Chroma
+    touches chroma.sqlite3, so its mtime differs on every worker start.
+    """
+    collection = collection if collection is not None else get_vector_store()._collection
+    entries = []
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=5000, offset=offset)
+        if not page["ids"]:
+            break
+        entries.extend(
+            f"{doc_id}\0{(metadata or {}).get('file_hash', '')}"
+            for doc_id, metadata in zip(page["ids"], page["metadatas"])
+        )
+        offset += len(page["ids"])
+    content = hashlib.sha256("\n".join(sorted(entries)).encode()).hexdigest()[:16]
+    return f"{collection.id}:{len(entries)}:{content}"
+
+def iter_corpus(include: Sequence[str] = ("documents", "metadatas"), page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """Yield the collection page by page so large corpora aren't loaded in one call."""
+    vector_store = get_vector_store()
+    offset = 0
+    while True:
+        page = vector_store.get(include=list(include), limit=page_size, offset=offset)
+        if not page["ids"]:
+            break
+        yield page
+        offset += len(page["ids"])
+
+def search_collection(query: str, k: int, where: Optional[Dict[str, Any]] = None) -> List[Document]:
+    """Vector search that keeps Chroma ids on the returned documents."""
+    query_embedding = get_embeddings().embed_query(query)
+    results = get_vector_store()._collection.query(
+        query_embeddings=[query_embedding],
+        n_results=k,
+        where=where,
+        include=["documents", "metadatas"]
+    )
+    return [
+        Document(id=doc_id, page_content=text or "", metadata=metadata or {})
+        for doc_id, text, metadata in zip(results["ids"][0], results["documents"][0], results["metadatas"][0])
+    ]
+
+def get_documents_by_ids(ids: Sequence[str]) -> List[Document]:
+    """Fetch documents by Chroma id, preserving the order of `ids`."""
+    if not ids:
+        return []
+    page = get_vector_store().get(ids=list(ids), include=["documents", "metadatas"])
+    by_id = {
+        doc_id: Document(id=doc_id, page_content=text or "", metadata=metadata or {})
+        for doc_id, text, metadata in zip(page["ids"], page["documents"], page["metadatas"])
+    }
+    return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+
 class MockRetriever:
     def invoke(self, query):
         return [Document(page_content="Mock policy content regarding " + query)]
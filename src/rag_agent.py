@@ -13,31 +13,58 @@ except ImportError:
 from langchain_core.tools import Tool
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage, AIMessage
-from src.rag import get_retriever
+from src.rag import get_embeddings, get_retriever, retrieve
 from src.agents import llm
 from src.logger import setup_logger
 from src.cache_helper import CacheHelper
+from src.semantic_cache import SEMANTIC_CACHE_SIZE, rag_semantic_cache
+from src.multi_query import MULTI_QUERY_MODE, multi_query_retrieve
 
 logger = setup_logger("RAGAgent")
 
 # --- RAG Tool ---
 
-def retrieve_policy_documents(query: str) -> str:
+def _embed_for_cache(query: str):
+    """Query embedding for the semantic cache; None if disabled or the embedder is unavailable."""
+    if SEMANTIC_CACHE_SIZE <= 0:
+        return None
+    try:
+        return get_embeddings().embed_query(query)
+    except Exception as e:
+        logger.warning(f"Semantic cache skipped, could not embed query: {e}")
+        return None
+
+def retrieve_policy_documents(query: str, filters=None, multi_query: bool = False) -> str:
     """
     Retrieve relevant policy documents based on the query.
     Use this when you need to find specific policy information.
+    Optional RetrievalFilters restrict the search by state/level/scheme.
+    With multi_query, the query is expanded per MULTI_QUERY_MODE (see src/multi_query.py).
     """
+    multi_query = multi_query and MULTI_QUERY_MODE != "off"
     # Check cache first
-    cache_key = CacheHelper.hash_query(query, "rag")
+    filter_suffix = (filters.cache_suffix() if filters else "") + ("|mq=" + MULTI_QUERY_MODE if multi_query else "")
+    cache_key = CacheHelper.hash_query(query, "rag" + filter_suffix)
     cached_docs = CacheHelper.get_rag_cache(cache_key)
     
     if cached_docs:
         logger.info(f"Using cached RAG results for: {query[:50]}...")
         return cached_docs
+
+    # Then a paraphrase of a recent query with the same filters
+    query_vector = _embed_for_cache(query)
+    if query_vector is not None:
+        cached_docs = rag_semantic_cache.get(query_vector, namespace=filter_suffix)
+        if cached_docs:
+            logger.info(f"Using semantically cached RAG results for: {query[:50]}...")
+            CacheHelper.set_rag_cache(cache_key, cached_docs)
+            return cached_docs
     
-    try:
-        retriever = get_retriever()
-        docs = retriever.invoke(query)
+    def search() -> str:
+        if multi_query:
+            docs = multi_query_retrieve(query, filters=filters)
+        else:
+            docs = retrieve(query, filters=filters, retriever=get_retriever())
         
         # Format documents
         if not docs:
@@ -48,11 +75,15 @@ def retrieve_policy_documents(query: str) -> str:
                 for i, doc in enumerate(docs)
             ])
         
-        # Cache the result
-        CacheHelper.set_rag_cache(cache_key, result)
+        if query_vector is not None and docs:
+            rag_semantic_cache.put(query_vector, result, namespace=filter_suffix)
         
         logger.info(f"Retrieved {len(docs)} documents for: {query[:50]}...")
         return result
+    
+    try:
+        # Identical concurrent queries share one retrieval, which is then cached
+        return CacheHelper.compute_rag(cache_key, search)
     except Exception as e:
         logger.error(f"RAG retrieval failed: {e}")
         return f"Error retrieving documents: {str(e)}"
@@ -64,14 +95,14 @@ retrieval_tool = Tool(
     func=retrieve_policy_documents
 )
 
-def rag_agent_retrieve(query: str) -> str:
+def rag_agent_retrieve(query: str, filters=None, multi_query: bool = False) -> str:
     """
     Helper function for other agents to use RAG.
     Directly calls the retrieval tool for reliability.
     """
     try:
         # Direct retrieval - more reliable than complex agent
-        result = retrieve_policy_documents(query)
+        result = retrieve_policy_documents(query, filters=filters, multi_query=multi_query)
         logger.info(f"RAG retrieval completed for: {query[:50]}...")
         return result
     except Exception as e:
@@ -0,0 +1,243 @@
+"""
+Retrieval benchmark over the golden questions in docs/SAMPLE_QUESTIONS.md.
+
+Each question in the "Retrieval Golden Set" table is labelled with the
+schemes that should answer it. A retrieved chunk is relevant if it belongs to
+one of those schemes. Its scheme comes from `scheme_id` metadata (or the
+source file name), and labels are resolved with the scheme resolver. If the
+resolver can't place a label, the label's name is matched in the chunk's
+source or text instead.
+
+For every retriever configuration the harness reports:
+- recall@k: the share of a question's labelled schemes found in the top k.
+- MRR: the reciprocal rank of the first relevant chunk.
+- Retrieval latency percentiles over repeated runs.
+It writes a JSON report with sorted keys, so reports from two commits can be
+diffed, or compared with `--compare`. Usage:
+
+    python -m src.retrieval_eval --configs vector:3 hybrid:3 exact:3 vector:20+rerank \
+        --runs 5 --output retrieval_report.json
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+# Ensure project root is in path to allow 'src' imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.rag import BASE_DIR
+from src.logger import setup_logger
+
+logger = setup_logger("RetrievalEval")
+
+GOLDEN_SET_PATH = os.path.join(BASE_DIR, "docs", "SAMPLE_QUESTIONS.md")
+GOLDEN_SET_HEADING = "## Retrieval Golden Set"
+DEFAULT_CONFIGS = ["vector:3", "hybrid:3", "exact:3"]
+PERCENTILES = (50, 95, 99)
+
+
+class GoldenQuery(NamedTuple):
+    question: str
+    schemes: List[str]
+
+
+class RetrieverConfig(NamedTuple):
+    name: str
+    mode: str
+    k: int
+    rerank: bool
+
+
+def load_golden_set(path: str = GOLDEN_SET_PATH) -> List[GoldenQuery]:
+    """Rows of the Markdown table under the golden-set heading."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    start = text.find(GOLDEN_SET_HEADING)
+    if start < 0:
+        raise ValueError(f"No '{GOLDEN_SET_HEADING}' section in {path}")
+
+    queries = []
+    for line in text[start:].splitlines()[1:]:
+        if line.startswith("## "):
+            break
+        cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+        if len(cells) != 2 or not cells[0] or set(cells[0]) <= set("-: ") or cells[0] == "Question":
+            continue
+        schemes = [s.strip() for s in cells[1].split(";") if s.strip()]
+        if schemes:
+            queries.append(GoldenQuery(cells[0], schemes))
+    return queries
+
+
+def parse_config(spec: str) -> RetrieverConfig:
+    """"hybrid:5" -> hybrid mode, k=5; a "+rerank" suffix reranks k candidates down to RERANK_TOP_N."""
+    match = re.fullmatch(r"(\w+)(?::(\d+))?(\+rerank)?", spec.strip())
+    if not match:
+        raise ValueError(f"Bad retriever config '{spec}'; expected mode[:k][+rerank]")
+    mode, k, rerank = match.groups()
+    return RetrieverConfig(spec, mode, int(k or 3), bool(rerank))
+
+
+def build_retriever(config: RetrieverConfig):
+    from src.rag import _build_retriever
+
+    retriever = _build_retriever(config.mode, k=config.k)
+    if config.rerank:
+        from src.reranker import RerankingRetriever
+        retriever = RerankingRetriever(retriever)
+    return retriever
+
+
+# --- Relevance and metrics ---
+
+def doc_scheme(doc) -> Optional[str]:
+    from src.ingest import scheme_id_for
+    from src.retrieval_filters import SCHEME_KEY
+
+    source = doc.metadata.get("source")
+    return doc.metadata.get(SCHEME_KEY) or (scheme_id_for(source) if source else None)
+
+
+def label_matcher(label: str):
+    """Predicate: does a retrieved document belong to the labelled scheme?"""
+    from src.scheme_resolver import alias_key, resolve_scheme
+
+    scheme_id = resolve_scheme(label)
+    if scheme_id:
+        return lambda doc: doc_scheme(doc) == scheme_id
+    key = alias_key(label)
+    return lambda doc: key in alias_key(f"{doc.metadata.get('source', '')} {doc.page_content}")
+
+
+def relevance(docs: Sequence, matchers: Sequence) -> List[List[bool]]:
+    """relevance[label][rank]: whether the doc at that rank belongs to that label's scheme."""
+    return [[bool(match(doc)) for doc in docs] for match in matchers]
+
+
+def recall_at_k(hits: List[List[bool]], k: int) -> float:
+    return sum(any(row[:k]) for row in hits) / len(hits) if hits else 0.0
+
+
+def reciprocal_rank(hits: List[List[bool]]) -> float:
+    ranks = [rank for row in hits for rank, hit in enumerate(row) if hit]
+    return 1.0 / (min(ranks) + 1) if ranks else 0.0
+
+
+def latency_summary(latencies_ms: Sequence[float]) -> Dict[str, float]:
+    values = np.asarray(latencies_ms, dtype=np.float64)
+    summary = {f"p{p}": round(float(np.percentile(values, p)), 2) for p in PERCENTILES}
+    summary["mean"] = round(float(values.mean()), 2)
+    return summary
+
+
+# --- Runner ---
+
+def evaluate_config(config: RetrieverConfig, golden: Sequence[GoldenQuery], runs: int = 5) -> Dict[str, Any]:
+    from src.rag import retrieve
+
+    retriever = build_retriever(config)
+    retrieve(golden[0].question, retriever=retriever)  # warm-up: model load, index load, first-call setup
+
+    latencies, per_query = [], []
+    for query in golden:
+        for _ in range(runs):
+            started = time.perf_counter()
+            docs = retrieve(query.question, retriever=retriever)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        hits = relevance(docs, [label_matcher(s) for s in query.schemes])
+        per_query.append({
+            "question": query.question,
+            "recall": round(recall_at_k(hits, len(docs)), 4),
+            "reciprocal_rank": round(reciprocal_rank(hits), 4),
+            "retrieved": [doc_scheme(doc) for doc in docs],
+        })
+
+    n = len(per_query)
+    return {
+        "k": config.k,
+        "mode": config.mode,
+        "rerank": config.rerank,
+        "recall_at_k": round(sum(q["recall"] for q in per_query) / n, 4),
+        "mrr": round(sum(q["reciprocal_rank"] for q in per_query) / n, 4),
+        "latency_ms": latency_summary(latencies),
+        "queries": per_query,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(configs: Sequence[str] = DEFAULT_CONFIGS, runs: int = 5,
+                  golden_path: str = GOLDEN_SET_PATH) -> Dict[str, Any]:
+    from src.rag import corpus_fingerprint
+
+    golden = load_golden_set(golden_path)
+    report = {
+        "commit": _git_commit(),
+        "corpus": corpus_fingerprint(),
+        "golden_queries": len(golden),
+        "runs": runs,
+        "configs": {},
+    }
+    for spec in configs:
+        config = parse_config(spec)
+        try:
+            report["configs"][config.name] = evaluate_config(config, golden, runs)
+        except Exception as e:
+            logger.error(f"Config {config.name} failed: {e}")
+            report["configs"][config.name] = {"error": str(e)}
+    return report
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    print(f"Commit {report['commit']} | {report['golden_queries']} golden queries x {report['runs']} runs\n")
+    print(f"{'Config':<20} {'Recall@k':>9} {'MRR':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, result in report["configs"].items():
+        if "error" in result:
+            print(f"{name:<20} error: {result['error']}")
+            continue
+        latency = result["latency_ms"]
+        line = (f"{name:<20} {result['recall_at_k']:>9.3f} {result['mrr']:>7.3f} "
+                f"{latency['p50']:>8.1f} {latency['p95']:>8.1f} {latency['p99']:>8.1f}")
+        old = (baseline or {}).get("configs", {}).get(name)
+        if old and "error" not in old:
+            line += (f"   (recall {result['recall_at_k'] - old['recall_at_k']:+.3f}, "
+                     f"mrr {result['mrr'] - old['mrr']:+.3f}, "
+                     f"p95 {latency['p95'] - old['latency_ms']['p95']:+.1f} ms)")
+        print(line)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recall@k, MRR and latency of retriever configurations.")
+    parser.add_argument("--configs", nargs="+", default=DEFAULT_CONFIGS,
+                        help="mode[:k][+rerank], e.g. vector:3 hybrid:5 vector:20+rerank")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per question")
+    parser.add_argument("--golden", default=GOLDEN_SET_PATH)
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Earlier JSON report to print deltas against")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.configs, args.runs, args.golden)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True, ensure_ascii=False)
+        print(f"\nReport written to {args.output}")
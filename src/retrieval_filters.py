@@ -0,0 +1,101 @@
+"""
+Structured metadata filters for retrieval.
+
+The benefits and eligibility flows know the citizen's state and often the
+scheme, so there is no point searching other states' schemes and asking the
+LLM to ignore them. Filters are expressed once as an AND of OR-clauses over
+metadata keys and translated to whatever each retrieval mode understands:
+a Chroma `where` clause, a partition lookup (exact mode) or a post-filter.
+
+State filters always admit central schemes, which apply in every state.
+"""
+import os
+import re
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+from src.validators import INDIAN_STATES
+
+# Metadata keys expected on Chroma documents (written by src/ingest.py)
+STATE_KEY = os.getenv("FILTER_STATE_KEY", "state")
+LEVEL_KEY = os.getenv("FILTER_LEVEL_KEY", "level")
+SCHEME_KEY = os.getenv("FILTER_SCHEME_KEY", "scheme_id")
+
+CENTRAL_LEVEL = "central"
+
+Clause = List[Tuple[str, str]]
+
+# Longest names first so "Andhra Pradesh" wins over "Pradesh"-like overlaps. Whole
+# words only, so "goat" doesn't name Goa.
+_STATE_PATTERNS = [
+    (state, re.compile(r"\b" + r"\s+".join(map(re.escape, state.lower().split())) + r"\b"))
+    for state in sorted(INDIAN_STATES, key=len, reverse=True)
+]
+
+
+class RetrievalFilters(BaseModel):
+    state: Optional[str] = Field(None, description="Canonical Indian state name")
+    level: Optional[str] = Field(None, description="'central' or 'state'")
+    scheme_id: Optional[str] = Field(None, description="Canonical scheme id")
+
+    def is_empty(self) -> bool:
+        return not (self.state or self.level or self.scheme_id)
+
+    def cache_suffix(self) -> str:
+        """Stable string for cache keys."""
+        return f"state={self.state}|level={self.level}|scheme={self.scheme_id}"
+
+
+def normalize_state(location: Optional[str]) -> Optional[str]:
+    """Find a canonical state name in free text like 'Pune, Maharashtra'."""
+    if not location or not isinstance(location, str):
+        return None
+    text = location.lower()
+    for state, pattern in _STATE_PATTERNS:
+        if pattern.search(text):
+            return state
+    return None
+
+
+def filters_from_profile(profile: Union[BaseModel, Mapping[str, Any], None],
+                         scheme_id: Optional[str] = None) -> RetrievalFilters:
+    """Build filters from a CitizenProfile or the UI's user_profile dict."""
+    if isinstance(profile, BaseModel):
+        location = getattr(profile, "location", None)
+    elif isinstance(profile, Mapping):
+        location = profile.get("location")
+    else:
+        location = None
+    return RetrievalFilters(state=normalize_state(location), scheme_id=scheme_id)
+
+
+def filter_clauses(filters: RetrievalFilters) -> List[Clause]:
+    """AND of OR-clauses; each clause is a list of (metadata key, value) pairs."""
+    clauses: List[Clause] = []
+    if filters.scheme_id:
+        clauses.append([(SCHEME_KEY, filters.scheme_id)])
+    if filters.level:
+        clauses.append([(LEVEL_KEY, filters.level)])
+    if filters.state:
+        clauses.append([(STATE_KEY, filters.state), (LEVEL_KEY, CENTRAL_LEVEL)])
+    return clauses
+
+
+def to_chroma_where(filters: RetrievalFilters) -> Optional[Dict[str, Any]]:
+    """Translate filters into a Chroma `where` clause (None when unfiltered)."""
+    parts = []
+    for clause in filter_clauses(filters):
+        terms = [{key: value} for key, value in clause]
+        parts.append(terms[0] if len(terms) == 1 else {"$or": terms})
+    if not parts:
+        return None
+    return parts[0] if len(parts) == 1 else {"$and": parts}
+
+
+def matches(metadata: Mapping[str, Any], filters: RetrievalFilters) -> bool:
+    """Python equivalent of `to_chroma_where` for post-filtering."""
+    return all(
+        any(metadata.get(key) == value for key, value in clause)
+        for clause in filter_clauses(filters)
+    )
@@ -18,6 +18,17 @@ class EligibilityRule(BaseModel):
     condition: str = Field(..., description="The condition required (e.g., 'Age > 18')")
     is_mandatory: bool = Field(True, description="Is this condition mandatory?")
     exceptions: Optional[List[str]] = Field(None, description="Any exceptions to this rule")
+    # Optional machine-readable form, evaluated without the LLM by src/eligibility_rules.py
+    field: Optional[Literal["age", "income", "category", "location", "employment_status",
+                            "education_level", "family_size", "special_conditions"]] = Field(
+        None, description="Citizen profile field the condition tests, if it is a simple comparison"
+    )
+    operator: Optional[Literal[">=", ">", "<=", "<", "==", "!=", "in", "not_in"]] = Field(
+        None, description="Comparison operator for `field`"
+    )
+    value: Optional[Union[float, str, List[str]]] = Field(
+        None, description="Threshold in years or rupees per year, or the allowed value(s)"
+    )
 
 class Benefit(BaseModel):
     benefit_type: str = Field(..., description="Type: monetary, service, reservation, etc.")
@@ -54,6 +65,7 @@ class CitizenProfile(BaseModel):
     employment_status: Optional[str] = Field(None, description="Employment status")
     family_size: Optional[Union[int, str]] = Field(None, description="Number of family members")
     special_conditions: Optional[List[str]] = Field(None, description="Special conditions (disability, widow, senior, etc.)")
+    gender: Optional[str] = Field(None, description="Gender if stated (female/male/other)")
 
 # ENHANCED: Three-tier eligibility status (supports uppercase from LLM)
 class EligibilityResult(BaseModel):
@@ -0,0 +1,266 @@
+"""
+Offline catalog of structured scheme analyses.
+
+The policy navigator used to run the structured-output extraction LLM call
+on retrieved text for every question, even though most questions are about
+the same popular schemes. `python -m src.scheme_catalog build` runs that
+extraction once per scheme in the corpus and stores each PolicyAnalysisOutput
+as JSON in a small SQLite file, with an alias table mapping scheme names to
+scheme ids. At request time the navigator looks the question up in the alias
+index and only falls back to live extraction for schemes it does not know.
+
+Chunks are grouped into schemes by their `scheme_id` metadata (written by
+src/ingest.py), falling back to the source file name. Each scheme's text hash
+is stored too, so a rebuild only re-extracts schemes whose documents changed.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Ensure project root is in path to allow 'src' imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.rag import BASE_DIR
+from src.schemas import PolicyAnalysisOutput
+from src.logger import setup_logger
+
+logger = setup_logger("SchemeCatalog")
+
+# Lives next to chroma_db rather than in index_cache: rebuilding it costs one LLM call per scheme
+SCHEME_CATALOG_PATH = os.getenv("SCHEME_CATALOG_PATH", os.path.join(BASE_DIR, "scheme_catalog.db"))
+# Longest alias, in words, the lookup tries to match
+MAX_ALIAS_WORDS = 8
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS schemes (
+    scheme_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    analysis TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT PRIMARY KEY,
+    scheme_id TEXT NOT NULL REFERENCES schemes(scheme_id) ON DELETE CASCADE
+);
+"""
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase words only: "PM-KISAN Yojana" -> "pm kisan yojana"."""
+    return " ".join(re.findall(r"[a-z0-9\u0900-\u097f\u0c80-\u0cff]+", text.lower()))
+
+
+class SchemeCatalog:
+    """SQLite-backed scheme_id -> PolicyAnalysisOutput store with an alias index."""
+
+    def __init__(self, path: str = SCHEME_CATALOG_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._aliases: Optional[Dict[str, str]] = None
+        self._analyses: Dict[str, PolicyAnalysisOutput] = {}
+
+    # --- Writing (offline build) ---
+
+    def content_hash(self, scheme_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT content_hash FROM schemes WHERE scheme_id = ?", (scheme_id,)).fetchone()
+        return row[0] if row else None
+
+    def upsert(self, scheme_id: str, name: str, aliases: Iterable[str],
+               analysis: PolicyAnalysisOutput, content_hash: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO schemes (scheme_id, name, analysis, content_hash, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (scheme_id, name, analysis.model_dump_json(), content_hash, time.time()),
+            )
+            self._conn.execute("DELETE FROM aliases WHERE scheme_id = ?", (scheme_id,))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO aliases (alias, scheme_id) VALUES (?, ?)",
+                [(alias, scheme_id) for alias in {normalize_name(a) for a in aliases} if alias],
+            )
+            self._aliases = None
+            self._analyses.pop(scheme_id, None)
+
+    def delete_missing(self, scheme_ids: Iterable[str]) -> int:
+        """Drop schemes that are no longer in the corpus."""
+        keep = set(scheme_ids)
+        with self._lock, self._conn:
+            stale = [row[0] for row in self._conn.execute("SELECT scheme_id FROM schemes") if row[0] not in keep]
+            self._conn.executemany("DELETE FROM aliases WHERE scheme_id = ?", [(s,) for s in stale])
+            self._conn.executemany("DELETE FROM schemes WHERE scheme_id = ?", [(s,) for s in stale])
+            self._aliases = None
+        return len(stale)
+
+    # --- Reading (request path) ---
+
+    def aliases(self) -> Dict[str, str]:
+        with self._lock:
+            if self._aliases is None:
+                self._aliases = dict(self._conn.execute("SELECT alias, scheme_id FROM aliases"))
+            return self._aliases
+
+    def get(self, scheme_id: str) -> Optional[PolicyAnalysisOutput]:
+        with self._lock:
+            if scheme_id in self._analyses:
+                return self._analyses[scheme_id]
+            row = self._conn.execute("SELECT analysis FROM schemes WHERE scheme_id = ?", (scheme_id,)).fetchone()
+            if row is None:
+                return None
+            analysis = PolicyAnalysisOutput.model_validate_json(row[0])
+            self._analyses[scheme_id] = analysis
+            return analysis
+
+    def iter_analyses(self) -> Iterator[Tuple[str, PolicyAnalysisOutput]]:
+        """Every (scheme_id, analysis) in the catalog, ordered by scheme_id."""
+        with self._lock:
+            rows = self._conn.execute("SELECT scheme_id, analysis FROM schemes ORDER BY scheme_id").fetchall()
+        for scheme_id, analysis in rows:
+            yield scheme_id, PolicyAnalysisOutput.model_validate_json(analysis)
+
+    def find_scheme(self, text: str) -> Optional[str]:
+        """
+        The single scheme named in `text`, matching the longest known alias
+        first. Returns None if no scheme or more than one scheme is named.
+        """
+        aliases = self.aliases()
+        words = normalize_name(text).split()
+        found, covered = set(), set()
+        for size in range(min(MAX_ALIAS_WORDS, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                span = range(start, start + size)
+                if covered.intersection(span):
+                    continue
+                scheme_id = aliases.get(" ".join(words[start:start + size]))
+                if scheme_id:
+                    found.add(scheme_id)
+                    covered.update(span)
+        return found.pop() if len(found) == 1 else None
+
+    def lookup(self, text: str) -> Optional[Tuple[str, PolicyAnalysisOutput]]:
+        scheme_id = self.find_scheme(text)
+        if scheme_id is None:
+            return None
+        analysis = self.get(scheme_id)
+        return (scheme_id, analysis) if analysis else None
+
+
+@lru_cache(maxsize=1)
+def get_catalog() -> Optional[SchemeCatalog]:
+    """The built catalog, or None if it has not been built yet."""
+    if not os.path.exists(SCHEME_CATALOG_PATH):
+        logger.info(f"No scheme catalog at {SCHEME_CATALOG_PATH}; using live extraction only.")
+        return None
+    return SchemeCatalog(SCHEME_CATALOG_PATH)
+
+
+def lookup_scheme(text: str) -> Optional[Tuple[str, PolicyAnalysisOutput]]:
+    catalog = get_catalog()
+    if catalog is None:
+        return None
+    hit = catalog.lookup(text)
+    if hit is None:
+        # Abbreviations and misspellings the alias table doesn't list
+        from src.scheme_resolver import find_scheme_in_text
+
+        scheme_id = find_scheme_in_text(text)
+        analysis = catalog.get(scheme_id) if scheme_id else None
+        hit = (scheme_id, analysis) if analysis else None
+    return hit
+
+
+# --- Offline build ---
+
+def iter_scheme_documents() -> Iterable[Tuple[str, str, List[str]]]:
+    """Yield (scheme_id, display name, chunk texts) for every scheme in the corpus."""
+    from src.ingest import scheme_id_for
+    from src.rag import iter_corpus
+    from src.retrieval_filters import SCHEME_KEY
+
+    chunks: Dict[str, List[str]] = defaultdict(list)
+    names: Dict[str, str] = {}
+    for page in iter_corpus(include=("documents", "metadatas")):
+        for text, metadata in zip(page["documents"], page["metadatas"]):
+            metadata = metadata or {}
+            source = metadata.get("source")
+            scheme_id = metadata.get(SCHEME_KEY) or (scheme_id_for(source) if source else None)
+            if not scheme_id or not text:
+                continue
+            chunks[scheme_id].append(text)
+            names.setdefault(scheme_id, metadata.get("scheme_name") or scheme_id.replace("-", " ").title())
+
+    for scheme_id in sorted(chunks):
+        # Chroma returns chunks in no particular order; sort so the hash is stable
+        yield scheme_id, names[scheme_id], sorted(chunks[scheme_id])
+
+
+def extract_scheme(name: str, chunks: List[str]) -> PolicyAnalysisOutput:
+    from langchain_core.messages import HumanMessage
+    from src.agents import llm
+    from src.policy_navigator import EXTRACTION_PROMPT
+    from src.prompt_packer import context_section, pack_prompt, question_section
+
+    prompt = pack_prompt(
+        EXTRACTION_PROMPT,
+        context=context_section("\n\n".join(chunks)),
+        query=question_section(f"Explain the {name} scheme: who is eligible, what it gives and what applicants must do."),
+    )
+    return llm.with_structured_output(PolicyAnalysisOutput).invoke([HumanMessage(content=prompt)])
+
+
+def build_catalog(path: str = SCHEME_CATALOG_PATH, force: bool = False, limit: Optional[int] = None) -> Dict[str, int]:
+    """Extract every new or changed scheme into the catalog at `path`."""
+    catalog = SchemeCatalog(path)
+    stats = defaultdict(int)
+    seen = []
+    for scheme_id, name, chunks in iter_scheme_documents():
+        seen.append(scheme_id)
+        content_hash = hashlib.sha256("\0".join(chunks).encode()).hexdigest()
+        if not force and catalog.content_hash(scheme_id) == content_hash:
+            stats["unchanged"] += 1
+            continue
+        if limit is not None and stats["extracted"] >= limit:
+            continue
+        try:
+            analysis = extract_scheme(name, chunks)
+        except Exception as e:
+            logger.error(f"Extraction failed for {scheme_id}: {e}")
+            stats["failed"] += 1
+            continue
+
+        aliases = [name, scheme_id.replace("-", " "), analysis.metadata.policy_name or ""]
+        catalog.upsert(scheme_id, analysis.metadata.policy_name or name, aliases, analysis, content_hash)
+        stats["extracted"] += 1
+        logger.info(f"Cataloged {scheme_id}")
+
+    stats["removed"] = catalog.delete_missing(seen)
+    return dict(stats)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the structured scheme catalog from the corpus.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Extract new or changed schemes")
+    build_parser.add_argument("--force", action="store_true", help="Re-extract every scheme")
+    build_parser.add_argument("--limit", type=int, help="Extract at most this many schemes (for rate limits)")
+    lookup_parser = subparsers.add_parser("lookup", help="Show which scheme a question resolves to")
+    lookup_parser.add_argument("text")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print(build_catalog(force=args.force, limit=args.limit))
+    else:
+        hit = lookup_scheme(args.text)
+        print(json.dumps({"scheme_id": hit[0], **hit[1].model_dump()}, indent=2) if hit else "No catalog match")
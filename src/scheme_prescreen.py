@@ -0,0 +1,218 @@
+"""
+Vectorized pre-screening of every cataloged scheme against a citizen profile.
+
+The benefits matcher used to ask the LLM to find "ALL benefits" in three
+retrieved chunks. Instead, each scheme's basic criteria (age bounds, income
+cap, state, category, gender, occupation) are pulled out of its catalog
+rules once into NumPy columns. A profile then becomes one boolean mask over
+all schemes, built from a handful of column comparisons, and only the
+shortlist goes into the prompt.
+
+Screening is deliberately permissive. A criterion the scheme doesn't state,
+or a profile value that is missing, never excludes a scheme. Rules with
+exceptions are ignored. The LLM still makes the final call on the shortlist.
+"""
+import os
+import re
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.eligibility_rules import CATEGORY_VALUES, normalize_category, parse_condition, to_interval
+from src.retrieval_filters import normalize_state
+from src.schemas import CitizenProfile, PolicyAnalysisOutput
+from src.validators import INDIAN_STATES
+from src.logger import setup_logger
+
+logger = setup_logger("SchemePrescreen")
+
+PRESCREEN_SHORTLIST_SIZE = int(os.getenv("PRESCREEN_SHORTLIST_SIZE", "8"))
+
+# Occupation keyword -> bit; matched in rule text and in the profile's employment status
+OCCUPATIONS = {
+    "farmer": r"farmer|cultivator|kisan|agricultur",
+    "student": r"student|scholar",
+    "street_vendor": r"vendor|hawker",
+    "worker": r"daily wage|labou?rer|worker|artisan",
+    "self_employed": r"self[- ]employed|entrepreneur|business",
+    "unemployed": r"unemployed|jobless",
+}
+_OCCUPATION_BITS = {name: 1 << i for i, name in enumerate(OCCUPATIONS)}
+_CATEGORY_BITS = {name: 1 << i for i, name in enumerate(CATEGORY_VALUES)}
+_STATE_CODES = {state: i for i, state in enumerate(INDIAN_STATES)}
+ANY_STATE = -1
+GENDER_ANY, GENDER_FEMALE, GENDER_MALE = 0, 1, 2
+_FEMALE_RE = r"\b(women|woman|female|girls?|widows?|mothers?|daughters?)\b"
+_MALE_RE = r"\b(men|male|boys?)\b"
+
+
+def occupation_bits(text: str) -> int:
+    text = text.lower()
+    return sum(bit for name, bit in _OCCUPATION_BITS.items() if re.search(OCCUPATIONS[name], text))
+
+
+def gender_code(text: str) -> int:
+    text = text.lower()
+    if re.search(_FEMALE_RE, text):
+        return GENDER_FEMALE
+    if re.search(_MALE_RE, text):
+        return GENDER_MALE
+    return GENDER_ANY
+
+
+class SchemeCriteria:
+    """Basic criteria of one scheme, read from its mandatory eligibility rules."""
+
+    def __init__(self, analysis: PolicyAnalysisOutput):
+        self.age_min, self.age_max, self.income_max = -np.inf, np.inf, np.inf
+        self.state = ANY_STATE
+        self.categories = self.occupations = 0
+        self.gender = GENDER_ANY
+
+        jurisdiction_state = normalize_state(analysis.metadata.jurisdiction or "")
+        if jurisdiction_state:
+            self.state = _STATE_CODES[jurisdiction_state]
+
+        for rule in analysis.eligibility_rules:
+            if not rule.is_mandatory or rule.exceptions:
+                continue
+            self._apply(rule)
+
+    def _apply(self, rule):
+        structured = rule if rule.field and rule.operator and rule.value is not None else parse_condition(rule.condition)
+        if structured is not None:
+            field, operator, value = structured.field, structured.operator, structured.value
+            values = value if isinstance(value, list) else [value]
+            if field in ("age", "income"):
+                bounds = [to_interval(v) for v in values]
+                if None in bounds:
+                    return
+                if operator in (">=", ">") and field == "age":
+                    self.age_min = max(self.age_min, bounds[0][0])
+                elif operator in ("<=", "<"):
+                    if field == "age":
+                        self.age_max = min(self.age_max, bounds[0][0])
+                    else:
+                        self.income_max = min(self.income_max, bounds[0][0])
+                elif operator == "in" and field == "age" and len(bounds) == 2:
+                    self.age_min = max(self.age_min, min(b[0] for b in bounds))
+                    self.age_max = min(self.age_max, max(b[0] for b in bounds))
+                return
+            if field == "category" and operator in ("==", "in"):
+                self.categories |= sum(_CATEGORY_BITS.get(normalize_category(v) or "", 0) for v in values)
+                return
+            if field == "location" and operator in ("==", "in"):
+                state = normalize_state(str(values[0]))
+                if state:
+                    self.state = _STATE_CODES[state]
+                return
+
+        # Occupation and gender are only ever stated in prose
+        self.occupations |= occupation_bits(rule.condition)
+        self.gender = self.gender or gender_code(rule.condition)
+
+
+class PrescreenIndex:
+    """Scheme criteria as parallel NumPy columns."""
+
+    def __init__(self, schemes: Sequence[Tuple[str, PolicyAnalysisOutput]]):
+        self.scheme_ids = [scheme_id for scheme_id, _ in schemes]
+        self.analyses = [analysis for _, analysis in schemes]
+        criteria = [SchemeCriteria(analysis) for analysis in self.analyses]
+
+        self.age_min = np.array([c.age_min for c in criteria], dtype=np.float64)
+        self.age_max = np.array([c.age_max for c in criteria], dtype=np.float64)
+        self.income_max = np.array([c.income_max for c in criteria], dtype=np.float64)
+        self.state = np.array([c.state for c in criteria], dtype=np.int16)
+        self.categories = np.array([c.categories for c in criteria], dtype=np.uint8)
+        self.occupations = np.array([c.occupations for c in criteria], dtype=np.uint16)
+        self.gender = np.array([c.gender for c in criteria], dtype=np.int8)
+
+    def __len__(self):
+        return len(self.scheme_ids)
+
+    def screen(self, profile: CitizenProfile) -> Tuple[np.ndarray, np.ndarray]:
+        """(mask of schemes the profile may qualify for, number of criteria positively matched)."""
+        n = len(self.scheme_ids)
+        mask = np.ones(n, dtype=bool)
+        matched = np.zeros(n, dtype=np.int8)
+
+        age = to_interval(profile.age)
+        if age is not None:
+            has_bound = np.isfinite(self.age_min) | np.isfinite(self.age_max)
+            mask &= (self.age_max >= age[0]) & (self.age_min <= age[1])
+            matched += has_bound
+
+        income = to_interval(profile.income)
+        if income is not None:
+            has_cap = np.isfinite(self.income_max)
+            mask &= self.income_max >= income[0]
+            matched += has_cap
+
+        state = normalize_state(profile.location or "")
+        if state is not None:
+            scoped = self.state != ANY_STATE
+            mask &= ~scoped | (self.state == _STATE_CODES[state])
+            matched += scoped
+
+        category = normalize_category(profile.category or "")
+        if category is not None:
+            restricted = self.categories != 0
+            mask &= ~restricted | ((self.categories & _CATEGORY_BITS[category]) != 0)
+            matched += restricted
+
+        occupations = occupation_bits(profile.employment_status or "")
+        if occupations:
+            restricted = self.occupations != 0
+            mask &= ~restricted | ((self.occupations & occupations) != 0)
+            matched += restricted
+
+        gender = gender_code(" ".join([profile.gender or ""] + (profile.special_conditions or [])))
+        if gender != GENDER_ANY:
+            restricted = self.gender != GENDER_ANY
+            mask &= ~restricted | (self.gender == gender)
+            matched += restricted
+
+        return mask, matched
+
+    def shortlist(self, profile: CitizenProfile, limit: int = PRESCREEN_SHORTLIST_SIZE) -> List[Tuple[str, PolicyAnalysisOutput]]:
+        """Schemes passing the screen, most specifically targeted at this profile first."""
+        mask, matched = self.screen(profile)
+        candidates = np.flatnonzero(mask)
+        # Stable sort keeps catalog (scheme_id) order among equally specific schemes
+        ranked = candidates[np.argsort(-matched[candidates], kind="stable")][:limit]
+        return [(self.scheme_ids[i], self.analyses[i]) for i in ranked]
+
+
+@lru_cache(maxsize=1)
+def get_prescreen_index() -> Optional[PrescreenIndex]:
+    """Index over the scheme catalog, or None if the catalog hasn't been built."""
+    from src.scheme_catalog import get_catalog
+
+    catalog = get_catalog()
+    if catalog is None:
+        return None
+    index = PrescreenIndex(list(catalog.iter_analyses()))
+    logger.info(f"Pre-screen index covers {len(index)} schemes")
+    return index
+
+
+def format_shortlist(schemes: Sequence[Tuple[str, PolicyAnalysisOutput]]) -> str:
+    """Compact prompt text: one line per scheme with its summary and key rules."""
+    lines = []
+    for scheme_id, analysis in schemes:
+        rules = "; ".join(r.condition for r in analysis.eligibility_rules[:4])
+        lines.append(f"- {analysis.metadata.policy_name or scheme_id}: {analysis.summary}"
+                     + (f" (Rules: {rules})" if rules else ""))
+    return "\n".join(lines)
+
+
+def prescreen_schemes(profile: Optional[CitizenProfile]) -> str:
+    """Shortlist text for the benefits prompt; empty if there is no profile or catalog."""
+    if profile is None:
+        return ""
+    index = get_prescreen_index()
+    if index is None:
+        return ""
+    return format_shortlist(index.shortlist(profile))
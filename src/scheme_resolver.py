@@ -0,0 +1,378 @@
+"""
+Scheme-name resolution: aliases, abbreviations and misspellings -> scheme id.
+
+`check_eligibility_rules` and the advocacy flow get scheme names as free text
+("ayushman", "PMJAY", "PM-JAY", "pm kissan") and used to hope semantic search
+would land on the right scheme. The resolver is built from the corpus
+metadata (plus the scheme catalog's aliases when it exists). It keys every
+alias in a character trie after removing spaces and punctuation, so "PM-JAY",
+"pm jay" and "pmjay" share a key. A name is resolved by exact key, then as a
+unique prefix ("ayushman"), then by bounded edit distance walked over the trie.
+A name that could mean more than one scheme resolves to None.
+
+Each scheme also keeps its Chroma document ids, so retrieval for a resolved
+scheme reads that scheme's chunks instead of searching the whole corpus.
+The index is pickled to INDEX_CACHE_DIR and rebuilt when the corpus changes.
+"""
+import os
+import pickle
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from langchain_core.documents import Document
+
+from src.rag import INDEX_CACHE_DIR, RETRIEVER_K, corpus_fingerprint, get_documents_by_ids, iter_corpus
+from src.logger import setup_logger
+
+logger = setup_logger("SchemeResolver")
+
+SCHEME_RESOLVER_PATH = os.path.join(INDEX_CACHE_DIR, "scheme_resolver.pkl")
+# Shortest input that may resolve as a prefix of a longer name
+MIN_PREFIX_LENGTH = 4
+# Longest word span of a question checked against aliases
+MAX_SPAN_WORDS = 6
+# After a failed build, wait this long before trying again
+SCHEME_RESOLVER_RETRY_SECONDS = 300
+
+# Words shared by many scheme names; a span made only of these names no scheme
+GENERIC_WORDS = {
+    "pm", "pradhan", "mantri", "cm", "mukhyamantri", "chief", "minister", "national", "rashtriya",
+    "state", "central", "government", "govt", "scheme", "schemes", "yojana", "yojna", "mission",
+    "abhiyan", "programme", "program", "card", "benefit", "benefits", "pension", "scholarship", "bharat",
+    "farmer", "farmers", "women", "student", "students", "senior", "citizen", "citizens", "widow",
+    "health", "insurance", "loan", "housing",
+}
+_STOPWORDS = {
+    "a", "an", "and", "apply", "are", "can", "do", "eligible", "eligibility", "for", "how", "i", "in",
+    "is", "me", "my", "of", "on", "or", "the", "to", "under", "what", "which", "with",
+}
+# Everyday English words that also occur in scheme names ("PM Street Vendor's ..."). In free
+# text they never name a scheme on their own, so "the street lights" doesn't resolve to SVANidhi.
+COMMON_WORDS = {
+    "about", "account", "accident", "age", "agriculture", "allowance", "bank", "bills", "build", "building",
+    "business", "child", "children", "city", "clean", "construction", "credit", "crop", "daughter",
+    "deposit", "development", "digital", "disabled", "drinking", "education", "electricity", "employment",
+    "energy", "enterprise", "family", "food", "free", "fund", "girl", "girls", "group", "guarantee",
+    "help", "highway", "home", "hospital", "house", "income", "india", "indian", "jobs", "labour", "labor",
+    "life", "light", "lights", "market", "medical", "mother", "mothers", "national", "pay", "plan",
+    "power", "road", "roads", "rural", "safe", "savings", "school", "security", "seed", "self", "skill",
+    "skills", "small", "social", "soil", "solar", "sports", "stand", "start", "startup", "street",
+    "support", "tell", "toilet", "treatment", "urban", "vendor", "vendors", "village", "water", "welfare",
+    "work", "worker", "workers", "young", "youth",
+}
+# Distinctive words shorter than this are too ambiguous to name a scheme alone
+MIN_TOKEN_LENGTH = 4
+_TITLE_WORDS = {"pm", "cm", "pradhan", "mantri", "mukhyamantri"}
+_SUFFIX_WORDS = {"scheme", "yojana", "yojna", "abhiyan", "mission", "programme", "program"}
+
+
+def normalize_words(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9\u0900-\u097f\u0c80-\u0cff]+", text.lower())
+
+
+def alias_key(text: str) -> str:
+    """Lookup key: "PM-JAY" / "pm jay" / "PMJAY" -> "pmjay"."""
+    return "".join(normalize_words(text))
+
+
+def aliases_for(name: str) -> Set[str]:
+    """Alias keys derived from a scheme name: the name, shortened forms and acronyms."""
+    variants = [normalize_words(name)]
+    variants += [normalize_words(inner) for inner in re.findall(r"\(([^)]+)\)", name)]
+    words = normalize_words(re.sub(r"\([^)]*\)", " ", name))
+    variants.append(words)
+    if words and words[-1] in _SUFFIX_WORDS:
+        variants.append(words[:-1])
+    if "pradhan" in words and "mantri" in words:
+        variants.append(" ".join(words).replace("pradhan mantri", "pm").split())
+    # "PM SVANidhi" -> "svanidhi"
+    for variant in list(variants):
+        start = 0
+        while start < len(variant) - 1 and variant[start] in _TITLE_WORDS:
+            start += 1
+        if start:
+            variants.append(variant[start:])
+
+    keys = {"".join(v) for v in variants if v}
+    # "Pradhan Mantri Jan Arogya Yojana" -> "pmjay"; also for trailing spans ("Ayushman Bharat ...")
+    for start in range(len(words) - 2):
+        acronym = "".join(w[0] for w in words[start:])
+        if len(acronym) >= 4:
+            keys.add(acronym)
+    return {k for k in keys if len(k) >= 3}
+
+
+class _Node:
+    __slots__ = ("children", "schemes")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.schemes: Set[str] = set()
+
+
+class AliasTrie:
+    """Character trie of alias keys with exact, prefix and edit-distance lookup."""
+
+    def __init__(self):
+        self.root = _Node()
+
+    def insert(self, key: str, scheme_id: str):
+        node = self.root
+        for char in key:
+            node = node.children.setdefault(char, _Node())
+        node.schemes.add(scheme_id)
+
+    def _find(self, key: str) -> Optional[_Node]:
+        node = self.root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def exact(self, key: str) -> Set[str]:
+        node = self._find(key)
+        return set(node.schemes) if node else set()
+
+    def prefix(self, key: str) -> Set[str]:
+        """Schemes with any alias starting with `key`."""
+        node = self._find(key)
+        found: Set[str] = set()
+        stack = [node] if node else []
+        while stack:
+            node = stack.pop()
+            found |= node.schemes
+            stack.extend(node.children.values())
+        return found
+
+    def fuzzy(self, key: str, max_distance: int, prefix: bool = False) -> Dict[str, int]:
+        """
+        Scheme -> smallest Levenshtein distance of its aliases to `key`, within
+        max_distance. With prefix=True, distance to the closest alias prefix.
+        """
+        found: Dict[str, int] = {}
+        first_row = list(range(len(key) + 1))
+        inf = len(key) + max_distance + 1
+        # Depth-first walk carrying one DP row per node; prune when a row can't get back under the limit.
+        # `best` is the closest any prefix on the path got to the whole key.
+        stack = [(child, char, first_row, inf) for char, child in self.root.children.items()]
+        while stack:
+            node, char, previous, best = stack.pop()
+            row = [previous[0] + 1]
+            for i in range(1, len(key) + 1):
+                row.append(min(row[i - 1] + 1, previous[i] + 1, previous[i - 1] + (key[i - 1] != char)))
+            distance = min(best, row[-1]) if prefix else row[-1]
+            if distance <= max_distance:
+                for scheme_id in node.schemes:
+                    found[scheme_id] = min(found.get(scheme_id, distance), distance)
+            if min(row) <= max_distance or distance <= max_distance:
+                stack.extend((child, c, row, distance if prefix else inf) for c, child in node.children.items())
+        return found
+
+
+def max_edit_distance(key: str) -> int:
+    if len(key) < 5:
+        return 0
+    return 1 if len(key) <= 8 else 2
+
+
+def is_distinctive(word: str) -> bool:
+    """Whether a single word can name a scheme in free text ("ayushman", "svanidhi")."""
+    return (len(word) >= MIN_TOKEN_LENGTH and word not in GENERIC_WORDS
+            and word not in _STOPWORDS and word not in COMMON_WORDS)
+
+
+class SchemeResolver:
+    """Alias trie over the corpus's schemes plus each scheme's document ids."""
+
+    # Bumped when the pickled layout or alias rules change, so old pickles are rebuilt
+    VERSION = 3
+
+    def __init__(self):
+        self.trie = AliasTrie()
+        # Distinctive single words of scheme names, for free-text matching
+        self.token_trie = AliasTrie()
+        self.names: Dict[str, str] = {}
+        self.doc_ids: Dict[str, List[str]] = defaultdict(list)
+        self.fingerprint: Optional[str] = None
+        self.version = self.VERSION
+
+    def add(self, scheme_id: str, name: str, aliases: Iterable[str] = ()):
+        self.names.setdefault(scheme_id, name)
+        for text in [name, scheme_id, *aliases]:
+            for key in aliases_for(text):
+                self.trie.insert(key, scheme_id)
+            for word in normalize_words(text):
+                if is_distinctive(word):
+                    self.token_trie.insert(word, scheme_id)
+
+    @staticmethod
+    def _unique(candidates) -> Optional[str]:
+        return next(iter(candidates)) if len(candidates) == 1 else None
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Scheme id for a scheme name answer like "PMJAY" or "ayushmn bharat", else None."""
+        key = alias_key(name)
+        if len(key) < 3:
+            return None
+        matches = self.trie.exact(key)
+        if not matches and len(key) >= MIN_PREFIX_LENGTH:
+            matches = self.trie.prefix(key)
+        if not matches:
+            distances = self.trie.fuzzy(key, max_edit_distance(key), prefix=len(key) >= MIN_PREFIX_LENGTH)
+            if distances:
+                best = min(distances.values())
+                matches = {s for s, d in distances.items() if d == best}
+        return self._unique(matches)
+
+    def find_in_text(self, text: str) -> Optional[str]:
+        """
+        The single scheme named somewhere in a question, else None. Spans must
+        match a whole alias ("pm kisan", "pmjay"); otherwise a single distinctive
+        word must equal a word of one scheme's name. Nothing is fuzzy-matched:
+        in free text a one-letter edit turns ordinary words into scheme names
+        ("grain" -> "gramin"), and the scheme found here is used without an LLM
+        check. Misspelt names are handled by `resolve`, which only sees answers
+        that are meant to be scheme names.
+        """
+        words = normalize_words(text)
+        found: Set[str] = set()
+        covered: Set[int] = set()
+        for size in range(min(MAX_SPAN_WORDS, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                span = range(start, start + size)
+                if covered.intersection(span):
+                    continue
+                span_words = words[start:start + size]
+                key = "".join(span_words)
+                matches = self.trie.exact(key) if len(key) >= 3 else set()
+                if not matches and size == 1 and is_distinctive(key):
+                    matches = self.token_trie.exact(key)
+                if len(matches) == 1:
+                    found |= matches
+                    covered.update(span)
+        return self._unique(found)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SchemeResolver":
+        resolver = cls()
+        with open(path, "rb") as f:
+            resolver.__dict__.update(pickle.load(f))
+        return resolver
+
+
+def build_resolver() -> SchemeResolver:
+    """Collect scheme ids, names and document ids from the corpus (and catalog aliases)."""
+    from src.ingest import scheme_id_for
+    from src.retrieval_filters import SCHEME_KEY
+    from src.scheme_catalog import get_catalog
+
+    resolver = SchemeResolver()
+    for page in iter_corpus(include=("metadatas",)):
+        for doc_id, metadata in zip(page["ids"], page["metadatas"]):
+            metadata = metadata or {}
+            source = metadata.get("source")
+            scheme_id = metadata.get(SCHEME_KEY) or (scheme_id_for(source) if source else None)
+            if not scheme_id:
+                continue
+            if scheme_id not in resolver.names:
+                resolver.add(scheme_id, metadata.get("scheme_name") or scheme_id.replace("-", " ").title())
+            resolver.doc_ids[scheme_id].append(doc_id)
+
+    catalog = get_catalog()
+    if catalog is not None:
+        aliases = defaultdict(list)
+        for alias, scheme_id in catalog.aliases().items():
+            aliases[scheme_id].append(alias)
+        for scheme_id, scheme_aliases in aliases.items():
+            if scheme_id in resolver.names:
+                resolver.add(scheme_id, resolver.names[scheme_id], scheme_aliases)
+    resolver.doc_ids = dict(resolver.doc_ids)
+    return resolver
+
+
+def load_or_build_resolver(path: str = SCHEME_RESOLVER_PATH) -> SchemeResolver:
+    """Load the pickled resolver if it matches the current corpus, otherwise rebuild it."""
+    fingerprint = corpus_fingerprint()
+    if os.path.exists(path):
+        try:
+            resolver = SchemeResolver.load(path)
+            if resolver.fingerprint == fingerprint and getattr(resolver, "version", 1) == SchemeResolver.VERSION:
+                return resolver
+            logger.info("Corpus changed since scheme resolver was built; rebuilding.")
+        except Exception as e:
+            logger.warning(f"Could not load scheme resolver: {e}. Rebuilding.")
+
+    started = time.perf_counter()
+    resolver = build_resolver()
+    resolver.fingerprint = fingerprint
+    resolver.save(path)
+    logger.info(f"Built scheme resolver over {len(resolver.names)} schemes in {time.perf_counter() - started:.1f}s")
+    return resolver
+
+
+_resolver: Optional[SchemeResolver] = None
+_resolver_lock = threading.Lock()
+_failed_at: Optional[float] = None
+
+
+def get_resolver() -> Optional[SchemeResolver]:
+    """The process-wide resolver; None while it can't be built, retried periodically."""
+    global _resolver, _failed_at
+    if _resolver is not None:
+        return _resolver
+    if _failed_at is not None and time.time() - _failed_at < SCHEME_RESOLVER_RETRY_SECONDS:
+        return None
+    with _resolver_lock:
+        if _resolver is None:
+            try:
+                _resolver = load_or_build_resolver()
+                _failed_at = None
+            except Exception as e:
+                _failed_at = time.time()
+                logger.warning(f"Scheme resolver unavailable: {e}")
+        return _resolver
+
+
+def reset_resolver():
+    """Forget the loaded resolver (e.g. after the catalog gained aliases)."""
+    global _resolver, _failed_at
+    with _resolver_lock:
+        _resolver, _failed_at = None, None
+
+
+def resolve_scheme(name: Optional[str]) -> Optional[str]:
+    resolver = get_resolver()
+    return resolver.resolve(name) if resolver and name else None
+
+
+def find_scheme_in_text(text: str) -> Optional[str]:
+    resolver = get_resolver()
+    return resolver.find_in_text(text) if resolver else None
+
+
+def scheme_name(scheme_id: str) -> str:
+    resolver = get_resolver()
+    return (resolver.names.get(scheme_id) if resolver else None) or scheme_id.replace("-", " ").title()
+
+
+def scheme_documents(scheme_id: str, query: str, k: int = RETRIEVER_K) -> List[Document]:
+    """A scheme's chunks: fetched directly by id when it has at most k, else searched within the scheme."""
+    from src.rag import get_retriever, retrieve
+    from src.retrieval_filters import RetrievalFilters
+
+    resolver = get_resolver()
+    doc_ids = resolver.doc_ids.get(scheme_id, []) if resolver else []
+    if doc_ids and len(doc_ids) <= k:
+        return get_documents_by_ids(doc_ids)
+    return retrieve(query, filters=RetrievalFilters(scheme_id=scheme_id), retriever=get_retriever())
@@ -0,0 +1,108 @@
+"""
+Similarity-keyed cache for RAG results.
+
+CacheHelper keys on an MD5 of the exact query text, so "schemes for farmers
+in Karnataka" and "Karnataka farmer schemes" never share an entry. This
+cache keeps the embeddings of recently answered queries in a small
+preallocated NumPy matrix; a new query whose cosine similarity to a cached
+one is at least SEMANTIC_CACHE_THRESHOLD reuses that entry's result.
+
+Entries live in an OrderedDict of matrix slots, so a hit refreshes an entry
+and the least recently used slot is overwritten when the cache is full.
+Entries are scoped by a namespace (e.g. the retrieval filters) and only
+match queries in the same namespace.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from src.logger import setup_logger
+
+logger = setup_logger("SemanticCache")
+
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "256"))
+# all-mpnet-base-v2 paraphrases typically score 0.85-0.95; unrelated queries rarely exceed 0.8
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+
+
+class SemanticCache:
+    """LRU cache whose lookups match on query-embedding cosine similarity."""
+
+    def __init__(self, capacity: int = SEMANTIC_CACHE_SIZE, threshold: float = SEMANTIC_CACHE_THRESHOLD):
+        self.capacity = capacity
+        self.threshold = threshold
+        self._matrix: Optional[np.ndarray] = None  # allocated on first put, once the dimension is known
+        self._namespaces = np.empty(capacity, dtype=object)
+        self._valid = np.zeros(capacity, dtype=bool)
+        self._entries: "OrderedDict[int, Any]" = OrderedDict()  # slot -> value, oldest first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        return v / max(float(np.linalg.norm(v)), 1e-12)
+
+    def get(self, vector: Sequence[float], namespace: str = "") -> Optional[Any]:
+        """Value of the most similar cached query above the threshold, else None."""
+        with self._lock:
+            slot = self._best_slot(self._normalize(vector), namespace)
+            if slot is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(slot)
+            return self._entries[slot]
+
+    def _best_slot(self, q: np.ndarray, namespace: str) -> Optional[int]:
+        if self._matrix is None or not self._entries or q.shape[0] != self._matrix.shape[1]:
+            return None
+        scores = self._matrix @ q
+        scores[~(self._valid & (self._namespaces == namespace))] = -1.0
+        slot = int(np.argmax(scores))
+        return slot if scores[slot] >= self.threshold else None
+
+    def put(self, vector: Sequence[float], value: Any, namespace: str = ""):
+        if self.capacity <= 0:
+            return
+        q = self._normalize(vector)
+        with self._lock:
+            if self._matrix is None or q.shape[0] != self._matrix.shape[1]:
+                self._matrix = np.zeros((self.capacity, q.shape[0]), dtype=np.float32)
+                self._valid[:] = False
+                self._entries.clear()
+
+            if len(self._entries) < self.capacity:
+                slot = int(np.flatnonzero(~self._valid)[0])
+            else:
+                slot, _ = self._entries.popitem(last=False)
+
+            self._matrix[slot] = q
+            self._namespaces[slot] = namespace
+            self._valid[slot] = True
+            self._entries[slot] = value
+            self._entries.move_to_end(slot)
+
+    def clear(self):
+        with self._lock:
+            self._valid[:] = False
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "threshold": self.threshold,
+        }
+
+
+# Shared by all requests in this process
+rag_semantic_cache = SemanticCache()
@@ -0,0 +1,75 @@
+"""
+Request coalescing for identical in-flight LLM and RAG calls.
+
+When several users submit the same popular form at once ("explain PM
+Kisan"), they all miss the cache before the first answer is stored, and each
+fires its own identical Groq call. A `SingleFlight` group lets the first
+caller for a key run the call while later callers with the same key wait on
+its future and share the result (or its exception). The key is forgotten as
+soon as the call finishes, so this is not a cache. Results are stored by the
+caller, see CacheHelper.compute_llm / compute_rag.
+
+Coalescing is per process. Across gunicorn workers the shared SQLite L2 of
+src/llm_cache.py takes over once the first answer is written.
+"""
+import os
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict
+
+from src.logger import setup_logger
+
+logger = setup_logger("SingleFlight")
+
+# How long a follower waits for the leader before making the call itself
+SINGLE_FLIGHT_TIMEOUT_SECONDS = float(os.getenv("SINGLE_FLIGHT_TIMEOUT_SECONDS", "60"))
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self, name: str, timeout: float = SINGLE_FLIGHT_TIMEOUT_SECONDS):
+        self.name = name
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._stats = {"calls": 0, "coalesced": 0, "timeouts": 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self._stats["calls"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            try:
+                return future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                logger.warning(f"{self.name}: in-flight call exceeded {self.timeout}s; calling directly")
+                return fn()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._in_flight))
+
+
+llm_flight = SingleFlight("llm")
+rag_flight = SingleFlight("rag")
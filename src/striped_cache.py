@@ -0,0 +1,171 @@
+"""
+Thread-safe, byte-bounded LRU cache with per-entry TTL and per-namespace metrics.
+
+CacheHelper's dicts evicted "the first key" (insertion order, not recency)
+and were capped by entry count, however large the entries were. They were
+also mutated from concurrent Flask threads without a lock. Here each
+namespace ("rag", "llm", ...) is split into lock stripes by key hash, so
+threads touching different keys rarely wait on each other. Each stripe is an
+OrderedDict in recency order with its share of the byte budget. Entries are
+sized approximately when inserted: UTF-8 length for text, JSON length for
+pydantic models, and a recursive sys.getsizeof for the rest. Hits, misses,
+evictions, expirations and bytes are counted per namespace and published
+through `cache_stats()` (served at /metrics).
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+DEFAULT_STRIPES = 16
+
+
+def approximate_size(value: Any, _depth: int = 0) -> int:
+    """Rough in-memory size of a cached value in bytes."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8", errors="ignore")) + 49
+    if isinstance(value, (bytes, bytearray)):
+        return len(value) + 33
+    if isinstance(value, BaseModel):
+        return len(value.model_dump_json()) * 2
+    if _depth < 4:
+        if isinstance(value, dict):
+            return sys.getsizeof(value) + sum(
+                approximate_size(k, _depth + 1) + approximate_size(v, _depth + 1) for k, v in value.items()
+            )
+        if isinstance(value, (list, tuple, set)):
+            return sys.getsizeof(value) + sum(approximate_size(v, _depth + 1) for v in value)
+    page_content = getattr(value, "page_content", None)
+    if isinstance(page_content, str):
+        # LangChain Document
+        return approximate_size(page_content) + approximate_size(getattr(value, "metadata", {}), _depth + 1)
+    return sys.getsizeof(value)
+
+
+class _Stripe:
+    __slots__ = ("lock", "entries", "bytes", "hits", "misses", "evictions", "expirations")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key -> (value, size, expires_at or None), least recently used first
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+
+class StripedLRUCache:
+    """LRU keyed by string, bounded by approximate bytes, split into lock stripes."""
+
+    def __init__(self, namespace: str, max_bytes: int, default_ttl: Optional[float] = None,
+                 stripes: int = DEFAULT_STRIPES):
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._stripes: List[_Stripe] = [_Stripe() for _ in range(max(1, stripes))]
+        self._stripe_budget = max_bytes // len(self._stripes)
+
+    def _stripe(self, key: str) -> _Stripe:
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        stripe = self._stripe(key)
+        with stripe.lock:
+            entry = stripe.entries.get(key)
+            if entry is None:
+                stripe.misses += 1
+                return default
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del stripe.entries[key]
+                stripe.bytes -= size
+                stripe.expirations += 1
+                stripe.misses += 1
+                return default
+            stripe.entries.move_to_end(key)
+            stripe.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, size: Optional[int] = None,
+            expires_at: Optional[float] = None):
+        """
+        Insert or refresh `key`. `ttl` (seconds) defaults to the cache's
+        default_ttl; `expires_at` sets an absolute deadline instead.
+        """
+        size = approximate_size(value) + len(key) if size is None else size
+        if expires_at is None:
+            ttl = self.default_ttl if ttl is None else ttl
+            expires_at = time.time() + ttl if ttl else None
+
+        stripe = self._stripe(key)
+        with stripe.lock:
+            old = stripe.entries.pop(key, None)
+            if old is not None:
+                stripe.bytes -= old[1]
+            if size > self._stripe_budget:
+                return  # would evict the whole stripe for one entry
+            stripe.entries[key] = (value, size, expires_at)
+            stripe.bytes += size
+            while stripe.bytes > self._stripe_budget:
+                _, (_, evicted_size, _) = stripe.entries.popitem(last=False)
+                stripe.bytes -= evicted_size
+                stripe.evictions += 1
+
+    def delete(self, key: str):
+        stripe = self._stripe(key)
+        with stripe.lock:
+            entry = stripe.entries.pop(key, None)
+            if entry is not None:
+                stripe.bytes -= entry[1]
+
+    def clear(self):
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.entries.clear()
+                stripe.bytes = 0
+
+    def __len__(self) -> int:
+        return sum(len(stripe.entries) for stripe in self._stripes)
+
+    def stats(self) -> Dict[str, Any]:
+        totals = dict.fromkeys(("hits", "misses", "evictions", "expirations", "bytes", "entries"), 0)
+        for stripe in self._stripes:
+            with stripe.lock:
+                totals["hits"] += stripe.hits
+                totals["misses"] += stripe.misses
+                totals["evictions"] += stripe.evictions
+                totals["expirations"] += stripe.expirations
+                totals["bytes"] += stripe.bytes
+                totals["entries"] += len(stripe.entries)
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_rate"] = round(totals["hits"] / lookups, 4) if lookups else 0.0
+        totals["max_bytes"] = self.max_bytes
+        return totals
+
+
+_registry: Dict[str, StripedLRUCache] = {}
+_registry_lock = threading.Lock()
+
+
+def get_cache(namespace: str, max_bytes: int, default_ttl: Optional[float] = None) -> StripedLRUCache:
+    """The process-wide cache for `namespace`, created on first use."""
+    with _registry_lock:
+        cache = _registry.get(namespace)
+        if cache is None:
+            cache = _registry[namespace] = StripedLRUCache(namespace, max_bytes, default_ttl)
+        return cache
+
+
+def register_cache(cache: StripedLRUCache) -> StripedLRUCache:
+    """Publish a cache built elsewhere under its namespace in `cache_stats()`."""
+    with _registry_lock:
+        _registry[cache.namespace] = cache
+    return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        caches = dict(_registry)
+    return {namespace: cache.stats() for namespace, cache in sorted(caches.items())}
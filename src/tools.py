@@ -1,6 +1,8 @@
 from langchain_core.tools import tool
 from src.config import get_zynd_agent
-from src.rag import get_retriever
+from src.rag import get_retriever, retrieve
+from src.retrieval_filters import filters_from_profile
+from src.scheme_resolver import resolve_scheme, scheme_documents
 import json
 
 @tool
@@ -39,8 +41,14 @@ def check_eligibility_rules(age: int, income: int, location: str, scheme_name: s
     query = f"eligibility rules for {scheme_name}"
     print(f"[Tool] Searching ChromaDB for: '{query}'")
     
-    retriever = get_retriever()
-    docs = retriever.invoke(query)
+    scheme_id = resolve_scheme(scheme_name)
+    if scheme_id:
+        # Known scheme: read its own chunks instead of searching the corpus
+        docs = scheme_documents(scheme_id, query)
+    else:
+        # Only the citizen's state and central schemes are relevant
+        filters = filters_from_profile({"location": location})
+        docs = retrieve(query, filters=filters, retriever=get_retriever())
     
     if not docs:
         return f"Could not find specific eligibility rules for {scheme_name} in the database."
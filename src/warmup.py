@@ -0,0 +1,113 @@
+"""
+Background warm-up of the retrieval stack.
+
+Loading the embedding model and opening ChromaDB takes several seconds, so
+each worker does it in a daemon thread at boot instead of on the first
+citizen request. `/readyz` reports the readiness flag to the load balancer.
+Only the embedder and vector store gate readiness, and a failed attempt is
+retried with exponential backoff. Optional side indexes are warmed after
+the worker is ready, and their failures are only logged.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.logger import setup_logger
+
+logger = setup_logger("Warmup")
+
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "true").lower() == "true"
+WARMUP_QUERY = "eligibility criteria for PM-KISAN scheme"
+# A failed warm-up is retried after this delay, doubling up to the maximum
+WARMUP_RETRY_SECONDS = 5
+WARMUP_MAX_RETRY_SECONDS = 300
+
+_ready = threading.Event()
+_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+_status: Dict[str, Any] = {"state": "not_started", "error": None, "duration_seconds": None, "attempts": 0}
+
+
+def _warm_retrieval():
+    """Load the embedder and vector store; the only steps that gate readiness."""
+    from src.rag import get_retriever
+
+    retriever = get_retriever()
+    # A dummy query builds the tokenizer and runs the model once so the
+    # first real request doesn't pay for lazy kernel initialisation.
+    retriever.invoke(WARMUP_QUERY)
+
+
+def _warm_optional():
+    """Side indexes that only speed up the first request; failures are logged, not fatal."""
+    try:
+        # Load (or build) the scheme-name resolver off the request path too
+        from src.scheme_resolver import get_resolver
+        get_resolver()
+    except Exception as e:
+        logger.warning(f"Scheme resolver warm-up failed: {e}")
+
+    try:
+        # Embed the intent router's examples so the first chat query doesn't pay for it
+        from src.intent_router import INTENT_ROUTER_ENABLED, get_intent_router
+        if INTENT_ROUTER_ENABLED:
+            get_intent_router()
+    except Exception as e:
+        logger.warning(f"Intent router warm-up failed: {e}")
+
+
+def _run_warmup():
+    started = time.perf_counter()
+    delay = WARMUP_RETRY_SECONDS
+    while True:
+        _status["state"] = "warming"
+        _status["attempts"] += 1
+        try:
+            _warm_retrieval()
+            break
+        except Exception as e:
+            # Chroma or the model may not be there yet (volume mount, download); keep trying
+            _status["state"] = "retrying"
+            _status["error"] = str(e)
+            logger.error(f"Retrieval warm-up failed (attempt {_status['attempts']}), retrying in {delay}s: {e}")
+            time.sleep(delay)
+            delay = min(delay * 2, WARMUP_MAX_RETRY_SECONDS)
+
+    _status["state"] = "ready"
+    _status["error"] = None
+    _status["duration_seconds"] = round(time.perf_counter() - started, 2)
+    _ready.set()
+    logger.info(f"Retrieval warm-up finished in {_status['duration_seconds']}s")
+    _warm_optional()
+
+
+def start_warmup() -> bool:
+    """
+    Start the warm-up thread once per process.
+    Returns False if warm-up is disabled via WARMUP_ON_START.
+    """
+    global _thread
+
+    if not WARMUP_ON_START:
+        # Nothing to wait for; lazy loading happens on first request
+        _status["state"] = "disabled"
+        _ready.set()
+        return False
+
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run_warmup, name="retrieval-warmup", daemon=True)
+            _thread.start()
+            logger.info("Retrieval warm-up started in background")
+    return True
+
+
+def is_ready() -> bool:
+    """True once the embedder and vector store are loaded."""
+    return _ready.is_set()
+
+
+def get_status() -> Dict[str, Any]:
+    """Snapshot of the warm-up state for health endpoints."""
+    return dict(_status, ready=is_ready())
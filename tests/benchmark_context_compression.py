@@ -0,0 +1,89 @@
+"""
+Measure prompt tokens saved by query-aware context compression.
+
+For each agent that compresses its context, builds the real prompt with the
+full retrieved context and with the compressed one, and reports token counts
+and the compression time. With --llm it also times the Groq call on both
+prompts (needs GROQ_API_KEY). Usage:
+
+    python tests/benchmark_context_compression.py [--budget 600] [--llm]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_core.messages import HumanMessage
+
+from src.context_compression import compress_context
+from src.prompt_packer import count_tokens
+from src.rag_agent import retrieve_policy_documents
+
+QUERIES = [
+    "What schemes are available for farmers in Karnataka?",
+    "I am 65 years old, disabled, and living alone. What benefits can I get?",
+    "My PM-KISAN application was rejected. What should I do?",
+    "eligibility rules for Post Matric Scholarship for SC/ST",
+    "How many days of work is guaranteed under MGNREGA?",
+    "I need help applying for the PM-SVANidhi scheme.",
+]
+
+
+def _agent_prompts():
+    """agent name -> function(query, context) building that agent's prompt."""
+    from src.benefits_matching import BENEFITS_MATCHING_PROMPT
+    from src.policy_navigator import EXTRACTION_PROMPT
+
+    return {
+        "benefits_matching": lambda q, c: BENEFITS_MATCHING_PROMPT.format(
+            profile="No profile", context=c, query=q, location="Unknown"),
+        "policy_extraction": lambda q, c: EXTRACTION_PROMPT.format(context=c, query=q),
+    }
+
+
+def _llm_ms(prompt):
+    from src.agents import llm
+
+    start = time.perf_counter()
+    llm.invoke([HumanMessage(content=prompt)])
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=int, default=600)
+    parser.add_argument("--llm", action="store_true", help="Also time Groq calls on both prompts")
+    args = parser.parse_args()
+
+    contexts = {q: retrieve_policy_documents(q) for q in QUERIES}
+    compress_context(QUERIES[0], contexts[QUERIES[0]], args.budget)  # warm the embedder
+
+    print(f"{'Agent':<20} {'Full tok':>9} {'Compr tok':>10} {'Saved':>7} {'Compress ms':>12}"
+          + (f" {'LLM full ms':>12} {'LLM compr ms':>13}" if args.llm else ""))
+    for agent, build_prompt in _agent_prompts().items():
+        full, compressed, compress_ms, llm_full, llm_compressed = [], [], [], [], []
+        for query, context in contexts.items():
+            start = time.perf_counter()
+            short = compress_context(query, context, args.budget)
+            compress_ms.append((time.perf_counter() - start) * 1000)
+
+            full_prompt, short_prompt = build_prompt(query, context), build_prompt(query, short)
+            full.append(count_tokens(full_prompt))
+            compressed.append(count_tokens(short_prompt))
+            if args.llm:
+                llm_full.append(_llm_ms(full_prompt))
+                llm_compressed.append(_llm_ms(short_prompt))
+
+        saved = 1 - sum(compressed) / sum(full)
+        line = (f"{agent:<20} {statistics.mean(full):>9.0f} {statistics.mean(compressed):>10.0f} "
+                f"{saved:>6.0%} {statistics.mean(compress_ms):>12.1f}")
+        if args.llm:
+            line += f" {statistics.median(llm_full):>12.0f} {statistics.median(llm_compressed):>13.0f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark query-encoding latency and memory for each embedding backend.
+
+Each backend runs in its own subprocess so RSS numbers aren't polluted by
+the other model. Usage (from project root):
+
+    python tests/benchmark_embeddings.py [--runs 50] [--threads 8]
+
+The throughput columns compare concurrent callers hitting the model directly
+against the same callers going through the micro-batching wrapper.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+BACKENDS = ["torch", "onnx"]
+
+QUERIES = [
+    "What schemes are available for farmers in Karnataka?",
+    "I am 65 years old, disabled, and living alone. What benefits can I get?",
+    "How do I get an income certificate in Tamil Nadu?",
+    "My PM-KISAN application was rejected. What should I do?",
+    "What is the difference between Ayushman Bharat and state health insurance?",
+    "eligibility rules for Post Matric Scholarship for SC/ST",
+    "Please explain the MGNREGA policy/scheme. How many days of work is guaranteed?",
+    "I need help applying for the PM-SVANidhi scheme.",
+]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _throughput(embeddings, runs, threads):
+    """Queries per second with `threads` concurrent callers."""
+    queries = [QUERIES[i % len(QUERIES)] + f" ({i})" for i in range(runs)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(embeddings.embed_query, queries))
+    return runs / (time.perf_counter() - start)
+
+
+def run_child(runs, threads):
+    """Measure one backend inside this process and print a JSON line."""
+    from src.rag import _load_base_embeddings
+    from src.embedding_batcher import BatchingEmbeddings
+
+    start = time.perf_counter()
+    embeddings = _load_base_embeddings()
+    load_seconds = time.perf_counter() - start
+
+    # First call pays for lazy initialisation; keep it out of the latency numbers
+    embeddings.embed_query(QUERIES[0])
+
+    latencies = []
+    for i in range(runs):
+        query = QUERIES[i % len(QUERIES)]
+        t0 = time.perf_counter()
+        embeddings.embed_query(query)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    direct_qps = _throughput(embeddings, runs, threads)
+    batched_qps = _throughput(BatchingEmbeddings(embeddings), runs, threads)
+
+    print(json.dumps({
+        "backend": type(embeddings).__name__,
+        "load_seconds": round(load_seconds, 2),
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+        "direct_qps": round(direct_qps, 1),
+        "batched_qps": round(batched_qps, 1),
+        # ru_maxrss is reported in KB on Linux
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--skip-parity", action="store_true")
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.runs, args.threads)
+        return
+
+    print(f"Benchmarking {len(BACKENDS)} backends, {args.runs} queries each...\n")
+    print(f"{'Requested':<10} {'Loaded':<22} {'Load s':>7} {'p50 ms':>8} {'p95 ms':>8} {'Mean ms':>8} "
+          f"{'QPS':>7} {'Batch QPS':>10} {'RSS MB':>8}")
+    for backend in BACKENDS:
+        env = dict(os.environ, EMBEDDING_BACKEND=backend, WARMUP_ON_START="false")
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child",
+             "--runs", str(args.runs), "--threads", str(args.threads)],
+            env=env, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(f"{backend:<10} FAILED: {proc.stderr.strip().splitlines()[-1] if proc.stderr else 'unknown error'}")
+            continue
+        stats = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{backend:<10} {stats['backend']:<22} {stats['load_seconds']:>7} {stats['p50_ms']:>8} "
+              f"{stats['p95_ms']:>8} {stats['mean_ms']:>8} {stats['direct_qps']:>7} {stats['batched_qps']:>10} "
+              f"{stats['max_rss_mb']:>8}")
+
+    if not args.skip_parity:
+        from src.onnx_embeddings import check_parity, PARITY_MIN_COSINE
+
+        result = check_parity(QUERIES)
+        status = "OK" if result["passed"] else f"FAILED (< {PARITY_MIN_COSINE})"
+        print(f"\nParity onnx vs torch: min cosine {result['min_cosine']:.4f}, "
+              f"mean {result['mean_cosine']:.4f} -> {status}")
+
+
+if __name__ == "__main__":
+    main()
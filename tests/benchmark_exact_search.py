@@ -0,0 +1,75 @@
+"""
+Compare exact NumPy search against the Chroma HNSW path.
+
+Exact search is the ground truth, so recall@k here measures how many of the
+true nearest neighbours Chroma's approximate index returns. Usage:
+
+    python tests/benchmark_exact_search.py [--k 3] [--runs 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.rag import get_embeddings, get_vector_store
+from src.exact_search import load_or_export_exact_index
+
+QUERIES = [
+    "What schemes are available for farmers in Karnataka?",
+    "I am 65 years old, disabled, and living alone. What benefits can I get?",
+    "How do I get an income certificate in Tamil Nadu?",
+    "My PM-KISAN application was rejected. What should I do?",
+    "What is the difference between Ayushman Bharat and state health insurance?",
+    "eligibility rules for Post Matric Scholarship for SC/ST",
+    "How many days of work is guaranteed under MGNREGA?",
+    "I need help applying for the PM-SVANidhi scheme.",
+    "pension for widows",
+    "housing scheme for rural families",
+]
+
+
+def _timed(fn, runs):
+    """Run fn `runs` times; return (last result, mean ms)."""
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = fn()
+    return result, (time.perf_counter() - start) * 1000 / runs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    collection = get_vector_store()._collection
+    index = load_or_export_exact_index()
+    embeddings = get_embeddings()
+    print(f"Corpus: {len(index.documents)} documents, matrix {index.matrix.shape} {index.matrix.dtype}\n")
+
+    chroma_ms, exact_ms, recalls = [], [], []
+    for query in QUERIES:
+        # Encode once so both paths are timed on search alone
+        vector = embeddings.embed_query(query)
+
+        chroma, ms = _timed(lambda: collection.query(
+            query_embeddings=[vector], n_results=args.k, include=["documents", "metadatas"]
+        ), args.runs)
+        chroma_ms.append(ms)
+
+        exact, ms = _timed(lambda: [index.documents[row] for row, _ in index.search(vector, args.k)], args.runs)
+        exact_ms.append(ms)
+
+        truth = {doc.id for doc in exact}
+        recalls.append(len(truth & set(chroma["ids"][0])) / max(len(truth), 1))
+
+    print(f"{'Path':<8} {'Mean ms':>8} {'Max ms':>8}")
+    print(f"{'chroma':<8} {sum(chroma_ms) / len(chroma_ms):>8.2f} {max(chroma_ms):>8.2f}")
+    print(f"{'exact':<8} {sum(exact_ms) / len(exact_ms):>8.2f} {max(exact_ms):>8.2f}")
+    print(f"\nChroma recall@{args.k} vs exact: {sum(recalls) / len(recalls):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Measure what cross-encoder reranking adds on top of retrieval.
+
+Times the base retriever with RERANK_CANDIDATES results, the rerank pass on
+those candidates, and reports how many prompt characters the top-n selection
+saves compared with sending every candidate. Usage:
+
+    python tests/benchmark_reranker.py [--candidates 20] [--top-n 3] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.rag import RETRIEVER_MODE, _build_retriever
+from src.reranker import RERANK_MODEL_NAME, get_cross_encoder, rerank
+
+QUERIES = [
+    "What schemes are available for farmers in Karnataka?",
+    "I am 65 years old, disabled, and living alone. What benefits can I get?",
+    "How do I get an income certificate in Tamil Nadu?",
+    "My PM-KISAN application was rejected. What should I do?",
+    "What is the difference between Ayushman Bharat and state health insurance?",
+    "eligibility rules for Post Matric Scholarship for SC/ST",
+    "How many days of work is guaranteed under MGNREGA?",
+    "I need help applying for the PM-SVANidhi scheme.",
+    "pension for widows",
+    "housing scheme for rural families",
+]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--top-n", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if get_cross_encoder() is None:
+        sys.exit("Cross-encoder could not be loaded; install sentence-transformers.")
+    print(f"Loaded {RERANK_MODEL_NAME} in {time.perf_counter() - start:.1f}s")
+
+    retriever = _build_retriever(RETRIEVER_MODE, k=args.candidates)
+    retriever.invoke(QUERIES[0])  # warm the embedding model
+
+    retrieve_ms, rerank_ms, chars_all, chars_top = [], [], [], []
+    for query in QUERIES:
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            candidates = retriever.invoke(query)
+            t1 = time.perf_counter()
+            top = rerank(query, candidates, args.top_n)
+            t2 = time.perf_counter()
+            retrieve_ms.append((t1 - t0) * 1000)
+            rerank_ms.append((t2 - t1) * 1000)
+        chars_all.append(sum(len(d.page_content) for d in candidates))
+        chars_top.append(sum(len(d.page_content) for d in top))
+
+    print(f"\n{'Stage':<26} {'p50 ms':>8} {'p95 ms':>8}")
+    print(f"{f'retrieve k={args.candidates}':<26} {_percentile(retrieve_ms, 50):>8.1f} {_percentile(retrieve_ms, 95):>8.1f}")
+    print(f"{f'rerank -> top {args.top_n}':<26} {_percentile(rerank_ms, 50):>8.1f} {_percentile(rerank_ms, 95):>8.1f}")
+    print(f"\nContext chars per query: {statistics.mean(chars_all):.0f} (all candidates) "
+          f"-> {statistics.mean(chars_top):.0f} (reranked top {args.top_n})")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,14 @@ import sys
 # Ensure project root is in path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+# Keep test runs from reading or writing the shared on-disk LLM cache
+os.environ.setdefault("LLM_CACHE_PERSIST", "false")
+# Routing tests exercise the orchestrator LLM path; the router has its own unit tests
+os.environ.setdefault("INTENT_ROUTER_ENABLED", "false")
+os.environ.setdefault("INTENT_ROUTER_LOG", "")
+# Importing src.app must not load models in a background thread; warm-up tests start it themselves
+os.environ.setdefault("WARMUP_ON_START", "false")
+
 @pytest.fixture
 def mock_llm():
     with patch("src.agents.llm") as mock:
@@ -0,0 +1,35 @@
+import numpy as np
+
+from src.context_compression import compress_context, select_sentences, split_documents, split_sentences
+
+
+def test_split_strips_document_wrappers():
+    context = "**Document 1**:\nFarmers get Rs 6000 a year. Paid in three instalments.\n\n---\n\n**Document 2**:\n- Apply online at the portal"
+
+    docs = split_documents(context)
+
+    assert docs[0].startswith("Farmers")
+    assert split_sentences(docs[0]) == ["Farmers get Rs 6000 a year.", "Paid in three instalments."]
+    assert split_sentences(docs[1]) == ["Apply online at the portal"]
+
+
+def test_short_list_items_stay_with_their_heading():
+    text = "The scheme pays Rs 1000 a month.\nWho can apply:\n- Age 60+\n- BPL card holders\n- Widows\nApply at the block office."
+
+    # Nothing is dropped: short items ride along with the sentence or item before them
+    assert split_sentences(text) == [
+        "The scheme pays Rs 1000 a month. Who can apply: Age 60+",
+        "BPL card holders; Widows",
+        "Apply at the block office.",
+    ]
+    assert split_sentences("Age 60+\nBPL card holders") == ["Age 60+; BPL card holders"]
+
+
+def test_selects_best_sentences_within_budget_in_original_order():
+    vectors = np.array([[0.0, 1.0], [1.0, 0.0], [0.9, 0.1], [0.8, 0.2]], dtype=np.float32)
+
+    assert select_sentences([1.0, 0.0], vectors, lengths=[5, 5, 5, 5], budget=10) == [1, 2]
+
+
+def test_short_context_is_left_alone():
+    assert compress_context("farmers", "**Document 1**:\nShort.", budget=100) == "**Document 1**:\nShort."
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+import chromadb
+from chromadb.api.client import SharedSystemClient
+
+from src.rag import corpus_fingerprint
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+FINGERPRINT_SCRIPT = (
+    "import sys, chromadb; from src.rag import corpus_fingerprint; "
+    "print(corpus_fingerprint(chromadb.PersistentClient(path=sys.argv[1]).get_collection('corpus')))"
+)
+
+
+def _open(path):
+    # Forget the cached client so this really reopens the database
+    SharedSystemClient.clear_system_cache()
+    return chromadb.PersistentClient(path=path).get_or_create_collection("corpus")
+
+
+def _fingerprint_in_new_process(path):
+    result = subprocess.run([sys.executable, "-c", FINGERPRINT_SCRIPT, path],
+                            capture_output=True, text=True, check=True, cwd=PROJECT_ROOT)
+    return result.stdout.strip().splitlines()[-1]
+
+
+def test_fingerprint_survives_reopening_chroma(tmp_path):
+    path = str(tmp_path / "chroma")
+    collection = _open(path)
+    collection.add(ids=["a", "b"], documents=["PM-KISAN", "PMAY-G"], embeddings=[[1.0, 0.0], [0.0, 1.0]],
+                   metadatas=[{"source": "pm-kisan.md", "file_hash": "h1"}, {"source": "pmay-g.md", "file_hash": "h2"}])
+    fingerprint = corpus_fingerprint(collection)
+
+    assert corpus_fingerprint(_open(path)) == fingerprint
+    assert _fingerprint_in_new_process(path) == fingerprint
+    assert _fingerprint_in_new_process(path) == fingerprint
+
+
+def test_fingerprint_changes_with_content(tmp_path):
+    collection = _open(str(tmp_path / "chroma"))
+    collection.add(ids=["a"], documents=["PM-KISAN"], embeddings=[[1.0, 0.0]],
+                   metadatas=[{"source": "pm-kisan.md", "file_hash": "h1"}])
+    before = corpus_fingerprint(collection)
+
+    collection.update(ids=["a"], metadatas=[{"file_hash": "h2"}])
+    edited = corpus_fingerprint(collection)
+    collection.add(ids=["b"], documents=["PMAY-G"], embeddings=[[0.0, 1.0]], metadatas=[{"source": "pmay-g.md"}])
+
+    assert len({before, edited, corpus_fingerprint(collection)}) == 3
@@ -0,0 +1,87 @@
+from src.eligibility_rules import decide_eligibility, evaluate_rule, parse_condition, to_interval
+from src.schemas import (
+    Benefit, CitizenProfile, EligibilityRule, PolicyAnalysisOutput, PolicyMetadata, RiskAnalysis
+)
+
+
+def _scheme(*conditions, **rule_kwargs):
+    return PolicyAnalysisOutput(
+        metadata=PolicyMetadata(policy_name="Old Age Pension"),
+        summary="Monthly pension for seniors",
+        eligibility_rules=[EligibilityRule(condition=c, **rule_kwargs) for c in conditions],
+        benefits=[Benefit(benefit_type="monetary", description="Monthly pension", value="₹1,000/month")],
+        risk_analysis=RiskAnalysis(),
+        confidence_score=0.9,
+    )
+
+
+def test_parses_common_condition_wording():
+    assert parse_condition("Age >= 60").value == 60
+    rule = parse_condition("Annual family income below ₹2.5 lakh")
+    assert (rule.field, rule.operator, rule.value) == ("income", "<", 250000)
+    assert parse_condition("Applicant must belong to SC/ST category").value == ["SC", "ST"]
+    assert parse_condition("Must be a farmer") is None
+
+
+def test_operator_phrases_need_whole_words_and_respect_negation():
+    def parsed(condition):
+        rule = parse_condition(condition)
+        return rule and (rule.field, rule.operator, rule.value)
+
+    # "over" inside "government" is not an operator
+    assert parsed("Annual income below Rs 2 lakh as certified by the government") == ("income", "<", 200000)
+    assert parsed("Age must not be under 18") == ("age", ">=", 18)
+    assert parsed("Income not more than 3 lakh") == ("income", "<=", 300000)
+    assert parsed("Age not less than 60 years") == ("age", ">=", 60)
+    assert parsed("Aged 60 or over") == ("age", ">=", 60)
+    assert parsed("Family income not exceeding 1.5 lakh") == ("income", "<=", 150000)
+    # Conflicting comparisons are left to the LLM
+    assert parse_condition("Age under 18 or over 60") is None
+    assert parse_condition("Age not between 18 and 40") is None
+
+
+def test_monthly_income_limits_are_converted_to_annual():
+    rule = parse_condition("Monthly income of Rs 15,000 or below")
+    assert (rule.field, rule.operator, rule.value) == ("income", "<=", 180000)
+    assert parse_condition("Household earning under ₹10,000 per month").value == 120000
+    assert parse_condition("Daily wage income below Rs 300") is None
+
+    # ₹1.5 lakh a year is ₹12,500 a month: within the limit
+    assert evaluate_rule(EligibilityRule(condition="Monthly income of Rs 15,000 or below"),
+                         CitizenProfile(income=150000)) is True
+    assert evaluate_rule(EligibilityRule(condition="Monthly income of Rs 15,000 or below"),
+                         CitizenProfile(income="3-4 lakh")) is False
+
+
+def test_ranges_resolve_only_when_the_whole_range_agrees():
+    assert to_interval("Below 2.5 lakh") == (0, 250000)
+    rule = EligibilityRule(condition="Income below 3 lakh")
+
+    assert evaluate_rule(rule, CitizenProfile(income="Below 2.5 lakh")) is True
+    assert evaluate_rule(rule, CitizenProfile(income="2-4 lakh")) is None
+    assert evaluate_rule(rule, CitizenProfile()) is None
+
+
+def test_structured_fields_take_precedence_over_text():
+    rule = EligibilityRule(condition="Senior citizen", field="age", operator=">=", value=60)
+
+    assert evaluate_rule(rule, CitizenProfile(age=45)) is False
+
+
+def test_clear_cut_profile_skips_llm():
+    scheme = _scheme("Age >= 60", "Annual income below ₹2 lakh")
+
+    eligible = decide_eligibility(CitizenProfile(age=67, income=80000), "Old Age Pension", scheme)
+    assert eligible.eligibility_result.status == "eligible"
+    assert eligible.matched_benefits[0].benefit_value == "₹1,000/month"
+
+    rejected = decide_eligibility(CitizenProfile(age=45), "Old Age Pension", scheme)
+    assert rejected.eligibility_result.status == "not_eligible"
+    assert rejected.eligibility_result.failed_conditions == ["Age >= 60"]
+
+
+def test_unresolved_or_excepted_rules_defer_to_llm():
+    assert decide_eligibility(CitizenProfile(age=67), "Old Age Pension",
+                              _scheme("Age >= 60", "Annual income below ₹2 lakh")) is None
+    assert decide_eligibility(CitizenProfile(age=45), "Old Age Pension",
+                              _scheme("Age >= 60", exceptions=["Widows of any age"])) is None
@@ -0,0 +1,67 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from src.embedding_batcher import BatchingEmbeddings
+
+
+class RecordingEmbeddings(Embeddings):
+    """Fake encoder that records each batch it receives."""
+
+    def __init__(self):
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            self.batches.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_single_query_returns_vector():
+    inner = RecordingEmbeddings()
+    batcher = BatchingEmbeddings(inner, max_wait_ms=1)
+
+    assert batcher.embed_query("abc") == [3.0, 1.0]
+    assert inner.batches == [["abc"]]
+
+
+def test_concurrent_queries_are_batched():
+    inner = RecordingEmbeddings()
+    batcher = BatchingEmbeddings(inner, max_batch_size=64, max_wait_ms=50)
+    queries = [f"query {i}" + "x" * i for i in range(16)]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(batcher.embed_query, queries))
+
+    # Each caller gets its own vector back
+    assert results == [[float(len(q)), 1.0] for q in queries]
+    # ...but the encoder ran fewer times than there were callers
+    assert len(inner.batches) < len(queries)
+    assert batcher.stats()["queries"] == len(queries)
+
+
+def test_duplicate_queries_encoded_once():
+    inner = RecordingEmbeddings()
+    batcher = BatchingEmbeddings(inner, max_wait_ms=50)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(batcher.embed_query, ["same"] * 4))
+
+    assert sum(len(b) for b in inner.batches) < 4
+
+
+def test_encoder_error_propagates_to_callers():
+    class FailingEmbeddings(RecordingEmbeddings):
+        def embed_documents(self, texts):
+            raise RuntimeError("model crashed")
+
+    batcher = BatchingEmbeddings(FailingEmbeddings(), max_wait_ms=1)
+
+    with pytest.raises(RuntimeError, match="model crashed"):
+        batcher.embed_query("anything")
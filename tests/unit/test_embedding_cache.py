@@ -0,0 +1,60 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.embedding_cache import QueryEmbeddingCache, CachedQueryEmbeddings
+
+
+def test_roundtrip_in_float16(tmp_path):
+    cache = QueryEmbeddingCache(str(tmp_path), model_name="test-model", capacity=64)
+
+    assert cache.get("schemes for farmers") is None
+    cache.put("schemes for farmers", [0.5, -0.25, 1.0])
+
+    assert cache.get("schemes for farmers") == pytest.approx([0.5, -0.25, 1.0], abs=1e-3)
+    # Whitespace differences map to the same entry
+    assert cache.get("  schemes  for farmers ") is not None
+
+
+def test_survives_reopen(tmp_path):
+    QueryEmbeddingCache(str(tmp_path), model_name="test-model", capacity=64).put("pm kisan", [1.0, 2.0])
+
+    reopened = QueryEmbeddingCache(str(tmp_path), model_name="test-model", capacity=64)
+    assert reopened.get("pm kisan") == pytest.approx([1.0, 2.0], abs=1e-3)
+
+
+def test_other_model_does_not_see_entries(tmp_path):
+    QueryEmbeddingCache(str(tmp_path), model_name="model-a", capacity=64).put("pm kisan", [1.0, 2.0])
+
+    other = QueryEmbeddingCache(str(tmp_path), model_name="model-b", capacity=64)
+    assert other.get("pm kisan") is None
+
+
+def test_evicts_when_full_and_counts_occupied_slots(tmp_path):
+    cache = QueryEmbeddingCache(str(tmp_path), model_name="test-model", capacity=8)
+    for i in range(40):
+        cache.put(f"query {i}", [float(i)])
+
+    stats = cache.stats()
+    assert stats["inserts"] == 40
+    assert stats["entries"] == 8
+    assert stats["evictions"] == 32
+    # The newest query is always cached; every cached vector still belongs to its query
+    assert cache.get("query 39") == pytest.approx([39.0])
+    for i in range(40):
+        vector = cache.get(f"query {i}")
+        assert vector is None or vector == pytest.approx([float(i)])
+
+    reopened = QueryEmbeddingCache(str(tmp_path), model_name="test-model", capacity=8)
+    assert reopened.stats()["entries"] == 8
+
+
+def test_wrapper_skips_encoder_on_hit(tmp_path):
+    inner = MagicMock()
+    inner.embed_query.return_value = [0.1, 0.2]
+    embeddings = CachedQueryEmbeddings(inner, QueryEmbeddingCache(str(tmp_path), model_name="m", capacity=64))
+
+    embeddings.embed_query("ayushman bharat")
+    embeddings.embed_query("ayushman bharat")
+
+    inner.embed_query.assert_called_once_with("ayushman bharat")
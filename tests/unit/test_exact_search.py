@@ -0,0 +1,52 @@
+import numpy as np
+from langchain_core.documents import Document
+
+from src.exact_search import ExactIndex
+from src.retrieval_filters import RetrievalFilters
+
+
+def _index(rows=200, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    matrix = rng.standard_normal((rows, dim)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    states = ["Karnataka", "Bihar", None]
+    documents = [
+        Document(id=str(i), page_content=f"chunk {i}",
+                 metadata={"state": states[i % 3], "level": "central" if states[i % 3] is None else "state"})
+        for i in range(rows)
+    ]
+    return ExactIndex(matrix, documents), rng
+
+
+def test_top_k_matches_brute_force():
+    index, rng = _index()
+    for _ in range(10):
+        query = rng.standard_normal(32).astype(np.float32)
+        scores = index.matrix @ (query / np.linalg.norm(query))
+        expected = list(np.argsort(-scores)[:5])
+
+        hits = index.search(query, 5)
+        assert [row for row, _ in hits] == expected
+        assert [score for _, score in hits] == [float(scores[row]) for row in expected]
+
+
+def test_filtered_search_matches_brute_force_over_allowed_rows():
+    index, rng = _index()
+    rows = index.rows_matching(RetrievalFilters(state="Karnataka"))
+    allowed = [i for i, doc in enumerate(index.documents) if doc.metadata["state"] in ("Karnataka", None)]
+    assert list(rows) == allowed
+
+    query = rng.standard_normal(32).astype(np.float32)
+    scores = index.matrix @ (query / np.linalg.norm(query))
+    expected = sorted(allowed, key=lambda row: -scores[row])[:5]
+    assert [row for row, _ in index.search(query, 5, rows=rows)] == expected
+
+
+def test_save_and_load_roundtrip_checks_fingerprint(tmp_path):
+    index, rng = _index(rows=20)
+    index.save(str(tmp_path), "corpus-1", dtype="float16")
+
+    assert ExactIndex.load(str(tmp_path), fingerprint="corpus-2") is None
+    loaded = ExactIndex.load(str(tmp_path), fingerprint="corpus-1")
+    query = rng.standard_normal(32).astype(np.float32)
+    assert [row for row, _ in loaded.search(query, 3)] == [row for row, _ in index.search(query, 3)]
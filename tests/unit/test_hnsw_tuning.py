@@ -0,0 +1,51 @@
+import numpy as np
+
+from src.hnsw_tuning import exact_top_k
+
+
+def test_exact_top_k_respects_distance_space():
+    matrix = np.array([[1.0, 0.0], [10.0, 1.0], [0.0, 1.0]], dtype=np.float32)
+    query = np.array([[1.0, 0.1]], dtype=np.float32)
+    # Nearest by Euclidean distance is row 0; by angle, row 1 points the same way as the query
+    assert exact_top_k(matrix, query, 1, "l2") == [[0]]
+    assert exact_top_k(matrix, query, 1, "cosine") == [[1]]
+    assert exact_top_k(matrix, query, 2, "ip") == [[1, 0]]
+
+
+def test_failed_sweep_leaves_the_live_collection_alone(monkeypatch):
+    from types import SimpleNamespace
+
+    import chromadb
+    import pytest
+
+    from src import hnsw_tuning, rag, retrieval_eval
+
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((30, 4)).astype(np.float32)
+    ids = [str(i) for i in range(30)]
+    live = chromadb.EphemeralClient().create_collection("live-hnsw", configuration={"hnsw": {"ef_search": 100}})
+    live.add(ids=ids, embeddings=matrix.tolist())
+
+    class Embeddings:
+        def embed_documents(self, texts):
+            return rng.standard_normal((len(texts), 4)).tolist()
+
+    swept = []
+
+    def failing_measure(collection, queries, truth, k, runs):
+        swept.append(collection.name)
+        if len(swept) == 2:
+            raise KeyboardInterrupt
+        return {"recall": 0.5, "p50_ms": 1.0, "p95_ms": 1.0}
+
+    monkeypatch.setattr(rag, "get_vector_store", lambda: SimpleNamespace(_collection=live))
+    monkeypatch.setattr(rag, "get_embeddings", lambda: Embeddings())
+    monkeypatch.setattr(retrieval_eval, "load_golden_set", lambda: [SimpleNamespace(question="PM-KISAN")])
+    monkeypatch.setattr(hnsw_tuning, "_load_vectors", lambda: (ids, matrix))
+    monkeypatch.setattr(hnsw_tuning, "measure", failing_measure)
+
+    with pytest.raises(KeyboardInterrupt):
+        hnsw_tuning.calibrate(ef_grid=[10, 16, 24], sample_queries=5, save=False)
+
+    assert "live-hnsw" not in swept
+    assert hnsw_tuning.hnsw_config(live)["ef_search"] == 100
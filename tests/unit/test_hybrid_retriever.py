@@ -0,0 +1,54 @@
+from langchain_core.documents import Document
+
+from src.hybrid_retriever import BM25Index, tokenize, reciprocal_rank_fusion
+
+CORPUS = [
+    ("doc-1", "PM-SVANidhi provides working capital loans to street vendors."),
+    ("doc-2", "Pradhan Mantri Kisan Samman Nidhi (PM-KISAN) pays farmers Rs 6000 per year."),
+    ("doc-3", "Ayushman Bharat gives health cover of Rs 5 lakh per family."),
+    ("doc-4", "Street lighting schemes for municipalities and urban local bodies."),
+]
+
+
+def test_tokenize_hyphenated_scheme_names():
+    tokens = tokenize("Apply for PM-KISAN today")
+    assert "pm-kisan" in tokens
+    assert "pmkisan" in tokens
+    assert "kisan" in tokens
+    assert "for" not in tokens
+
+
+def test_bm25_ranks_exact_scheme_name_first():
+    index = BM25Index()
+    index.build(CORPUS)
+
+    results = index.search("pm svanidhi loan", k=2)
+    assert results[0][0] == "doc-1"
+
+    results = index.search("PMKISAN", k=2)
+    assert [doc_id for doc_id, _ in results] == ["doc-2"]
+
+
+def test_bm25_no_match_returns_empty():
+    index = BM25Index()
+    index.build(CORPUS)
+    assert index.search("zzzz", k=3) == []
+
+
+def test_bm25_save_and_load(tmp_path):
+    index = BM25Index()
+    index.build(CORPUS)
+    index.fingerprint = "abc"
+    path = str(tmp_path / "bm25.pkl")
+    index.save(path)
+
+    loaded = BM25Index.load(path)
+    assert loaded.fingerprint == "abc"
+    assert loaded.search("ayushman", k=1) == index.search("ayushman", k=1)
+
+
+def test_rrf_prefers_documents_in_both_rankings():
+    a, b, c = (Document(id=i, page_content=i) for i in "abc")
+    fused = reciprocal_rank_fusion([[a, b], [c, b]])
+    assert fused[0].id == "b"
+    assert {d.id for d in fused} == {"a", "b", "c"}
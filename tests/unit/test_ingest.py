@@ -0,0 +1,67 @@
+from src.ingest import chunk_id, html_to_text, iter_chunks, metadata_for, plan_file
+
+
+def test_chunks_respect_size_and_overlap():
+    paragraphs = "\n\n".join(f"Paragraph {i} " + "word " * 30 for i in range(10))
+    chunks = list(iter_chunks([paragraphs], chunk_size=300, overlap=50))
+
+    assert len(chunks) > 1
+    assert all(len(c) <= 300 for c in chunks)
+    # The tail of one chunk is repeated at the start of the next
+    assert chunks[1].split()[0] in chunks[0].split()[-10:]
+
+
+def test_html_drops_scripts_and_keeps_paragraphs():
+    text = html_to_text("<head><script>var x = 1;</script></head><p>PM-KISAN</p><p>Rs 6000</p>")
+
+    assert "var x" not in text
+    assert list(iter_chunks([text])) == ["PM-KISAN Rs 6000"]
+
+
+def test_plan_only_embeds_changed_chunks():
+    existing = {chunk_id("pm-kisan.md", "old intro"), chunk_id("pm-kisan.md", "unchanged body")}
+
+    new_chunks, stale = plan_file("pm-kisan.md", ["new intro", "unchanged body", "new intro"], existing)
+
+    assert [text for _, text in new_chunks] == ["new intro"]
+    assert stale == {chunk_id("pm-kisan.md", "old intro")}
+
+
+def test_metadata_infers_state_from_path():
+    assert metadata_for("karnataka/raitha_siri.pdf", "h")["state"] == "Karnataka"
+    assert metadata_for("karnataka/raitha_siri.pdf", "h")["scheme_id"] == "raitha-siri"
+    assert metadata_for("central/pm-kisan.md", "h")["level"] == "central"
+    assert metadata_for("central/goat_rearing_subsidy.pdf", "h")["level"] == "central"
+
+
+def test_interrupted_file_is_reingested(tmp_path, monkeypatch):
+    import pytest
+    import src.ingest as ingest_module
+
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    intro = "Intro. " * 125
+    (docs / "pm-kisan.md").write_text(intro + "\n\n" + "Old text. " * 85)
+    chroma_path = str(tmp_path / "chroma")
+    monkeypatch.setattr(ingest_module, "_embed_batch", lambda texts: [[1.0, 0.0, 0.0] for _ in texts])
+    ingest_module.ingest(str(docs), chroma_path, batch_size=1)
+
+    # The edit keeps the intro chunk and adds two; embedding the second new one fails
+    (docs / "pm-kisan.md").write_text("\n\n".join([intro, "Eligibility. " * 70, "Documents. " * 80]))
+    calls = []
+
+    def flaky_embed(texts):
+        calls.append(texts)
+        if len(calls) == 2:
+            raise RuntimeError("embedding server down")
+        return [[1.0, 0.0, 0.0] for _ in texts]
+
+    monkeypatch.setattr(ingest_module, "_embed_batch", flaky_embed)
+    with pytest.raises(RuntimeError):
+        ingest_module.ingest(str(docs), chroma_path, batch_size=1)
+
+    monkeypatch.setattr(ingest_module, "_embed_batch", lambda texts: [[1.0, 0.0, 0.0] for _ in texts])
+    stats = ingest_module.ingest(str(docs), chroma_path, batch_size=1)
+
+    assert stats["files_changed"] == 1
+    assert ingest_module.ingest(str(docs), chroma_path, batch_size=1)["files_unchanged"] == 1
@@ -0,0 +1,110 @@
+import hashlib
+import json
+
+import numpy as np
+
+import src.intent_router as intent_router
+from src.intent_router import (
+    IntentRouter, leave_one_out, load_examples, log_decision, promote_decisions, recommend, threshold_report
+)
+
+
+class BagOfWordsEmbeddings:
+    """Deterministic stand-in for the sentence-transformer: hashed word counts."""
+
+    def _embed(self, text):
+        vector = np.zeros(256, dtype=np.float32)
+        for word in text.lower().replace(",", " ").split():
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 256] += 1
+        return vector.tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+EXAMPLES = {
+    "ELIGIBILITY_VERIFIER": ["am I eligible", "do I qualify for this scheme", "am I eligible for pension"],
+    "CITIZEN_ADVOCATE": ["my application was rejected", "help me write an appeal", "file a grievance"],
+}
+
+
+def test_routes_to_nearest_centroid():
+    embeddings = BagOfWordsEmbeddings()
+    router = IntentRouter.build(EXAMPLES, embeddings)
+
+    result = router.classify(embeddings.embed_query("am I eligible for PM Kisan"))
+    assert result.label == "ELIGIBILITY_VERIFIER"
+    assert result.confidence > 0.5 and result.margin > 0.3
+
+    result = router.classify(embeddings.embed_query("my pension application was rejected"))
+    assert result.label == "CITIZEN_ADVOCATE"
+
+
+def test_low_confidence_defers_to_the_orchestrator(monkeypatch):
+    embeddings = BagOfWordsEmbeddings()
+    monkeypatch.setattr(intent_router, "INTENT_ROUTER_ENABLED", True)
+    monkeypatch.setattr(intent_router, "get_intent_router", lambda: IntentRouter.build(EXAMPLES, embeddings))
+    monkeypatch.setattr("src.rag.get_embeddings", lambda: embeddings)
+    monkeypatch.setattr(intent_router, "log_decision", lambda *args, **kwargs: None)
+
+    assert intent_router.route_query("am I eligible for pension").label == "ELIGIBILITY_VERIFIER"
+    assert intent_router.route_query("namaste") is None
+
+
+def test_promote_llm_decisions_to_examples(tmp_path):
+    log, examples = str(tmp_path / "decisions.jsonl"), str(tmp_path / "examples.jsonl")
+    log_decision("Where is my scholarship money?", "CITIZEN_ADVOCATE", "llm", path=log)
+    log_decision("where is my scholarship  money?", "CITIZEN_ADVOCATE", "llm", path=log)
+    log_decision("tell me something", "POLICY_INTERPRETER", "llm", path=log)
+    log_decision("tell me something", "CONVERSATION_DISCOVERY", "llm", path=log)  # conflicting labels
+    log_decision("help me", "CONVERSATION_DISCOVERY", "llm", path=log)  # already a seed example
+    log_decision("am I eligible", "ELIGIBILITY_VERIFIER", "router", 0.9, 0.4, path=log)
+
+    promoted = promote_decisions(log, examples)
+    assert promoted == [{"label": "CITIZEN_ADVOCATE", "text": "Where is my scholarship money?"}]
+    with open(examples, encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == promoted
+    assert "Where is my scholarship money?" in load_examples(examples)["CITIZEN_ADVOCATE"]
+    assert promote_decisions(log, examples) == []
+
+
+def test_failed_build_is_retried_instead_of_cached(monkeypatch):
+    intent_router.reset_intent_router()
+    monkeypatch.setattr(intent_router, "INTENT_ROUTER_RETRY_SECONDS", 0)
+    attempts = []
+
+    def flaky_build():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("model download failed")
+        return IntentRouter.build(EXAMPLES, BagOfWordsEmbeddings())
+
+    monkeypatch.setattr(intent_router, "load_or_build_router", flaky_build)
+    assert intent_router.get_intent_router() is None
+    assert intent_router.get_intent_router() is not None
+    assert len(attempts) == 2
+    intent_router.reset_intent_router()
+
+
+def test_save_errors_do_not_fail_the_build(monkeypatch, tmp_path):
+    def read_only(self, path):
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(IntentRouter, "save", read_only)
+    monkeypatch.setattr("src.rag.get_embeddings", lambda: BagOfWordsEmbeddings())
+    router = intent_router.load_or_build_router(str(tmp_path / "router.pkl"), str(tmp_path / "examples.jsonl"))
+    assert sorted(router.labels) == sorted(intent_router.SEED_EXAMPLES)
+
+
+def test_leave_one_out_evaluation_recommends_a_precise_setting():
+    results = leave_one_out(EXAMPLES, BagOfWordsEmbeddings())
+    assert len(results) == 6
+    report = threshold_report(results, thresholds=[0.0, 0.3, 0.9], margins=[0.0, 0.1])
+    assert {"threshold": 0.9, "margin": 0.1, "coverage": 0.0, "precision": 1.0} in report
+
+    best = recommend(report, target_precision=0.95)
+    assert best is None or best["precision"] >= 0.95
+    assert recommend([{"threshold": 0.5, "margin": 0.0, "coverage": 0.8, "precision": 0.7}]) is None
@@ -0,0 +1,109 @@
+import time
+
+from src.llm_cache import LLMResponseCache
+from src.schemas import PolicyAnalysisOutput, PolicyMetadata, RiskAnalysis
+
+
+def _analysis(summary="PM-KISAN pays farmers"):
+    return PolicyAnalysisOutput(
+        metadata=PolicyMetadata(policy_name="PM-KISAN"),
+        summary=summary,
+        risk_analysis=RiskAnalysis(),
+        confidence_score=0.9,
+    )
+
+
+def _cache(tmp_path, **kwargs):
+    kwargs.setdefault("corpus_tag", "corpus-1")
+    return LLMResponseCache(str(tmp_path / "llm_cache.sqlite3"), model_tag="test-model", **kwargs)
+
+
+def test_l2_is_shared_between_processes(tmp_path):
+    writer, reader = _cache(tmp_path), _cache(tmp_path)  # e.g. two gunicorn workers
+    writer.set("key", _analysis(), prompt="PROMPT v1")
+
+    value = reader.get("key", prompt="PROMPT v1")
+    assert isinstance(value, PolicyAnalysisOutput)
+    assert value.summary == "PM-KISAN pays farmers"
+    assert reader.stats()["l2_hits"] == 1
+    reader.get("key", prompt="PROMPT v1")
+    assert reader.stats()["l1_hits"] == 1
+
+
+def test_prompt_and_model_tags_must_match(tmp_path):
+    _cache(tmp_path).set("key", _analysis(), prompt="PROMPT v1")
+    assert _cache(tmp_path).get("key", prompt="PROMPT v2") is None
+    other_model = LLMResponseCache(str(tmp_path / "llm_cache.sqlite3"), model_tag="other-model", corpus_tag="corpus-1")
+    assert other_model.get("key", prompt="PROMPT v1") is None
+
+
+def test_entries_expire(tmp_path):
+    cache = _cache(tmp_path, ttl_seconds=1)
+    cache.set("key", _analysis())
+    assert cache.get("key") is not None
+    time.sleep(1.1)
+    assert cache.get("key") is None
+    assert _cache(tmp_path).get("key") is None
+
+
+def test_unstructured_values_stay_in_memory(tmp_path):
+    cache = _cache(tmp_path)
+    cache.set("a", {"plain": "dict"})
+    assert cache.get("a") == {"plain": "dict"}
+    assert _cache(tmp_path).get("a") is None
+    assert cache.stats()["l1_entries"] == 1
+    assert cache.stats()["l1_bytes"] > 0
+
+
+def test_reingested_corpus_misses_and_deploys_do_not_overwrite(tmp_path):
+    old_worker = _cache(tmp_path)
+    old_worker.set("key", _analysis("old text"), prompt="PROMPT v1")
+    new_worker = _cache(tmp_path, corpus_tag="corpus-2")
+    assert new_worker.get("key", prompt="PROMPT v1") is None
+
+    new_worker.set("key", _analysis("new text"), prompt="PROMPT v1")
+    new_prompt = _cache(tmp_path)
+    new_prompt.set("key", _analysis("new prompt"), prompt="PROMPT v2")
+    assert _cache(tmp_path).get("key", prompt="PROMPT v1").summary == "old text"
+    assert _cache(tmp_path, corpus_tag="corpus-2").get("key", prompt="PROMPT v1").summary == "new text"
+
+
+def test_tables_without_corpus_tags_are_discarded(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "llm_cache.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE llm_cache (key TEXT PRIMARY KEY, schema TEXT, model TEXT, prompt_version TEXT, "
+                 "value TEXT, created_at REAL, expires_at REAL)")
+    conn.commit()
+    conn.close()
+
+    cache = _cache(tmp_path)
+    cache.set("key", _analysis(), prompt="PROMPT v1")
+    assert _cache(tmp_path).get("key", prompt="PROMPT v1") is not None
+
+
+def test_corpus_tag_survives_reopening_chroma(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+
+    import chromadb
+    from chromadb.api.client import SharedSystemClient
+
+    chroma_path = str(tmp_path / "chroma")
+    chromadb.PersistentClient(path=chroma_path).get_or_create_collection("corpus").add(
+        ids=["a"], documents=["PM-KISAN"], embeddings=[[1.0, 0.0]], metadatas=[{"file_hash": "h1"}]
+    )
+
+    def reopened_store():
+        # What a restarted worker sees: a fresh client on the same database
+        SharedSystemClient.clear_system_cache()
+        collection = chromadb.PersistentClient(path=chroma_path).get_collection("corpus")
+        return SimpleNamespace(_collection=collection)
+
+    monkeypatch.setattr("src.rag.get_vector_store", reopened_store)
+    before_restart = _cache(tmp_path, corpus_tag=None)
+    before_restart.set("key", _analysis(), prompt="PROMPT v1")
+    after_restart = _cache(tmp_path, corpus_tag=None)
+
+    assert after_restart.corpus_tag == before_restart.corpus_tag != "unknown"
+    assert after_restart.get("key", prompt="PROMPT v1") is not None
@@ -0,0 +1,68 @@
+import time
+
+from langchain_core.documents import Document
+
+from src import multi_query
+from src.multi_query import expand_query, multi_query_retrieve, template_queries
+
+
+class SlowRetriever:
+    """Returns a fixed ranking per query after a delay."""
+
+    def __init__(self, rankings, delay=0.2):
+        self.rankings = rankings
+        self.delay = delay
+
+    def invoke(self, query):
+        time.sleep(self.delay)
+        return [Document(id=doc_id, page_content=doc_id) for doc_id in self.rankings.get(query, [])]
+
+
+def test_template_queries_keep_original_first_and_dedupe(monkeypatch):
+    monkeypatch.setattr("src.scheme_resolver.find_scheme_in_text", lambda text: None)
+    queries = template_queries("What is PM-KISAN?", count=4)
+    assert queries[0] == "What is PM-KISAN?"
+    assert queries[1] == "PM-KISAN eligibility criteria"
+    assert len(queries) == len(set(queries)) == 4
+
+
+def test_off_mode_is_single_query():
+    assert expand_query("pension for widows", mode="off") == ["pension for widows"]
+
+
+def test_fuses_sub_query_rankings_concurrently(monkeypatch):
+    monkeypatch.setattr(multi_query, "expand_query", lambda query, mode: ["q1", "q2", "q3"])
+    retriever = SlowRetriever({"q1": ["a", "b"], "q2": ["b", "c"], "q3": ["b", "a"]})
+
+    started = time.perf_counter()
+    docs = multi_query_retrieve("q1", retriever=retriever, k=3, mode="template")
+    elapsed = time.perf_counter() - started
+
+    assert [d.id for d in docs] == ["b", "a", "c"]
+    assert elapsed < 0.5  # three 0.2s retrievals ran in parallel
+
+
+def test_concurrent_first_calls_share_one_executor(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    import threading
+
+    created = []
+
+    class SlowExecutor(ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            created.append(self)
+            time.sleep(0.05)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(multi_query, "_executor", None)
+    monkeypatch.setattr(multi_query, "ThreadPoolExecutor", SlowExecutor)
+    executors = []
+    threads = [threading.Thread(target=lambda: executors.append(multi_query._get_executor())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(executor is created[0] for executor in executors)
+    created[0].shutdown()
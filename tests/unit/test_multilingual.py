@@ -0,0 +1,54 @@
+import numpy as np
+from langchain_core.documents import Document
+
+from src import multilingual
+from src.exact_search import ExactIndex
+from src.multilingual import MultilingualRetriever, detect_script
+
+
+def test_detect_script():
+    assert detect_script("पीएम किसान योजना क्या है") == "devanagari"
+    assert detect_script("PM-KISAN के लिए पात्रता") == "devanagari"
+    assert detect_script("ಪಿಎಂ ಕಿಸಾನ್ ಯೋಜನೆ") == "kannada"
+    assert detect_script("PM-KISAN ke liye kaun eligible hai") is None
+    assert detect_script("") is None
+
+
+class FixedEmbeddings:
+    def embed_query(self, text):
+        return [0.0, 1.0]
+
+
+class BaseRetriever:
+    def invoke(self, query):
+        return [Document(page_content="english path")]
+
+
+def test_routes_indic_queries_to_multilingual_index(monkeypatch):
+    index = ExactIndex(
+        np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32),
+        [Document(id="a", page_content="a"), Document(id="b", page_content="b")],
+    )
+    monkeypatch.setattr(multilingual, "get_multilingual_index", lambda: index)
+    monkeypatch.setattr(multilingual, "get_multilingual_embeddings", lambda: FixedEmbeddings())
+    retriever = MultilingualRetriever(BaseRetriever(), k=1)
+
+    assert [d.id for d in retriever.invoke("किसान योजना")] == ["b"]
+    assert retriever.invoke("farmer scheme")[0].page_content == "english path"
+
+
+def test_kannada_routing_follows_model_coverage(monkeypatch):
+    index = ExactIndex(
+        np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32),
+        [Document(id="a", page_content="a"), Document(id="b", page_content="b")],
+    )
+    monkeypatch.setattr(multilingual, "get_multilingual_index", lambda: index)
+    monkeypatch.setattr(multilingual, "get_multilingual_embeddings", lambda: FixedEmbeddings())
+    retriever = MultilingualRetriever(BaseRetriever(), k=1)
+
+    assert [d.id for d in retriever.invoke("ಪಿಎಂ ಕಿಸಾನ್ ಯೋಜನೆ")] == ["b"]
+
+    monkeypatch.setattr(multilingual, "MULTILINGUAL_MODEL_NAME",
+                        "sentence-transformers/paraphrase-multilingual-mpnet-base-v2")
+    assert retriever.invoke("ಪಿಎಂ ಕಿಸಾನ್ ಯೋಜನೆ")[0].page_content == "english path"
+    assert [d.id for d in retriever.invoke("किसान योजना")] == ["b"]
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+
+from src.onnx_embeddings import OnnxEmbeddings, check_parity
+
+VOCAB = {"<pad>": 0, "pm": 1, "kisan": 2, "farmers": 3, "[UNK]": 4}
+# One row per token id; the pad row would skew the mean if padding weren't masked out
+TOKEN_VECTORS = np.array([[100.0, 100.0], [1.0, 0.0], [0.0, 1.0], [3.0, 4.0], [0.0, 0.0]], dtype=np.float32)
+
+
+class FakeInput:
+    def __init__(self, name):
+        self.name = name
+
+
+class LookupSession:
+    """Stands in for the onnxruntime session: token embeddings are a table lookup."""
+
+    def __init__(self):
+        self.batches = []
+
+    def get_inputs(self):
+        return [FakeInput("input_ids"), FakeInput("attention_mask")]
+
+    def run(self, outputs, feeds):
+        assert set(feeds) == {"input_ids", "attention_mask"}
+        self.batches.append(feeds["input_ids"].shape[0])
+        return [TOKEN_VECTORS[feeds["input_ids"]]]
+
+
+def _embeddings(batch_size=32):
+    tokenizer = Tokenizer(WordLevel(VOCAB, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer.enable_padding(pad_id=0, pad_token="<pad>")
+
+    embeddings = OnnxEmbeddings.__new__(OnnxEmbeddings)
+    embeddings._session = LookupSession()
+    embeddings._input_names = {i.name for i in embeddings._session.get_inputs()}
+    embeddings._tokenizer = tokenizer
+    embeddings.batch_size = batch_size
+    return embeddings
+
+
+def test_mean_pools_unpadded_tokens_and_normalises():
+    embeddings = _embeddings()
+
+    # "pm kisan" is padded to the length of "pm kisan farmers" in the same batch
+    vectors = np.array(embeddings.embed_documents(["pm kisan", "pm kisan farmers"]))
+
+    assert vectors[0] == pytest.approx([np.sqrt(0.5), np.sqrt(0.5)])
+    assert vectors[1] == pytest.approx(np.array([4.0, 5.0]) / np.linalg.norm([4.0, 5.0]))
+    assert embeddings.embed_query("farmers") == pytest.approx([0.6, 0.8])
+
+
+def test_documents_are_encoded_in_batches():
+    embeddings = _embeddings(batch_size=2)
+
+    assert len(embeddings.embed_documents(["pm", "kisan", "farmers"])) == 3
+    assert embeddings._session.batches == [2, 1]
+    assert embeddings.embed_documents([]) == []
+
+
+def test_missing_model_raises_with_export_hint(tmp_path):
+    pytest.importorskip("onnxruntime")
+
+    with pytest.raises(FileNotFoundError, match="export"):
+        OnnxEmbeddings(str(tmp_path))
+
+
+def test_parity_compares_against_reference():
+    class Fixed:
+        def __init__(self, vectors):
+            self.vectors = vectors
+
+        def embed_documents(self, texts):
+            return self.vectors[:len(texts)]
+
+    reference = Fixed([[1.0, 0.0], [0.0, 1.0]])
+    assert check_parity(["a", "b"], reference, Fixed([[2.0, 0.1], [0.0, 3.0]]))["passed"]
+    assert not check_parity(["a", "b"], reference, Fixed([[1.0, 1.0], [0.0, 1.0]]))["passed"]
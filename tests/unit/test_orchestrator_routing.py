@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+import src.graph as graph
+import src.intent_router as intent_router
+
+
+def test_router_failure_falls_back_to_the_orchestrator_llm(monkeypatch):
+    def broken_router(query):
+        raise RuntimeError("embedder unavailable")
+
+    monkeypatch.setattr(intent_router, "route_query", broken_router)
+    monkeypatch.setattr(graph, "get_zynd_agent", lambda name: None)
+    monkeypatch.setattr(graph, "orchestrator_agent",
+                        SimpleNamespace(invoke=lambda inputs: SimpleNamespace(next_agent="POLICY_INTERPRETER")))
+
+    assert graph.orchestrator_node({"input_text": "explain PM Kisan"}) == {"current_intent": "POLICY_INTERPRETER"}
+
+
+def test_ongoing_conversations_are_routed_by_the_llm(monkeypatch):
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    routed = []
+    monkeypatch.setattr(intent_router, "route_query", lambda query: routed.append(query))
+    monkeypatch.setattr(graph, "get_zynd_agent", lambda name: None)
+    monkeypatch.setattr(graph, "orchestrator_agent",
+                        SimpleNamespace(invoke=lambda inputs: SimpleNamespace(next_agent="CONVERSATION_DISCOVERY")))
+
+    state = {
+        "messages": [HumanMessage(content="help me"), AIMessage(content="Tell me about yourself"),
+                     HumanMessage(content="I am 45 with 2 lakh income")],
+        "current_intent": "CONVERSATION_DISCOVERY",
+    }
+    assert graph.orchestrator_node(state) == {"current_intent": "CONVERSATION_DISCOVERY"}
+    assert routed == []
+
+    graph.orchestrator_node({"input_text": "explain PM Kisan"})
+    assert routed == ["explain PM Kisan"]
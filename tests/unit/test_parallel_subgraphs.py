@@ -0,0 +1,62 @@
+import time
+
+import src.benefits_matching as benefits
+import src.policy_navigator as navigator
+
+STEP_SECONDS = 0.3
+
+
+def _slow(update):
+    def node(state):
+        time.sleep(STEP_SECONDS)
+        return update
+    return node
+
+
+def test_benefits_profile_extraction_and_retrieval_run_in_parallel(monkeypatch):
+    monkeypatch.setattr(benefits, "profile_extraction_node", _slow({"citizen_profile": None}))
+    monkeypatch.setattr(benefits, "retrieval_node", _slow({"retrieved_context": "docs", "retrieval_state": None}))
+    seen = {}
+    monkeypatch.setattr(benefits, "benefits_matching_node", lambda state: seen.update(state) or {})
+    monkeypatch.setattr(benefits, "synthesis_node", lambda state: {"final_markdown_response": "ok"})
+
+    started = time.perf_counter()
+    result = benefits.build_benefits_graph().invoke({"input_text": "farmer in Bihar", "language": "en"})
+    elapsed = time.perf_counter() - started
+
+    assert result["final_markdown_response"] == "ok"
+    assert seen["retrieved_context"] == "docs"
+    assert elapsed < 2 * STEP_SECONDS
+
+
+def test_benefits_matching_retrieves_again_for_a_state_only_the_profile_names(monkeypatch):
+    from src.schemas import CitizenProfile
+
+    calls = []
+    monkeypatch.setattr(benefits, "_retrieve_context", lambda query, filters: calls.append(filters.state) or "ctx")
+    monkeypatch.setattr(benefits.CacheHelper, "compute_llm", lambda key, compute, prompt="": "analysis")
+
+    profile = CitizenProfile(location="Pune, Maharashtra")
+    state = {"input_text": "I live in Pune", "citizen_profile": profile,
+             "retrieved_context": "unfiltered", "retrieval_state": None}
+    assert benefits.benefits_matching_node(state) == {"analysis_output": "analysis"}
+    assert calls == ["Maharashtra"]
+
+    calls.clear()
+    benefits.benefits_matching_node(dict(state, retrieval_state="Maharashtra"))
+    assert calls == []
+
+
+def test_policy_intent_and_rag_run_in_parallel_unless_cataloged(monkeypatch):
+    monkeypatch.setattr(navigator, "catalog_lookup_node", lambda state: {"catalog_scheme_id": None})
+    monkeypatch.setattr(navigator, "intent_node", _slow({"intent": "policy_explanation"}))
+    monkeypatch.setattr(navigator, "rag_node", _slow({"retrieved_docs": []}))
+    monkeypatch.setattr(navigator, "extraction_node", lambda state: {"analysis_output": None})
+    monkeypatch.setattr(navigator, "synthesis_node", lambda state: {"final_markdown_response": "ok"})
+
+    started = time.perf_counter()
+    result = navigator.build_policy_navigator().invoke({"input_text": "explain PM Kisan", "language": "en"})
+    assert result["intent"] == "policy_explanation"
+    assert time.perf_counter() - started < 2 * STEP_SECONDS
+
+    assert navigator.route_after_catalog({"catalog_scheme_id": "pm-kisan"}) == ["synthesis_node"]
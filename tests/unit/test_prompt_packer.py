@@ -0,0 +1,32 @@
+from src.prompt_packer import Section, count_tokens, history_section, pack_prompt, question_section
+
+TEMPLATE = "Context:\n{context}\n\nHistory:\n{history}\n\nQuestion: {input} ({language})"
+
+
+def test_small_prompt_is_formatted_unchanged():
+    prompt = pack_prompt(TEMPLATE, context=Section("PM-KISAN pays Rs 6000."), history=history_section("User: hi"),
+                         input=question_section("Am I eligible?"), language="en")
+
+    assert prompt == TEMPLATE.format(context="PM-KISAN pays Rs 6000.", history="User: hi",
+                                     input="Am I eligible?", language="en")
+
+
+def test_section_is_cut_to_its_budget():
+    prompt = pack_prompt("{context}", context=Section("word " * 2000, budget=50))
+
+    assert count_tokens(prompt) <= 60
+    assert prompt.endswith("[...]")
+
+
+def test_lowest_priority_shrinks_first_and_history_keeps_latest_turns():
+    history = "\n".join(f"User: message {i}" for i in range(500))
+    prompt = pack_prompt(TEMPLATE, max_tokens=300,
+                         context=Section("scheme details " * 20, budget=None, priority=2),
+                         history=Section(history, budget=None, priority=0, keep="tail"),
+                         input=question_section("Am I eligible?"), language="en")
+
+    assert count_tokens(prompt) <= 320
+    assert "Am I eligible?" in prompt
+    assert "message 499" in prompt
+    assert "message 0\n" not in prompt
+    assert prompt.count("scheme details") == 20
@@ -0,0 +1,47 @@
+from langchain_core.documents import Document
+
+from src import reranker
+from src.reranker import RerankingRetriever, rerank
+
+
+class KeywordScorer:
+    """Stands in for the cross-encoder: scores a pair by keyword overlap."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, pairs, batch_size, show_progress_bar):
+        self.batches.append(len(pairs))
+        return [sum(word in text.lower() for word in query.lower().split()) for query, text in pairs]
+
+
+class ListRetriever:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def invoke(self, query):
+        return list(self.documents)
+
+
+DOCS = [
+    Document(page_content="Ration card application process"),
+    Document(page_content="PM-KISAN pays farmers"),
+    Document(page_content="PM-KISAN eligibility for small farmers"),
+    Document(page_content="Street vendor loans"),
+]
+
+
+def test_reranks_candidates_by_scorer_in_one_batch(monkeypatch):
+    scorer = KeywordScorer()
+    monkeypatch.setattr(reranker, "get_cross_encoder", lambda: scorer)
+
+    docs = RerankingRetriever(ListRetriever(DOCS), top_n=2).invoke("pm-kisan eligibility farmers")
+
+    assert [d.page_content for d in docs] == ["PM-KISAN eligibility for small farmers", "PM-KISAN pays farmers"]
+    assert scorer.batches == [len(DOCS)]
+
+
+def test_without_model_keeps_retriever_order(monkeypatch):
+    monkeypatch.setattr(reranker, "get_cross_encoder", lambda: None)
+
+    assert rerank("pm-kisan", DOCS, top_n=2) == DOCS[:2]
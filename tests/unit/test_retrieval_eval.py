@@ -0,0 +1,35 @@
+import pytest
+
+from src.retrieval_eval import (
+    load_golden_set, latency_summary, parse_config, recall_at_k, reciprocal_rank
+)
+
+
+def test_golden_set_parses_from_sample_questions():
+    golden = load_golden_set()
+    assert len(golden) >= 10
+    assert golden[0].question == "What schemes are available for farmers in Karnataka?"
+    assert golden[0].schemes == ["PM-KISAN", "PMFBY", "Soil Health Card"]
+
+
+def test_parse_config():
+    assert parse_config("hybrid:5") == ("hybrid:5", "hybrid", 5, False)
+    assert parse_config("vector:20+rerank").rerank is True
+    assert parse_config("exact").k == 3
+    with pytest.raises(ValueError):
+        parse_config("vector k=3")
+
+
+def test_recall_and_reciprocal_rank():
+    # Two labelled schemes; the first is found at rank 2, the second not at all
+    hits = [[False, True, False], [False, False, False]]
+    assert recall_at_k(hits, 3) == 0.5
+    assert recall_at_k(hits, 1) == 0.0
+    assert reciprocal_rank(hits) == 0.5
+    assert reciprocal_rank([[False]]) == 0.0
+
+
+def test_latency_summary():
+    summary = latency_summary(list(range(1, 101)))
+    assert summary["p50"] == 50.5
+    assert summary["p99"] == pytest.approx(99.01)
@@ -0,0 +1,50 @@
+from langchain_core.documents import Document
+
+from src.rag import retrieve
+from src.retrieval_filters import (
+    RetrievalFilters, filters_from_profile, matches, normalize_state, to_chroma_where
+)
+from src.schemas import CitizenProfile
+
+
+def test_normalize_state_from_free_text():
+    assert normalize_state("Pune, Maharashtra") == "Maharashtra"
+    assert normalize_state("andhra pradesh") == "Andhra Pradesh"
+    assert normalize_state("NY") is None
+    assert normalize_state(None) is None
+
+
+def test_normalize_state_matches_whole_words_only():
+    assert normalize_state("goat farming") is None
+    assert normalize_state("Panaji, Goa") == "Goa"
+    assert normalize_state("Tamil  Nadu") == "Tamil Nadu"
+
+
+def test_filters_from_profile_model_and_dict():
+    assert filters_from_profile(CitizenProfile(location="Karnataka")).state == "Karnataka"
+    assert filters_from_profile({"location": "Tamil Nadu"}).state == "Tamil Nadu"
+    assert filters_from_profile(None).is_empty()
+
+
+def test_state_filter_admits_central_schemes():
+    filters = RetrievalFilters(state="Karnataka")
+
+    assert to_chroma_where(filters) == {"$or": [{"state": "Karnataka"}, {"level": "central"}]}
+    assert matches({"state": "Karnataka"}, filters)
+    assert matches({"level": "central"}, filters)
+    assert not matches({"state": "Kerala", "level": "state"}, filters)
+
+
+def test_combined_filters_use_and():
+    where = to_chroma_where(RetrievalFilters(state="Goa", scheme_id="pm-kisan"))
+    assert where == {"$and": [{"scheme_id": "pm-kisan"}, {"$or": [{"state": "Goa"}, {"level": "central"}]}]}
+    assert to_chroma_where(RetrievalFilters()) is None
+
+
+def test_retrieve_falls_back_when_no_metadata_matches(mock_retriever):
+    mock_retriever.invoke.return_value = [Document(page_content="Untagged chunk")]
+
+    docs = retrieve("farmer schemes", filters=RetrievalFilters(state="Goa"), retriever=mock_retriever)
+
+    assert [d.page_content for d in docs] == ["Untagged chunk"]
+    assert mock_retriever.invoke.call_count == 2
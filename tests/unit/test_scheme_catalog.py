@@ -0,0 +1,58 @@
+from src.schemas import PolicyAnalysisOutput, PolicyMetadata, RiskAnalysis
+from src.scheme_catalog import SchemeCatalog
+
+
+def _analysis(name):
+    return PolicyAnalysisOutput(metadata=PolicyMetadata(policy_name=name), summary=f"{name} summary",
+                                risk_analysis=RiskAnalysis(), confidence_score=0.9)
+
+
+def _catalog(tmp_path):
+    catalog = SchemeCatalog(str(tmp_path / "catalog.db"))
+    catalog.upsert("pm-kisan", "PM-KISAN", ["PM-KISAN", "Pradhan Mantri Kisan Samman Nidhi"], _analysis("PM-KISAN"), "h1")
+    catalog.upsert("pm-svanidhi", "PM SVANidhi", ["PM SVANidhi"], _analysis("PM SVANidhi"), "h2")
+    return catalog
+
+
+def test_lookup_by_alias(tmp_path):
+    catalog = _catalog(tmp_path)
+
+    scheme_id, analysis = catalog.lookup("Who is eligible for pm kisan?")
+    assert scheme_id == "pm-kisan"
+    assert analysis.summary == "PM-KISAN summary"
+    assert catalog.find_scheme("Tell me about Pradhan Mantri Kisan Samman Nidhi") == "pm-kisan"
+
+
+def test_unknown_or_multiple_schemes_fall_back(tmp_path):
+    catalog = _catalog(tmp_path)
+
+    assert catalog.lookup("What is MGNREGA?") is None
+    assert catalog.lookup("Compare PM-KISAN and PM SVANidhi") is None
+
+
+def test_delete_missing_drops_schemes_and_aliases(tmp_path):
+    catalog = _catalog(tmp_path)
+
+    assert catalog.delete_missing(["pm-kisan"]) == 1
+    assert catalog.lookup("PM SVANidhi loan") is None
+    assert catalog.content_hash("pm-kisan") == "h1"
+
+
+def test_catalog_answer_still_addresses_the_question(monkeypatch):
+    from types import SimpleNamespace
+
+    import src.policy_navigator as navigator
+    import src.scheme_catalog as scheme_catalog
+
+    prompts = []
+    monkeypatch.setattr(scheme_catalog, "lookup_scheme", lambda query: ("pm-kisan", _analysis("PM-KISAN")))
+    monkeypatch.setattr(navigator, "llm", SimpleNamespace(
+        invoke=lambda messages: prompts.append(messages[0].content) or SimpleNamespace(content="answer")
+    ))
+
+    question = "Can a tenant farmer in Bihar get PM-KISAN?"
+    result = navigator.policy_navigator_graph.invoke({"input_text": question, "language": "en"})
+
+    assert result["catalog_scheme_id"] == "pm-kisan"
+    assert result["final_markdown_response"] == "answer"
+    assert len(prompts) == 1 and question in prompts[0]
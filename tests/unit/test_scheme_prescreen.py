@@ -0,0 +1,57 @@
+from src.schemas import CitizenProfile, EligibilityRule, PolicyAnalysisOutput, PolicyMetadata, RiskAnalysis
+from src.scheme_prescreen import PrescreenIndex, format_shortlist
+
+
+def _scheme(name, rules, jurisdiction="Central"):
+    return PolicyAnalysisOutput(
+        metadata=PolicyMetadata(policy_name=name, jurisdiction=jurisdiction),
+        summary=f"{name} summary",
+        eligibility_rules=[EligibilityRule(condition=c) for c in rules],
+        risk_analysis=RiskAnalysis(),
+        confidence_score=0.9,
+    )
+
+
+def _index():
+    return PrescreenIndex([
+        ("kisan", _scheme("PM-KISAN", ["Applicant must be a farmer", "Income below 2 lakh"])),
+        ("pension", _scheme("Old Age Pension", ["Age >= 60"])),
+        ("sc-scholarship", _scheme("SC Scholarship", ["Only SC category applicants", "Applicant must be a student"])),
+        ("kerala-women", _scheme("Kerala Women Aid", ["Only for women"], jurisdiction="Kerala")),
+        ("universal", _scheme("Universal Card", [])),
+    ])
+
+
+def _ids(index, **profile):
+    return [scheme_id for scheme_id, _ in index.shortlist(CitizenProfile(**profile), limit=10)]
+
+
+def test_empty_profile_keeps_every_scheme():
+    assert sorted(_ids(_index())) == ["kerala-women", "kisan", "pension", "sc-scholarship", "universal"]
+
+
+def test_profile_excludes_schemes_it_fails():
+    ids = _ids(_index(), age=30, income="1.5 lakh", category="General", location="Pune, Maharashtra",
+               employment_status="farmer", gender="male")
+    assert ids[0] == "kisan"
+    assert set(ids) == {"kisan", "universal"}
+
+
+def test_ranges_and_synonyms():
+    index = _index()
+    assert "pension" in _ids(index, age="55-65")
+    assert "pension" not in _ids(index, age="Below 40")
+    assert "sc-scholarship" in _ids(index, category="Scheduled Caste", employment_status="student")
+    assert _ids(index, special_conditions=["widow"], location="Kochi, Kerala")[0] == "kerala-women"
+
+
+def test_format_shortlist():
+    index = _index()
+    text = format_shortlist(index.shortlist(CitizenProfile(age=70), limit=1))
+    assert text == "- Old Age Pension: Old Age Pension summary (Rules: Age >= 60)"
+
+
+def test_monthly_income_limit_compares_with_annual_income():
+    index = PrescreenIndex([("urban-wage", _scheme("Urban Wage Support", ["Monthly income of Rs 15,000 or below"]))])
+    assert _ids(index, income=150000) == ["urban-wage"]
+    assert _ids(index, income=300000) == []
@@ -0,0 +1,85 @@
+from src import scheme_resolver
+from src.scheme_resolver import SchemeResolver, alias_key
+
+
+def _resolver():
+    resolver = SchemeResolver()
+    resolver.add("ab-pmjay", "Ayushman Bharat Pradhan Mantri Jan Arogya Yojana (AB PM-JAY)")
+    resolver.add("pm-kisan", "Pradhan Mantri Kisan Samman Nidhi")
+    resolver.add("pm-svanidhi", "PM Street Vendor Atmanirbhar Nidhi (PM SVANidhi)")
+    resolver.add("pmay-g", "Pradhan Mantri Awas Yojana - Gramin (PMAY-G)")
+    return resolver
+
+
+def test_alias_key_ignores_spacing_and_punctuation():
+    assert alias_key("PM-JAY") == alias_key("pm jay") == alias_key("PMJAY") == "pmjay"
+
+
+def test_resolves_aliases_abbreviations_and_misspellings():
+    resolver = _resolver()
+    for name in ["PMJAY", "PM-JAY", "ayushman", "Ayushmn Bharat"]:
+        assert resolver.resolve(name) == "ab-pmjay", name
+    assert resolver.resolve("pm kissan") == "pm-kisan"
+    assert resolver.resolve("svanidi") == "pm-svanidhi"
+
+
+def test_ambiguous_or_unknown_names_do_not_resolve():
+    resolver = _resolver()
+    assert resolver.resolve("pm") is None
+    assert resolver.resolve("ration card") is None
+
+
+def test_finds_single_scheme_in_question():
+    resolver = _resolver()
+    assert resolver.find_in_text("Am I eligible for the ayushman card?") == "ab-pmjay"
+    assert resolver.find_in_text("How do I apply for PM-KISAN") == "pm-kisan"
+    assert resolver.find_in_text("Which PM scheme is for farmers?") is None
+    assert resolver.find_in_text("Compare PMJAY and PM Kisan") is None
+
+
+def test_everyday_sentences_name_no_scheme():
+    resolver = _resolver()
+    for sentence in [
+        "Tell me about the street lights",
+        "I sell vegetables on the street",
+        "My mother needs help with hospital bills",
+        "How do I open a bank account?",
+        "Is there support for small business owners in my village?",
+        "What are the national holidays this year?",
+        "I want to sell my grain",
+        "Bharat health cover",
+    ]:
+        assert resolver.find_in_text(sentence) is None, sentence
+    assert resolver.find_in_text("Can street vendors get a svanidhi loan?") == "pm-svanidhi"
+    assert resolver.find_in_text("Is a pucca house covered under PMAY-G?") == "pmay-g"
+
+
+def test_free_text_is_not_fuzzy_matched():
+    resolver = _resolver()
+    # Typos resolve when the answer is meant to be a scheme name, not inside a sentence
+    assert resolver.resolve("pm kissan") == "pm-kisan"
+    assert resolver.find_in_text("my grain was damaged") is None
+    assert resolver.find_in_text("how to get pm kissan money") is None
+    assert resolver.find_in_text("how to get pm kisan money") == "pm-kisan"
+
+
+def test_failed_build_is_retried_instead_of_cached(monkeypatch):
+    scheme_resolver.reset_resolver()
+    attempts = []
+
+    def flaky_build():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise FileNotFoundError("ChromaDB directory not found")
+        return _resolver()
+
+    monkeypatch.setattr(scheme_resolver, "load_or_build_resolver", flaky_build)
+    assert scheme_resolver.get_resolver() is None
+    # Within the retry interval the failure isn't retried on every request
+    assert scheme_resolver.get_resolver() is None
+    assert len(attempts) == 1
+
+    monkeypatch.setattr(scheme_resolver, "SCHEME_RESOLVER_RETRY_SECONDS", 0)
+    assert scheme_resolver.find_scheme_in_text("Am I eligible for the ayushman card?") == "ab-pmjay"
+    assert len(attempts) == 2
+    scheme_resolver.reset_resolver()
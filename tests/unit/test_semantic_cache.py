@@ -0,0 +1,31 @@
+from src.semantic_cache import SemanticCache
+
+
+def test_near_duplicate_query_hits():
+    cache = SemanticCache(capacity=4, threshold=0.9)
+    cache.put([1.0, 0.0, 0.0], "farmer schemes")
+
+    assert cache.get([0.98, 0.1, 0.0]) == "farmer schemes"
+    assert cache.get([0.0, 1.0, 0.0]) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_namespaces_do_not_mix():
+    cache = SemanticCache(capacity=4, threshold=0.9)
+    cache.put([1.0, 0.0], "karnataka docs", namespace="state=Karnataka")
+
+    assert cache.get([1.0, 0.0], namespace="state=Kerala") is None
+    assert cache.get([1.0, 0.0], namespace="state=Karnataka") == "karnataka docs"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticCache(capacity=2, threshold=0.99)
+    cache.put([1.0, 0.0, 0.0], "a")
+    cache.put([0.0, 1.0, 0.0], "b")
+    cache.get([1.0, 0.0, 0.0])  # refresh "a"
+    cache.put([0.0, 0.0, 1.0], "c")
+
+    assert cache.get([1.0, 0.0, 0.0]) == "a"
+    assert cache.get([0.0, 1.0, 0.0]) is None
+    assert cache.get([0.0, 0.0, 1.0]) == "c"
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from src.cache_helper import CacheHelper
+from src.single_flight import SingleFlight
+
+
+def _run_concurrently(n, target):
+    results, barrier = [None] * n, threading.Barrier(n)
+
+    def run(i):
+        barrier.wait()
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_callers_share_one_call():
+    group, calls = SingleFlight("test"), []
+
+    def slow_call():
+        calls.append(1)
+        time.sleep(0.2)
+        return "answer"
+
+    results = _run_concurrently(8, lambda: group.do("explain pm kisan", slow_call))
+    assert results == ["answer"] * 8
+    assert len(calls) == 1
+    assert group.stats() == {"calls": 1, "coalesced": 7, "timeouts": 0, "in_flight": 0}
+
+
+def test_failure_reaches_every_waiter_and_is_not_remembered():
+    group = SingleFlight("test")
+
+    def failing_call():
+        time.sleep(0.2)
+        raise RuntimeError("rate limited")
+
+    results = _run_concurrently(4, lambda: group.do("key", failing_call))
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert group.do("key", lambda: "retried") == "retried"
+
+
+def test_followers_fall_back_after_timeout():
+    group = SingleFlight("test", timeout=0.05)
+    release = threading.Event()
+    leader = threading.Thread(target=group.do, args=("key", release.wait))
+    leader.start()
+    time.sleep(0.02)
+    try:
+        assert group.do("key", lambda: "direct") == "direct"
+        assert group.stats()["timeouts"] == 1
+    finally:
+        release.set()
+        leader.join()
+
+
+def test_compute_llm_caches_the_coalesced_result():
+    CacheHelper.clear_all()
+    calls = []
+
+    def analyse():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"summary": "PM-KISAN pays farmers"}
+
+    results = _run_concurrently(5, lambda: CacheHelper.compute_llm("pm-kisan", analyse, prompt="PROMPT"))
+    assert all(r == {"summary": "PM-KISAN pays farmers"} for r in results)
+    assert len(calls) == 1
+    assert CacheHelper.get_llm_cache("pm-kisan", prompt="PROMPT") == results[0]
+    CacheHelper.clear_all()
+
+
+def test_compute_rag_propagates_errors_without_caching():
+    CacheHelper.clear_all()
+    with pytest.raises(ValueError):
+        CacheHelper.compute_rag("query", lambda: (_ for _ in ()).throw(ValueError("index missing")))
+    assert CacheHelper.get_rag_cache("query") is None
@@ -0,0 +1,59 @@
+import threading
+import time
+
+from src.striped_cache import StripedLRUCache, approximate_size
+
+
+def test_evicts_least_recently_used_by_bytes():
+    entry = approximate_size("x" * 100) + 1
+    cache = StripedLRUCache("test", max_bytes=entry * 2, stripes=1)
+    cache.set("a", "x" * 100)
+    cache.set("b", "x" * 100)
+    assert cache.get("a") is not None  # "a" is now more recent than "b"
+    cache.set("c", "x" * 100)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2 and stats["bytes"] <= entry * 2
+
+
+def test_oversized_entries_are_not_cached():
+    cache = StripedLRUCache("test", max_bytes=1000, stripes=1)
+    cache.set("small", "ok")
+    cache.set("big", "x" * 5000)
+    assert cache.get("big") is None
+    assert cache.get("small") == "ok"
+
+
+def test_per_entry_ttl():
+    cache = StripedLRUCache("test", max_bytes=10_000, default_ttl=60)
+    cache.set("short", "value", ttl=0.05)
+    cache.set("long", "value")
+    time.sleep(0.1)
+    assert cache.get("short") is None
+    assert cache.get("long") == "value"
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+
+
+def test_concurrent_writers_keep_byte_accounting_consistent():
+    cache = StripedLRUCache("test", max_bytes=20_000, stripes=4)
+
+    def writer(offset):
+        for i in range(500):
+            cache.set(f"k{offset}-{i % 50}", "v" * (i % 200))
+            cache.get(f"k{offset}-{(i * 7) % 50}")
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 20_000
+    assert stats["bytes"] == sum(size for stripe in cache._stripes for _, size, _ in stripe.entries.values())
+    assert stats["hits"] + stats["misses"] == 8 * 500
@@ -0,0 +1,72 @@
+import threading
+
+from src import scheme_resolver, warmup
+
+
+def test_readyz_is_503_until_warmup_finishes(monkeypatch):
+    from src import rag
+    from src.app import app
+
+    release = threading.Event()
+
+    class BlockingRetriever:
+        def invoke(self, query):
+            release.wait(5)
+            return []
+
+    monkeypatch.setattr(warmup, "WARMUP_ON_START", True)
+    monkeypatch.setattr(warmup, "_ready", threading.Event())
+    monkeypatch.setattr(warmup, "_thread", None)
+    monkeypatch.setattr(warmup, "_status", {"state": "not_started", "error": None, "duration_seconds": None,
+                                            "attempts": 0})
+    monkeypatch.setattr(rag, "get_retriever", lambda: BlockingRetriever())
+    monkeypatch.setattr(scheme_resolver, "get_resolver", lambda: None)
+    client = app.test_client()
+
+    assert warmup.start_warmup()
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.get_json()["state"] == "warming"
+
+    release.set()
+    warmup._thread.join(5)
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.get_json()["ready"] is True
+
+
+def test_failed_warmup_is_retried_and_optional_steps_do_not_gate_readiness(monkeypatch):
+    from src import intent_router, rag
+
+    attempts = []
+
+    class Retriever:
+        def invoke(self, query):
+            return []
+
+    def flaky_retriever():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise FileNotFoundError("ChromaDB directory not found")
+        return Retriever()
+
+    def broken_resolver():
+        raise RuntimeError("catalog unreadable")
+
+    monkeypatch.setattr(warmup, "WARMUP_ON_START", True)
+    monkeypatch.setattr(warmup, "WARMUP_RETRY_SECONDS", 0.01)
+    monkeypatch.setattr(warmup, "_ready", threading.Event())
+    monkeypatch.setattr(warmup, "_thread", None)
+    monkeypatch.setattr(warmup, "_status", {"state": "not_started", "error": None, "duration_seconds": None,
+                                            "attempts": 0})
+    monkeypatch.setattr(rag, "get_retriever", flaky_retriever)
+    monkeypatch.setattr(scheme_resolver, "get_resolver", broken_resolver)
+    monkeypatch.setattr(intent_router, "INTENT_ROUTER_ENABLED", True)
+    monkeypatch.setattr(intent_router, "get_intent_router", broken_resolver)
+
+    warmup.start_warmup()
+    warmup._thread.join(5)
+
+    assert warmup.is_ready()
+    status = warmup.get_status()
+    assert (status["state"], status["attempts"], status["error"]) == ("ready", 3, None)